@@ -0,0 +1,12 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Django imports...
+from django.apps import AppConfig
+
+
+class AccountsConfig(AppConfig):
+    name = 'accounts'
+
+    def ready(self):
+        # Connect signal handlers...
+        from . import signals
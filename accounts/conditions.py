@@ -0,0 +1,50 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import hashlib
+from functools import wraps
+
+# Django imports...
+from django.utils.cache import patch_cache_control
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+
+
+def version_etag(*parts):
+    """Hashes the parts of a version into an ETag."""
+    return hashlib.md5(':'.join(map(str, parts))).hexdigest()
+
+
+def private_condition(etag_func=None, last_modified_func=None):
+    """
+    Wraps a per-user view in Django's condition decorator, so that a request carrying the current
+    validators gets a 304 without running the view. The response, 304 or not, may only be cached by
+    the user's own browser and has to be revalidated on every visit.
+    """
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+
+            patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+            patch_vary_headers(response, ['Cookie'])
+
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def profile_etag(request, *args, **kwargs):
+    return version_etag(request.user.pk, request.user.modified)
+
+
+def profile_last_modified(request, *args, **kwargs):
+    return request.user.modified
+
+
+# For views that only display the request user...
+profile_condition = private_condition(etag_func=profile_etag, last_modified_func=profile_last_modified)
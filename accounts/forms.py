@@ -6,6 +6,14 @@ from django.contrib.auth import authenticate
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import AuthenticationForm
 
+# Local imports...
+from .models import PhotoJob
+from .thumbnails import clear_thumbnails
+from .uploads import UPLOAD_ERRORS
+from .uploads import check_photo_dimensions
+from .uploads import check_photo_size
+from .uploads import get_image_size
+
 User = get_user_model()
 
 
@@ -95,4 +103,38 @@ class ProfileForm(BootstrapMixin, forms.ModelForm):
                 'placeholder': 'i.e. (913) 149-4498',
                 'type': 'tel'
             })
-        }
\ No newline at end of file
+        }
+
+    def clean_photo(self):
+        photo = self.cleaned_data['photo']
+
+        # Uploads received by PhotoUploadHandler were checked already, but others were not...
+        if photo and 'photo' in self.changed_data:
+            size = get_image_size(photo)
+            code = check_photo_size(photo.size) or (size and check_photo_dimensions(*size))
+
+            if code:
+                raise forms.ValidationError(UPLOAD_ERRORS[code], code=code)
+
+        return photo
+
+    def save(self, commit=True):
+        """
+        Saves the profile. A new photo is stored as uploaded and queued for the process_photos
+        worker, which makes its thumbnails, so the request does not wait for the image processing.
+        """
+        user = super(ProfileForm, self).save(commit=False)
+        photo_changed = 'photo' in self.changed_data
+
+        if photo_changed:
+            # The thumbnails of the previous photo are out of date...
+            clear_thumbnails(user)
+
+        if commit:
+            user.save()
+            self.save_m2m()
+
+            if photo_changed and user.photo:
+                PhotoJob.objects.create(user=user, photo=user.photo.name)
+
+        return user
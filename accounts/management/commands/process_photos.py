@@ -0,0 +1,52 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import datetime
+import time
+from optparse import make_option
+
+# Django imports...
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Local imports...
+from accounts.models import PhotoJob
+from accounts.photos import process_photo_jobs
+from users.signals import flush_deferred
+
+# Seconds between polls of an empty queue...
+PHOTO_JOB_POLL_INTERVAL = getattr(settings, 'PHOTO_JOB_POLL_INTERVAL', 2)
+
+# Seconds after which a running job is assumed to belong to a dead worker...
+PHOTO_JOB_TIMEOUT = getattr(settings, 'PHOTO_JOB_TIMEOUT', 10 * 60)
+
+# The most times a job is claimed before it is failed, if its workers keep dying...
+PHOTO_JOB_MAX_ATTEMPTS = getattr(settings, 'PHOTO_JOB_MAX_ATTEMPTS', 3)
+
+
+class Command(BaseCommand):
+    help = 'Processes uploaded photos queued by the profile form.'
+
+    option_list = BaseCommand.option_list + (
+        make_option('--once', action='store_true', default=False,
+                    help='Process the pending photos and exit, instead of polling for new ones.'),
+    )
+
+    def handle(self, *args, **options):
+        timeout = datetime.timedelta(seconds=PHOTO_JOB_TIMEOUT)
+
+        while True:
+            PhotoJob.objects.requeue_stale(timeout, PHOTO_JOB_MAX_ATTEMPTS)
+
+            count = process_photo_jobs()
+
+            # Outside requests, caches dropped inside transactions are only dropped again here...
+            flush_deferred()
+
+            if count:
+                self.stdout.write('Processed %d photo(s).' % count)
+
+            if options['once']:
+                break
+
+            time.sleep(PHOTO_JOB_POLL_INTERVAL)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import re
+import unicodedata
+
+from django.db import models, migrations
+from django.utils.encoding import force_text
+
+# Frozen copies of the accounts.search helpers as of this migration, so that later changes to them
+# don't change what the migration does...
+SEARCH_FIELDS = ('first_name', 'last_name', 'username', 'email')
+
+SEARCH_TABLE = 'accounts_user_search'
+
+NON_ALPHANUMERIC = re.compile(r'[^a-z0-9]+')
+
+
+def normalize(value):
+    value = unicodedata.normalize('NFKD', force_text(value or ''))
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+
+    return NON_ALPHANUMERIC.sub(' ', value.lower()).strip()
+
+
+def get_search_text(user):
+    terms = normalize(' '.join(getattr(user, field) or '' for field in SEARCH_FIELDS)).split()
+
+    return ' '.join(term for i, term in enumerate(terms) if term not in terms[:i])
+
+
+def fill_search_text(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+
+    for user in User.objects.all():
+        User.objects.filter(pk=user.pk).update(search_text=get_search_text(user))
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'sqlite':
+        schema_editor.execute('CREATE VIRTUAL TABLE %s USING fts5(search_text)' % SEARCH_TABLE)
+        schema_editor.execute('INSERT INTO %s (rowid, search_text) SELECT id, search_text FROM accounts_user' % (
+            SEARCH_TABLE
+        ))
+    elif vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            'CREATE INDEX accounts_user_search_text_trgm ON accounts_user USING gin (search_text gin_trgm_ops)'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE %s' % SEARCH_TABLE)
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX accounts_user_search_text_trgm')
+
+
+def empty_search_text(apps, schema_editor):
+    # The search column is dropped when unapplying, so there is nothing to undo...
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_auto_20150302_2206'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='search_text',
+            field=models.CharField(default=b'', max_length=250, editable=False),
+            preserve_default=True,
+        ),
+        migrations.RunPython(fill_search_text, empty_search_text),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
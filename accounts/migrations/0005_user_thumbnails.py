@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import hashlib
+from io import BytesIO
+
+from PIL import Image
+from PIL import ImageOps
+
+from django.core.files.base import ContentFile
+from django.db import models, migrations
+
+# Frozen copies of the accounts.thumbnails helpers as of this migration, so that later changes to
+# them don't change what the migration does...
+THUMBNAIL_SIZES = (
+    ('photo_small', 55),
+    ('photo_small_2x', 110),
+    ('photo_profile', 120)
+)
+
+THUMBNAIL_DIR = 'photos/thumbnails'
+
+THUMBNAIL_QUALITY = 85
+
+
+def flatten(image):
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+
+        return background
+
+    return image.convert('RGB')
+
+
+def make_thumbnail(image, size):
+    thumbnail = ImageOps.fit(image, (size, size), Image.ANTIALIAS)
+
+    output = BytesIO()
+    thumbnail.save(output, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+
+    return output.getvalue()
+
+
+def update_thumbnails(User, user):
+    user.photo.seek(0)
+    content = user.photo.read()
+    digest = hashlib.sha1(content).hexdigest()
+    image = flatten(Image.open(BytesIO(content)))
+
+    for field, size in THUMBNAIL_SIZES:
+        storage = User._meta.get_field(field).storage
+        name = storage.save('%s/%s_%d.jpg' % (THUMBNAIL_DIR, digest, size), ContentFile(make_thumbnail(image, size)))
+
+        setattr(user, field, name)
+
+
+def fill_thumbnails(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+
+    for user in User.objects.exclude(photo='').exclude(photo=None).exclude(photo='photos/no-image.jpg'):
+        try:
+            update_thumbnails(User, user)
+        except IOError:
+            # Missing or broken photos keep falling back to the original...
+            continue
+
+        user.save(update_fields=[field for field, size in THUMBNAIL_SIZES])
+
+
+def empty_thumbnails(apps, schema_editor):
+    # The thumbnail columns are dropped when unapplying, so there is nothing to undo...
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='photo_profile',
+            field=models.ImageField(upload_to=b'photos/thumbnails', null=True, editable=False, blank=True),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='photo_small',
+            field=models.ImageField(upload_to=b'photos/thumbnails', null=True, editable=False, blank=True),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='photo_small_2x',
+            field=models.ImageField(upload_to=b'photos/thumbnails', null=True, editable=False, blank=True),
+            preserve_default=True,
+        ),
+        migrations.RunPython(fill_thumbnails, empty_thumbnails),
+    ]
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+from django.conf import settings
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhotoJob',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('photo', models.CharField(max_length=100)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('status', models.CharField(default=b'P', max_length=1, choices=[(b'P', b'pending'), (b'R', b'running'), (b'D', b'done'), (b'F', b'failed')])),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(default=b'', blank=True)),
+                ('user', models.ForeignKey(related_name='photo_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AlterIndexTogether(
+            name='photojob',
+            index_together=set([('status', 'created')]),
+        ),
+    ]
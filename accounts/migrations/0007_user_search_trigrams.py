@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+SEARCH_TABLE = 'accounts_user_search'
+
+
+def create_table(schema_editor, options):
+    schema_editor.execute('DROP TABLE %s' % SEARCH_TABLE)
+    schema_editor.execute('CREATE VIRTUAL TABLE %s USING fts5(%s)' % (SEARCH_TABLE, options))
+    schema_editor.execute('INSERT INTO %s (rowid, search_text) SELECT id, search_text FROM accounts_user' % (
+        SEARCH_TABLE
+    ))
+
+
+def index_trigrams(apps, schema_editor):
+    # Substrings match like they do on the other databases, not only prefixes of words...
+    if schema_editor.connection.vendor == 'sqlite':
+        create_table(schema_editor, "search_text, tokenize = 'trigram'")
+
+
+def index_words(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        create_table(schema_editor, 'search_text')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_photojob'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_trigrams, index_words),
+    ]
@@ -4,22 +4,143 @@ __author__ = 'jason.parent@carneylabs.com (Jason Parent)'
 from localflavor.us.models import PhoneNumberField
 
 # Django imports...
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import F
+from django.db.models import QuerySet
+from django.dispatch import Signal
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+# Local imports...
+from .search import get_search_text
+
+PHOTO_JOB_STATUS = (
+    ('P', 'pending'),
+    ('R', 'running'),
+    ('D', 'done'),
+    ('F', 'failed'),
+)
+
+# Sent when the photo worker replaced a user's photo, which it does without calling save()...
+photo_processed = Signal(providing_args=['user'])
+
+# The cached properties that depend on the photo fields...
+PHOTO_URLS = ('photo_url', 'photo_small_url', 'photo_small_2x_url', 'photo_profile_url')
 
 
 class User(AbstractUser):
     photo = models.ImageField(upload_to='photos', default='photos/no-image.jpg', blank=True, null=True)
+    photo_small = models.ImageField(upload_to='photos/thumbnails', editable=False, blank=True, null=True)
+    photo_small_2x = models.ImageField(upload_to='photos/thumbnails', editable=False, blank=True, null=True)
+    photo_profile = models.ImageField(upload_to='photos/thumbnails', editable=False, blank=True, null=True)
     date_of_birth = models.DateField(blank=True, null=True)
     address = models.CharField(max_length=250, default='')
     phone_number = PhoneNumberField(blank=True, null=True)
+    search_text = models.CharField(max_length=250, default='', editable=False)
+    modified = models.DateTimeField(auto_now=True)
 
     def __unicode__(self):
         return self.get_full_name()
 
-    @property
+    def save(self, *args, **kwargs):
+        self.search_text = get_search_text(self)
+
+        super(User, self).save(*args, **kwargs)
+
+        # The photo may have been changed (or renamed by the storage) since its URLs were cached...
+        for name in PHOTO_URLS:
+            self.__dict__.pop(name, None)
+
+    @cached_property
     def photo_url(self):
         try:
             return self.photo.url
         except ValueError:
-            return None
\ No newline at end of file
+            return None
+
+    def get_thumbnail_url(self, field):
+        """Gets the URL of a thumbnail, or of the photo itself if it has none (i.e. the default photo)."""
+        try:
+            return getattr(self, field).url
+        except ValueError:
+            return self.photo_url
+
+    @cached_property
+    def photo_small_url(self):
+        return self.get_thumbnail_url('photo_small')
+
+    @cached_property
+    def photo_small_2x_url(self):
+        return self.get_thumbnail_url('photo_small_2x')
+
+    @cached_property
+    def photo_profile_url(self):
+        return self.get_thumbnail_url('photo_profile')
+
+
+class PhotoJobQuerySet(QuerySet):
+    def pending(self):
+        """Get all jobs waiting for a worker, oldest first."""
+        return self.filter(status='P').order_by('created', 'id')
+
+    def claim(self):
+        """
+        Get the oldest pending job and mark it as running, or None if there is none. The job is only
+        claimed if it is still pending, so that concurrent workers never process the same job.
+        """
+        for job in self.pending()[:10]:
+            claimed = self.filter(pk=job.pk, status='P').update(
+                status='R',
+                attempts=F('attempts') + 1,
+                updated=timezone.now()
+            )
+
+            if claimed:
+                job.status = 'R'
+                job.attempts += 1
+
+                return job
+
+        return None
+
+    def requeue_stale(self, age, max_attempts):
+        """
+        Puts jobs claimed longer than age (a timedelta) ago back in the queue, i.e. after a worker
+        died. Jobs that were already claimed max_attempts times are failed instead, since a photo
+        that keeps killing its worker would otherwise be retried forever. Returns the number requeued.
+        """
+        now = timezone.now()
+        stale = self.filter(status='R', updated__lt=now - age)
+
+        stale.filter(attempts__gte=max_attempts).update(
+            status='F',
+            error='Gave up after %d attempts.' % max_attempts,
+            updated=now
+        )
+
+        return stale.filter(attempts__lt=max_attempts).update(status='P', updated=now)
+
+
+class PhotoJob(models.Model):
+    """A photo upload that is waiting to be cleaned up and thumbnailed by the process_photos worker."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='photo_jobs')
+    photo = models.CharField(max_length=100)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+    status = models.CharField(max_length=1, choices=PHOTO_JOB_STATUS, default='P')
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+
+    objects = PhotoJobQuerySet.as_manager()
+
+    class Meta:
+        index_together = [
+            ('status', 'created'),
+        ]
+
+    def finish(self, status, error=''):
+        self.status = status
+        self.error = error
+        self.save(update_fields=['status', 'error', 'updated'])
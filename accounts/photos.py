@@ -0,0 +1,148 @@
+"""
+Processing of uploaded User photos, outside of the request that uploaded them.
+
+ProfileForm only stores the upload and queues a PhotoJob; the process_photos worker then rotates the
+photo upright, strips its metadata (EXIF may carry the location it was taken at), scales it down to
+at most PHOTO_MAX_SIZE pixels, re-encodes it as JPEG and generates its thumbnails. Until the job is
+done, the original upload is shown.
+"""
+
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import hashlib
+from io import BytesIO
+
+# Third-party imports...
+from PIL import Image
+
+# Django imports...
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.utils.encoding import force_text
+from django.utils import timezone
+
+# Local imports...
+from .models import PhotoJob
+from .models import photo_processed
+from .thumbnails import THUMBNAIL_SIZES
+from .thumbnails import THUMBNAIL_QUALITY
+from .thumbnails import flatten
+from .thumbnails import generate_thumbnails
+
+# The largest width or height of a stored photo, in pixels...
+PHOTO_MAX_SIZE = getattr(settings, 'PHOTO_MAX_SIZE', 1024)
+
+PHOTO_DIR = 'photos'
+
+# The EXIF orientation tag, and the transpositions that undo each of its values...
+EXIF_ORIENTATION = 0x0112
+
+ORIENTATIONS = {
+    2: (Image.FLIP_LEFT_RIGHT,),
+    3: (Image.ROTATE_180,),
+    4: (Image.FLIP_TOP_BOTTOM,),
+    5: (Image.ROTATE_90, Image.FLIP_TOP_BOTTOM),
+    6: (Image.ROTATE_270,),
+    7: (Image.ROTATE_270, Image.FLIP_TOP_BOTTOM),
+    8: (Image.ROTATE_90,)
+}
+
+
+def get_orientation(image):
+    try:
+        return (image._getexif() or {}).get(EXIF_ORIENTATION, 1)
+    except (AttributeError, IndexError, KeyError, SyntaxError, TypeError, ValueError):
+        # Only JPEGs carry EXIF data, and it is often malformed...
+        return 1
+
+
+def clean_photo(content):
+    """
+    Rotates photo data upright, scales it down to PHOTO_MAX_SIZE and re-encodes it as a JPEG, which
+    leaves out any metadata. Raises an IOError if the data is not an image.
+    """
+    image = Image.open(BytesIO(content))
+    orientation = get_orientation(image)
+
+    # Let the JPEG decoder scale down by up to 8x while decoding, instead of decoding every pixel...
+    image.draft('RGB', (PHOTO_MAX_SIZE, PHOTO_MAX_SIZE))
+    image = flatten(image)
+
+    for method in ORIENTATIONS.get(orientation, ()):
+        image = image.transpose(method)
+
+    image.thumbnail((PHOTO_MAX_SIZE, PHOTO_MAX_SIZE), Image.ANTIALIAS)
+
+    output = BytesIO()
+    image.save(output, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+
+    return output.getvalue()
+
+
+def replace_photo(user, photo):
+    """Replaces the user's photo (a stored file name) with its cleaned version and its thumbnails."""
+    User = get_user_model()
+    storage = user.photo.storage
+
+    with storage.open(photo) as f:
+        content = clean_photo(f.read())
+
+    name = storage.save('%s/%s.jpg' % (PHOTO_DIR, hashlib.sha1(content).hexdigest()), ContentFile(content))
+    thumbnails = generate_thumbnails(ContentFile(content))
+
+    # Only point the user at the results if the photo was not replaced while they were made...
+    updated = User.objects.filter(pk=user.pk, photo=photo).update(
+        photo=name,
+        modified=timezone.now(),
+        **{field: thumbnails[field] for field, size in THUMBNAIL_SIZES}
+    )
+
+    if updated:
+        photo_processed.send(sender=User, user=user)
+
+    # The original may still carry its metadata, but identical uploads share a file...
+    if updated and name != photo and not User.objects.filter(photo=photo).exists():
+        storage.delete(photo)
+
+
+def process_photo_job(job):
+    """
+    Replaces the photo of a job's user with its cleaned version and generates its thumbnails. Jobs
+    for a photo that has since been replaced are skipped. Failures are recorded on the job.
+    """
+    user = job.user
+
+    if user.photo.name != job.photo:
+        job.finish('D')
+
+        return job
+
+    try:
+        replace_photo(user, job.photo)
+    except Exception as e:
+        # PIL raises all sorts of errors for broken images, and a job left running would be requeued...
+        job.finish('F', error='%s: %s' % (type(e).__name__, force_text(e)))
+
+        return job
+
+    job.finish('D')
+
+    return job
+
+
+def process_photo_jobs(limit=None):
+    """Processes pending jobs until there are none left (or limit were processed). Returns the count."""
+    count = 0
+
+    while limit is None or count < limit:
+        job = PhotoJob.objects.claim()
+
+        if job is None:
+            break
+
+        process_photo_job(job)
+        count += 1
+
+    return count
@@ -0,0 +1,116 @@
+"""
+User search backed by a normalized, denormalized search column on accounts.User.
+
+Every backend matches each term of a query as a substring of the column, as icontains did. On
+SQLite the column is mirrored into an FTS5 table (accounts_user_search) with the trigram
+tokenizer, whose rowid is the user id, and results are ranked by bm25; terms shorter than a
+trigram are matched with LIKE. On PostgreSQL the column carries a pg_trgm GIN index, so substring
+matches use the index and results are ranked by trigram similarity. Other databases fall back to a
+LIKE scan over the normalized column.
+"""
+
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import re
+import unicodedata
+
+# Django imports...
+from django.db import connection
+from django.utils.encoding import force_text
+
+SEARCH_FIELDS = ('first_name', 'last_name', 'username', 'email')
+
+SEARCH_TABLE = 'accounts_user_search'
+
+NON_ALPHANUMERIC = re.compile(r'[^a-z0-9]+')
+
+# The FTS table can only find substrings at least this long...
+TRIGRAM_LENGTH = 3
+
+
+def normalize(value):
+    """Lowercases the value, strips accents and replaces punctuation with single spaces."""
+    value = unicodedata.normalize('NFKD', force_text(value or ''))
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+
+    return NON_ALPHANUMERIC.sub(' ', value.lower()).strip()
+
+
+def get_search_text(user):
+    """Gets the normalized text that a user can be found by, without repeated terms."""
+    terms = normalize(' '.join(getattr(user, field) or '' for field in SEARCH_FIELDS)).split()
+
+    # Usernames are usually email addresses, so only keep the first occurrence of each term...
+    return ' '.join(term for i, term in enumerate(terms) if term not in terms[:i])
+
+
+def update_index(user):
+    """Writes the user's search text to the FTS table. The other backends index the column itself."""
+    if connection.vendor == 'sqlite':
+        connection.cursor().execute('INSERT OR REPLACE INTO %s (rowid, search_text) VALUES (%%s, %%s)' % (
+            SEARCH_TABLE
+        ), [user.pk, user.search_text])
+
+
+def remove_from_index(user):
+    if connection.vendor == 'sqlite':
+        connection.cursor().execute('DELETE FROM %s WHERE rowid = %%s' % SEARCH_TABLE, [user.pk])
+
+
+def rebuild_index():
+    """Recomputes every user's search text and reindexes it, i.e. after users were bulk created."""
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+
+    for user in User.objects.only('id', *SEARCH_FIELDS).iterator():
+        User.objects.filter(pk=user.pk).update(search_text=get_search_text(user))
+
+    if connection.vendor == 'sqlite':
+        cursor = connection.cursor()
+        cursor.execute('DELETE FROM %s' % SEARCH_TABLE)
+        cursor.execute('INSERT INTO %s (rowid, search_text) SELECT id, search_text FROM accounts_user' % (
+            SEARCH_TABLE
+        ))
+
+
+def search(users, query):
+    """
+    Filters a queryset of users down to those matching every term of the query, best matches first.
+    An empty query leaves the queryset unchanged.
+    """
+    terms = normalize(query).split()
+
+    if not terms:
+        return users
+
+    if connection.vendor == 'sqlite':
+        indexed = [term for term in terms if len(term) >= TRIGRAM_LENGTH]
+
+        if indexed:
+            # Terms are alphanumeric after normalizing, so they are safe to quote as phrases...
+            users = users.extra(
+                tables=[SEARCH_TABLE],
+                select={'search_rank': '%s.rank' % SEARCH_TABLE},
+                where=['%s.rowid = accounts_user.id' % SEARCH_TABLE, '%s MATCH %%s' % SEARCH_TABLE],
+                params=[' '.join('"%s"' % term for term in indexed)],
+                order_by=['search_rank']
+            )
+
+            terms = [term for term in terms if len(term) < TRIGRAM_LENGTH]
+
+    if terms:
+        users = users.extra(
+            where=['accounts_user.search_text LIKE %s'] * len(terms),
+            params=['%%%s%%' % term for term in terms]
+        )
+
+    if connection.vendor == 'postgresql':
+        users = users.extra(
+            select={'search_rank': 'similarity(accounts_user.search_text, %s)'},
+            select_params=[' '.join(terms)],
+            order_by=['-search_rank']
+        )
+
+    return users
@@ -0,0 +1,34 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+# Local imports...
+from .search import SEARCH_FIELDS
+from .search import get_search_text
+from .search import remove_from_index
+from .search import update_index
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def index_user(sender, instance, raw, update_fields, **kwargs):
+    """Keeps the search index in sync with the user's name and email."""
+    if update_fields and not set(SEARCH_FIELDS).intersection(update_fields):
+        return
+
+    # Fixtures are loaded without calling save(), so the search column has to be filled in here...
+    if raw:
+        instance.search_text = get_search_text(instance)
+        sender.objects.filter(pk=instance.pk).update(search_text=instance.search_text)
+
+    update_index(instance)
+
+
+@receiver(post_delete, sender=User)
+def unindex_user(sender, instance, **kwargs):
+    remove_from_index(instance)
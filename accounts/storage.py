@@ -0,0 +1,70 @@
+"""
+Content-addressed media storage.
+
+Files are stored under the SHA-1 of their content (i.e. photos/<sha1>.jpg), so identical uploads
+share one file and a stored file never changes. That lets the files be served with far-future,
+immutable cache headers. Files derived from stored ones, i.e. thumbnails, keep the names they are
+given, which are made from the SHA-1 of their source, so that they can be found again without being
+made again.
+"""
+
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import hashlib
+import os
+import posixpath
+import re
+
+# Django imports...
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+
+# How long browsers and caches may keep content-addressed files, in seconds...
+MEDIA_CACHE_MAX_AGE = getattr(settings, 'MEDIA_CACHE_MAX_AGE', 365 * 24 * 60 * 60)
+
+CONTENT_ADDRESSED_NAME = re.compile(r'(^|/)[0-9a-f]{40}(\.[^/]*)?$')
+
+# The names of thumbnails, after the hash of their source and their size (see accounts.thumbnails)...
+DERIVED_NAME = re.compile(r'(^|/)thumbnails/[0-9a-f]{40}_[0-9]+\.jpg$')
+
+
+def get_content_hash(content):
+    sha1 = hashlib.sha1()
+
+    for chunk in content.chunks():
+        sha1.update(chunk)
+
+    return sha1.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_content_name(self, name, content):
+        """Gets the name of the content: its hash, in the directory and with the extension of name."""
+        directory, filename = posixpath.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+
+        return posixpath.join(directory, get_content_hash(content) + extension)
+
+    def _save(self, name, content):
+        # Thumbnails are looked up by the name they were given, so renaming them would hide them...
+        if not DERIVED_NAME.search(name):
+            name = self.get_content_name(name, content)
+
+        # Identical content is already stored under the same name...
+        if self.exists(name):
+            return name
+
+        return super(ContentAddressedStorage, self)._save(name, content)
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """Serves media files like django.views.static.serve, letting content-addressed files be cached forever."""
+    response = serve(request, path, document_root=document_root, show_indexes=show_indexes)
+
+    if response.status_code in (200, 304) and (CONTENT_ADDRESSED_NAME.search(path) or DERIVED_NAME.search(path)):
+        patch_cache_control(response, public=True, max_age=MEDIA_CACHE_MAX_AGE, immutable=True)
+
+    return response
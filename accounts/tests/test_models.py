@@ -1,5 +1,8 @@
 __author__ = 'jason.parent@carneylabs.com (Jason Parent)'
 
+# Third-party imports...
+from mock import patch
+
 # Django imports...
 from django.contrib.auth import get_user_model
 from django.test import TestCase
@@ -18,4 +21,19 @@ class UserModelTest(TestCase):
         )
 
         self.assertEqual(unicode(user), user.get_full_name())
-        self.assertEqual(unicode(user), 'John Carney')
\ No newline at end of file
+        self.assertEqual(unicode(user), 'John Carney')
+
+    def test_user_caches_photo_url_until_saved(self):
+        user = User.objects.create_user('john', 'john@carneylabs.com', 'password')
+        storage = User._meta.get_field('photo').storage
+
+        with patch.object(storage, 'url', side_effect=lambda name: '/media/' + name) as mock_url:
+            self.assertEqual(user.photo_url, '/media/photos/no-image.jpg')
+            self.assertEqual(user.photo_small_url, '/media/photos/no-image.jpg')
+            self.assertEqual(mock_url.call_count, 1)
+
+            user.photo = 'photos/john.jpg'
+            user.save()
+
+            self.assertEqual(user.photo_url, '/media/photos/john.jpg')
+            self.assertEqual(mock_url.call_count, 2)
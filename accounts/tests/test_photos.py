@@ -0,0 +1,162 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import datetime
+import struct
+from io import BytesIO
+
+# Third-party imports...
+from mock import patch
+from PIL import Image
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+# Local imports...
+from ..forms import ProfileForm
+from ..models import PhotoJob
+from ..photos import process_photo_jobs
+from ..thumbnails import THUMBNAIL_SIZES
+from .test_thumbnails import MediaTestCase
+from .test_thumbnails import create_photo
+
+User = get_user_model()
+
+
+def create_jpeg(size=(40, 20), orientation=6):
+    """Creates a JPEG upload whose EXIF data asks for it to be rotated 90 degrees clockwise."""
+    exif = 'Exif\x00\x00II*\x00\x08\x00\x00\x00\x01\x00' + struct.pack('<HHIHH', 0x0112, 3, 1, orientation, 0)
+
+    output = BytesIO()
+    Image.new('RGB', size, (255, 0, 0)).save(output, 'JPEG', exif=exif + '\x00\x00\x00\x00')
+
+    return SimpleUploadedFile('photo.jpg', output.getvalue(), content_type='image/jpeg')
+
+
+class PhotoJobTest(MediaTestCase):
+    def setUp(self):
+        super(PhotoJobTest, self).setUp()
+
+        # The profile form requires an address...
+        self.data = {'address': '6586 Bollinger Rd'}
+
+    def upload(self, photo):
+        form = ProfileForm(instance=self.user, data=self.data, files={'photo': photo})
+
+        self.assertTrue(form.is_valid())
+
+        return form.save()
+
+    def test_profile_form_queues_uploaded_photo(self):
+        user = self.upload(create_photo())
+        job = PhotoJob.objects.get(user=user)
+
+        self.assertEqual(job.status, 'P')
+        self.assertEqual(job.photo, user.photo.name)
+        self.assertFalse(user.photo_small)
+        self.assertEqual(user.photo_small_url, user.photo_url)
+
+    def test_profile_form_does_not_queue_unchanged_photo(self):
+        self.upload(create_photo())
+
+        form = ProfileForm(instance=self.user, data=self.data)
+        form.is_valid()
+        form.save()
+
+        self.assertEqual(PhotoJob.objects.count(), 1)
+
+    def test_processes_photo_and_thumbnails(self):
+        original = self.upload(create_photo()).photo.name
+
+        self.assertEqual(process_photo_jobs(), 1)
+
+        user = User.objects.get(pk=self.user.pk)
+
+        self.assertTrue(user.photo.name.endswith('.jpg'))
+        self.assertFalse(self.storage.exists(original))
+        self.assertGreater(user.modified, self.user.modified)
+        self.assertEqual(PhotoJob.objects.get().status, 'D')
+
+        for field, size in THUMBNAIL_SIZES:
+            self.assertTrue(self.storage.exists(getattr(user, field).name))
+
+    def test_rotates_photo_and_strips_exif(self):
+        self.upload(create_jpeg())
+        process_photo_jobs()
+
+        image = Image.open(self.storage.open(User.objects.get(pk=self.user.pk).photo.name))
+
+        self.assertEqual(image.size, (20, 40))
+        self.assertNotIn('exif', image.info)
+
+    @patch('accounts.photos.PHOTO_MAX_SIZE', 100)
+    def test_scales_down_large_photo(self):
+        self.upload(create_photo(size=(400, 300)))
+        process_photo_jobs()
+
+        image = Image.open(self.storage.open(User.objects.get(pk=self.user.pk).photo.name))
+
+        self.assertEqual(image.size, (100, 75))
+
+    def test_skips_replaced_photo(self):
+        first = self.upload(create_photo()).photo.name
+        second = self.upload(create_photo(color=(0, 0, 255))).photo.name
+
+        self.assertEqual(process_photo_jobs(), 2)
+
+        self.assertTrue(self.storage.exists(first))
+        self.assertNotEqual(User.objects.get(pk=self.user.pk).photo.name, second)
+
+    def test_records_failure_for_broken_photo(self):
+        name = self.storage.save('photos/broken.png', ContentFile('not an image'))
+        User.objects.filter(pk=self.user.pk).update(photo=name)
+        job = PhotoJob.objects.create(user=self.user, photo=name)
+
+        process_photo_jobs()
+
+        job = PhotoJob.objects.get(pk=job.pk)
+
+        self.assertEqual(job.status, 'F')
+        self.assertTrue(job.error)
+        self.assertEqual(User.objects.get(pk=self.user.pk).photo.name, name)
+
+    def test_records_failure_for_any_error(self):
+        self.upload(create_photo())
+
+        with patch('accounts.photos.generate_thumbnails', side_effect=ValueError('bad palette')):
+            process_photo_jobs()
+
+        job = PhotoJob.objects.get()
+
+        self.assertEqual(job.status, 'F')
+        self.assertEqual(job.error, 'ValueError: bad palette')
+
+    def test_claim_skips_running_jobs(self):
+        job = PhotoJob.objects.create(user=self.user, photo='photos/photo.png')
+
+        self.assertEqual(PhotoJob.objects.claim(), job)
+        self.assertIsNone(PhotoJob.objects.claim())
+
+    def test_requeues_stale_jobs(self):
+        job = PhotoJob.objects.create(user=self.user, photo='photos/photo.png', status='R', attempts=1)
+
+        self.assertEqual(PhotoJob.objects.requeue_stale(datetime.timedelta(minutes=10), 3), 0)
+        self.assertEqual(PhotoJob.objects.requeue_stale(datetime.timedelta(0), 3), 1)
+        self.assertEqual(PhotoJob.objects.claim(), job)
+        self.assertEqual(PhotoJob.objects.get().attempts, 2)
+
+    def test_fails_stale_jobs_after_max_attempts(self):
+        PhotoJob.objects.create(user=self.user, photo='photos/photo.png', status='R', attempts=3)
+
+        self.assertEqual(PhotoJob.objects.requeue_stale(datetime.timedelta(0), 3), 0)
+        self.assertEqual(PhotoJob.objects.get().status, 'F')
+
+    def test_command_processes_pending_photos(self):
+        self.upload(create_photo())
+
+        call_command('process_photos', once=True, stdout=BytesIO())
+
+        self.assertEqual(PhotoJob.objects.get().status, 'D')
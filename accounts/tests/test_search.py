@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Third-party imports...
+from mock import patch
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+# Local imports...
+from ..search import normalize
+from ..search import rebuild_index
+from ..search import search
+
+User = get_user_model()
+
+
+class NormalizeTest(TestCase):
+    def test_normalize_lowercases_and_strips_punctuation(self):
+        self.assertEqual(normalize('Regina.McDonalid93@Example.com'), 'regina mcdonalid93 example com')
+
+    def test_normalize_strips_accents(self):
+        self.assertEqual(normalize(u'Zoë Ångström'), 'zoe angstrom')
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        self.regina = User.objects.create_user(
+            first_name='Regina',
+            last_name='McDonald',
+            username='regina.mcdonalid93@example.com',
+            email='regina.mcdonalid93@example.com',
+            password='password1'
+        )
+
+        self.travis = User.objects.create_user(
+            first_name='Travis',
+            last_name='Mills',
+            username='travis.mills57@example.com',
+            email='travis.mills57@example.com',
+            password='password1'
+        )
+
+    def test_search_text_is_set_on_save(self):
+        self.assertEqual(self.travis.search_text, 'travis mills mills57 example com')
+
+    def test_search_matches_prefixes_of_any_field(self):
+        self.assertListEqual([self.regina], list(search(User.objects.all(), 'regi')))
+        self.assertListEqual([self.travis], list(search(User.objects.all(), 'mills57')))
+
+    def test_search_matches_substrings_within_words(self):
+        self.assertListEqual([self.regina], list(search(User.objects.all(), 'donald')))
+        self.assertListEqual([self.travis], list(search(User.objects.all(), 'ravi ills')))
+
+    def test_search_matches_terms_shorter_than_a_trigram(self):
+        self.assertListEqual([self.regina], list(search(User.objects.all(), 'cd')))
+        self.assertListEqual([self.travis], list(search(User.objects.all(), 'mills 7')))
+
+    def test_search_matches_the_same_users_without_the_index(self):
+        queries = ['regi', 'donald', 'cd', 'mills 7', 'example', 'xyz']
+        indexed = [set(search(User.objects.all(), query)) for query in queries]
+
+        with patch.object(connection, 'vendor', 'mysql'):
+            scanned = [set(search(User.objects.all(), query)) for query in queries]
+
+        self.assertListEqual(indexed, scanned)
+
+    def test_search_requires_every_term(self):
+        self.assertListEqual([self.regina], list(search(User.objects.all(), 'example regina')))
+
+    def test_search_ranks_better_matches_first(self):
+        User.objects.create_user(
+            first_name='Millsaps',
+            username='millsaps@example.com',
+            email='millsaps@example.com',
+            password='password1'
+        )
+
+        self.assertEqual(search(User.objects.all(), 'mills')[0], self.travis)
+
+    def test_empty_search_returns_all_users(self):
+        self.assertEqual(search(User.objects.all(), ' ').count(), 2)
+
+    def test_search_reflects_renamed_user(self):
+        self.travis.first_name = 'Trevor'
+        self.travis.save()
+
+        self.assertListEqual([self.travis], list(search(User.objects.all(), 'trevor')))
+
+    def test_search_skips_deleted_user(self):
+        self.travis.delete()
+
+        self.assertListEqual([], list(search(User.objects.all(), 'travis')))
+
+    def test_rebuild_index_indexes_bulk_created_users(self):
+        User.objects.bulk_create([User(username='brandon.jacobs96@example.com', first_name='Brandon')])
+
+        self.assertListEqual([], list(search(User.objects.all(), 'brandon')))
+
+        rebuild_index()
+
+        self.assertEqual(search(User.objects.all(), 'brandon').get().first_name, 'Brandon')
@@ -0,0 +1,84 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import os
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test.client import RequestFactory
+
+# Local imports...
+from ..forms import ProfileForm
+from ..photos import process_photo_jobs
+from ..storage import ContentAddressedStorage
+from ..storage import serve_media
+from ..thumbnails import generate_thumbnails
+from .test_thumbnails import MediaTestCase
+from .test_thumbnails import create_photo
+
+User = get_user_model()
+
+
+class ContentAddressedStorageTest(MediaTestCase):
+    storage_class = ContentAddressedStorage
+
+    def test_names_files_after_content(self):
+        name = self.storage.save('photos/Photo.PNG', ContentFile('content'))
+
+        self.assertEqual(name, 'photos/040f06fd774092478d450774f5ba30c5da78acc8.png')
+
+    def test_stores_identical_content_once(self):
+        first = self.storage.save('photos/first.png', ContentFile('content'))
+        second = self.storage.save('photos/second.png', ContentFile('content'))
+        other = self.storage.save('photos/first.png', ContentFile('other content'))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(len(os.listdir(os.path.join(self.media_root, 'photos'))), 2)
+
+    def test_keeps_thumbnail_names(self):
+        digest = 'a' * 40
+        name = self.storage.save('photos/thumbnails/%s_55.jpg' % digest, ContentFile('content'))
+
+        self.assertEqual(name, 'photos/thumbnails/%s_55.jpg' % digest)
+
+    def test_keeps_photo_shared_with_other_user(self):
+        regina = User.objects.create_user('regina', 'regina@example.com', 'password1')
+
+        for user in (self.user, regina):
+            form = ProfileForm(instance=user, data={'address': '6586 Bollinger Rd'}, files={
+                'photo': create_photo()
+            })
+            form.is_valid()
+            form.save()
+
+        self.assertEqual(self.user.photo.name, regina.photo.name)
+
+        # Process the first user's photo only...
+        process_photo_jobs(limit=1)
+
+        self.assertTrue(self.storage.exists(regina.photo.name))
+
+    def test_serves_content_addressed_files_as_immutable(self):
+        name = self.storage.save('photos/photo.png', ContentFile('content'))
+
+        # The default photo is not content-addressed, so it may be replaced...
+        with open(os.path.join(self.media_root, 'photos', 'no-image.jpg'), 'wb') as f:
+            f.write('content')
+
+        request = RequestFactory().get('/media/')
+
+        response = serve_media(request, name, document_root=self.media_root)
+
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+
+        thumbnail = generate_thumbnails(create_photo())['photo_small']
+        response = serve_media(request, thumbnail, document_root=self.media_root)
+
+        self.assertIn('immutable', response['Cache-Control'])
+
+        response = serve_media(request, 'photos/no-image.jpg', document_root=self.media_root)
+
+        self.assertFalse(response.has_header('Cache-Control'))
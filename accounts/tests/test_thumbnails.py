@@ -0,0 +1,100 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import shutil
+import tempfile
+from io import BytesIO
+
+# Third-party imports...
+from mock import patch
+from PIL import Image
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+# Local imports...
+from ..storage import ContentAddressedStorage
+from ..thumbnails import THUMBNAIL_SIZES
+from ..thumbnails import generate_thumbnails
+
+User = get_user_model()
+
+
+def create_photo(size=(400, 300), mode='RGB', color=(255, 0, 0), name='photo.png'):
+    output = BytesIO()
+    Image.new(mode, size, color).save(output, 'PNG')
+
+    return SimpleUploadedFile(name, output.getvalue(), content_type='image/png')
+
+
+class MediaTestCase(TestCase):
+    """Writes photos and thumbnails to a temporary media root."""
+
+    storage_class = FileSystemStorage
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.storage = self.storage_class(location=self.media_root, base_url='/media/')
+
+        for field in ['photo'] + [field for field, size in THUMBNAIL_SIZES]:
+            patcher = patch.object(User._meta.get_field(field), 'storage', self.storage)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(
+            username='john.carney@carneylabs.com',
+            email='john.carney@carneylabs.com',
+            password='password1'
+        )
+
+        # The profile form requires an address...
+        self.data = {'address': '6586 Bollinger Rd'}
+
+    def tearDown(self):
+        shutil.rmtree(self.media_root)
+
+
+class ThumbnailTest(MediaTestCase):
+    def test_generates_square_thumbnails_of_each_size(self):
+        names = generate_thumbnails(create_photo())
+
+        for field, size in THUMBNAIL_SIZES:
+            image = Image.open(self.storage.open(names[field]))
+
+            self.assertEqual(image.format, 'JPEG')
+            self.assertEqual(image.size, (size, size))
+
+    def test_names_thumbnails_after_source_content(self):
+        names = generate_thumbnails(create_photo(name='first.png'))
+
+        self.assertEqual(generate_thumbnails(create_photo(name='second.png')), names)
+        self.assertNotEqual(generate_thumbnails(create_photo(color=(0, 0, 255))), names)
+
+    def test_reuses_existing_thumbnails(self):
+        generate_thumbnails(create_photo())
+
+        with patch.object(self.storage, 'save') as mock_save:
+            generate_thumbnails(create_photo())
+
+        self.assertFalse(mock_save.called)
+
+    def test_places_transparent_photos_on_white(self):
+        names = generate_thumbnails(create_photo(mode='RGBA', color=(0, 0, 0, 0)))
+        image = Image.open(self.storage.open(names['photo_small']))
+
+        self.assertEqual(image.mode, 'RGB')
+        self.assertGreater(min(image.getpixel((27, 27))), 250)
+
+    def test_thumbnail_urls_fall_back_to_photo(self):
+        self.assertEqual(self.user.photo_small_url, self.user.photo_url)
+        self.assertEqual(self.user.photo_small_2x_url, self.user.photo_url)
+        self.assertEqual(self.user.photo_profile_url, self.user.photo_url)
+
+
+class ContentAddressedThumbnailTest(ThumbnailTest):
+    """Runs the thumbnail tests against the storage that the site uses, which renames what it stores."""
+
+    storage_class = ContentAddressedStorage
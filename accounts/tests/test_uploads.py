@@ -0,0 +1,131 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+from io import BytesIO
+
+# Third-party imports...
+from mock import patch
+from PIL import Image
+from PIL.JpegImagePlugin import JpegImageFile
+
+# Django imports...
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import SkipFile
+from django.http import HttpRequest
+from django.test import Client
+
+# Local imports...
+from ..models import PhotoJob
+from ..photos import clean_photo
+from ..uploads import PhotoUploadHandler
+from ..uploads import UPLOAD_ERRORS
+from ..uploads import get_image_size
+from .test_thumbnails import MediaTestCase
+from .test_thumbnails import create_photo
+
+# An IM header whose size PIL fails to parse with a ValueError rather than an IOError...
+BROKEN_HEADER = b'Image type: RGB image\r\nName: x\r\nImage size (x*y): 1*\r\n\x1a'
+
+
+def receive(handler, content, chunk_size=1024):
+    handler.new_file('photo', 'photo.png', 'image/png', len(content))
+
+    for start in range(0, len(content), chunk_size):
+        handler.receive_data_chunk(content[start:start + chunk_size], start)
+
+    return handler.file_complete(len(content))
+
+
+class PhotoUploadHandlerTest(MediaTestCase):
+    def setUp(self):
+        super(PhotoUploadHandlerTest, self).setUp()
+
+        self.request = HttpRequest()
+        self.handler = PhotoUploadHandler(self.request)
+
+        self.client = Client()
+        self.client.login(username='john.carney@carneylabs.com', password='password1')
+
+    def test_reads_dimensions_from_header(self):
+        content = create_photo(size=(400, 300)).read()
+
+        self.assertEqual(get_image_size(content[:100]), (400, 300))
+        self.assertIsNone(get_image_size(content[:10]))
+
+    def test_ignores_broken_header(self):
+        self.assertIsNone(get_image_size(BROKEN_HEADER))
+
+        photo = receive(self.handler, BROKEN_HEADER + b'\x00' * 4000)
+
+        self.assertIsInstance(photo, TemporaryUploadedFile)
+        self.assertFalse(hasattr(self.request, 'upload_errors'))
+
+    def test_spools_photo_to_disk(self):
+        photo = receive(self.handler, create_photo().read())
+
+        self.assertIsInstance(photo, TemporaryUploadedFile)
+        self.assertEqual(Image.open(photo.temporary_file_path()).size, (400, 300))
+
+    @patch('accounts.uploads.PHOTO_MAX_BYTES', 2000)
+    def test_skips_photo_once_past_byte_limit(self):
+        content = create_photo().read() + b'\x00' * 4000
+
+        with self.assertRaises(SkipFile):
+            receive(self.handler, content)
+
+        self.assertEqual(self.handler.size, 2048)
+        self.assertEqual(self.request.upload_errors, {'photo': UPLOAD_ERRORS['photo_too_large']})
+
+    @patch('accounts.uploads.PHOTO_MAX_PIXELS', 1000)
+    def test_skips_photo_on_reading_header_past_pixel_limit(self):
+        content = create_photo().read() + b'\x00' * 4000
+
+        with self.assertRaises(SkipFile):
+            receive(self.handler, content)
+
+        self.assertEqual(self.handler.size, 1024)
+        self.assertEqual(self.request.upload_errors, {'photo': UPLOAD_ERRORS['photo_too_many_pixels']})
+
+    @patch('accounts.uploads.PHOTO_MAX_PIXELS', 1000)
+    def test_profile_edit_shows_upload_errors(self):
+        response = self.client.post('/profile/edit/', {
+            'address': '6586 Bollinger Rd',
+            'photo': create_photo()
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(UPLOAD_ERRORS['photo_too_many_pixels'], response.content)
+        self.assertFalse(PhotoJob.objects.exists())
+
+    def test_profile_edit_rejects_broken_photo(self):
+        photo = BytesIO(BROKEN_HEADER + b'\x00' * 4000)
+        photo.name = 'photo.im'
+
+        response = self.client.post('/profile/edit/', {
+            'address': '6586 Bollinger Rd',
+            'photo': photo
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('photo', response.context['form'].errors)
+        self.assertFalse(PhotoJob.objects.exists())
+
+    def test_profile_edit_queues_photo_within_limits(self):
+        response = self.client.post('/profile/edit/', {
+            'address': '6586 Bollinger Rd',
+            'photo': create_photo()
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(PhotoJob.objects.exists())
+
+    def test_decodes_jpeg_in_draft_mode(self):
+        output = BytesIO()
+        Image.new('RGB', (2048, 1536)).save(output, 'JPEG')
+
+        with patch.object(JpegImageFile, 'draft', autospec=True, side_effect=JpegImageFile.draft) as mock_draft:
+            with patch('accounts.photos.PHOTO_MAX_SIZE', 256):
+                image = Image.open(BytesIO(clean_photo(output.getvalue())))
+
+        self.assertTrue(mock_draft.called)
+        self.assertEqual(image.size, (256, 192))
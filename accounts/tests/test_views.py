@@ -9,6 +9,7 @@ from django.contrib.auth import get_user_model
 from django.http import HttpRequest
 from django.test.client import RequestFactory
 from django.test import TestCase
+from django.utils import timezone
 
 # Local imports...
 from ..views import home_view
@@ -214,11 +215,33 @@ class ProfileViewTest(TestCase):
         request = self.factory.get('/profile/')
         request.user = Mock()
         request.user.return_value.is_authenticated.return_value = True
+        request.user.modified = timezone.now()
 
         response = profile_view(request)
 
         self.assertTemplateUsed(response, 'accounts/profile.html')
 
+    def test_profile_view_returns_not_modified_until_profile_changes(self):
+        user = User.objects.create_user(
+            username='john.carney@carneylabs.com',
+            email='john.carney@carneylabs.com',
+            password='password1'
+        )
+
+        request = self.factory.get('/profile/')
+        request.user = user
+        etag = profile_view(request)['ETag']
+
+        request = self.factory.get('/profile/', HTTP_IF_NONE_MATCH=etag)
+        request.user = user
+
+        self.assertEqual(profile_view(request).status_code, 304)
+
+        user.first_name = 'John'
+        user.save()
+
+        self.assertEqual(profile_view(request).status_code, 200)
+
 
 class ProfileEditViewTest(TestCase):
     def setUp(self):
@@ -227,6 +250,9 @@ class ProfileEditViewTest(TestCase):
         self.request = self.factory.post('/profile/edit/', {'photo': 'photo'})
         self.request.user = self.user
 
+        # Skip the CSRF check, like the test client does...
+        self.request._dont_enforce_csrf_checks = True
+
     def test_profile_edit_view_renders_profile_edit_template(self):
         request = self.factory.get('/profile/edit/')
         request.user = User.objects.create_user(
@@ -0,0 +1,110 @@
+"""
+Fixed-size thumbnails of accounts.User photos.
+
+Avatars are displayed at 55x55 (110x110 on high density screens) and at 120x120 on the profile page,
+so each upload is cropped and scaled to those sizes once, instead of every page shipping the
+original. Thumbnails are stored next to the originals and named after a hash of the source image,
+so uploading the same photo again reuses the files that already exist. (ContentAddressedStorage
+keeps those names, rather than renaming the thumbnails after their own content.)
+"""
+
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import hashlib
+from io import BytesIO
+
+# Third-party imports...
+from PIL import Image
+from PIL import ImageOps
+
+# Django imports...
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+
+# The User field that holds each thumbnail, and its width and height in pixels...
+THUMBNAIL_SIZES = (
+    ('photo_small', 55),
+    ('photo_small_2x', 110),
+    ('photo_profile', 120)
+)
+
+THUMBNAIL_DIR = 'photos/thumbnails'
+
+THUMBNAIL_QUALITY = getattr(settings, 'THUMBNAIL_QUALITY', 85)
+
+
+def get_thumbnail_name(digest, size):
+    return '%s/%s_%d.jpg' % (THUMBNAIL_DIR, digest, size)
+
+
+def flatten(image):
+    """Converts an image to RGB, placing any transparent parts on a white background."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+
+        return background
+
+    return image.convert('RGB')
+
+
+def make_thumbnail(image, size):
+    """Crops an image to a centered square and scales it down to size x size, as JPEG data."""
+    thumbnail = ImageOps.fit(image, (size, size), Image.ANTIALIAS)
+
+    output = BytesIO()
+    thumbnail.save(output, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+
+    return output.getvalue()
+
+
+def generate_thumbnails(photo):
+    """
+    Writes the thumbnails of a photo (an uploaded file or a stored one) and gets their names, keyed
+    by the User field that holds each one. Raises an IOError if the photo is not an image.
+    """
+    photo.seek(0)
+    content = photo.read()
+    digest = hashlib.sha1(content).hexdigest()
+    image = None
+    largest = max(size for field, size in THUMBNAIL_SIZES)
+
+    User = get_user_model()
+    names = {}
+
+    for field, size in THUMBNAIL_SIZES:
+        storage = User._meta.get_field(field).storage
+        name = get_thumbnail_name(digest, size)
+
+        if not storage.exists(name):
+            # Only decode the source once one of its thumbnails is missing...
+            if image is None:
+                image = Image.open(BytesIO(content))
+                image.draft('RGB', (largest, largest))
+                image = flatten(image)
+
+            name = storage.save(name, ContentFile(make_thumbnail(image, size)))
+
+        names[field] = name
+
+    return names
+
+
+def update_thumbnails(user):
+    """Points the user's thumbnail fields at thumbnails of the current photo, or clears them."""
+    if user.photo:
+        names = generate_thumbnails(user.photo)
+    else:
+        names = {}
+
+    for field, size in THUMBNAIL_SIZES:
+        setattr(user, field, names.get(field))
+
+
+def clear_thumbnails(user):
+    """Clears the user's thumbnail fields, so that the photo itself is shown instead."""
+    for field, size in THUMBNAIL_SIZES:
+        setattr(user, field, None)
@@ -0,0 +1,113 @@
+"""
+Size-bounded handling of photo uploads.
+
+PhotoUploadHandler streams each uploaded file to a temporary file on disk, so an upload never has
+to fit in memory, and drops it as soon as it is seen to be too large: once more than
+PHOTO_MAX_BYTES have arrived, or once the image header, which comes first, shows more than
+PHOTO_MAX_PIXELS pixels. The header is read without decoding the image. The reasons for dropped
+files are kept on the request as upload_errors, so that the view can show them on the form.
+"""
+
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+from io import BytesIO
+
+# Third-party imports...
+from PIL import Image
+
+# Django imports...
+from django.conf import settings
+from django.core.files.uploadhandler import SkipFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+
+PHOTO_MAX_BYTES = getattr(settings, 'PHOTO_MAX_BYTES', 10 * 1024 * 1024)
+
+PHOTO_MAX_PIXELS = getattr(settings, 'PHOTO_MAX_PIXELS', 24 * 1000 * 1000)
+
+# How much of a file to search for the image header, which follows any embedded metadata...
+PHOTO_HEADER_BYTES = getattr(settings, 'PHOTO_HEADER_BYTES', 256 * 1024)
+
+UPLOAD_ERRORS = {
+    'photo_too_large': 'The photo is too large. Photos can be up to %s.' % filesizeformat(PHOTO_MAX_BYTES),
+    'photo_too_many_pixels': 'The photo is too large. Photos can be up to %d megapixels.' % (
+        PHOTO_MAX_PIXELS // (1000 * 1000)
+    )
+}
+
+
+def get_image_size(data):
+    """
+    Gets the (width, height) of an image from the start of its data (or a file), reading only its
+    header. Returns None if the header is incomplete or the data is not an image.
+    """
+    try:
+        return Image.open(BytesIO(data) if isinstance(data, bytes) else data).size
+    except Exception:
+        # PIL raises all kinds of exceptions on broken headers, not only IOError (as Django's
+        # ImageField also allows for)...
+        return None
+
+
+def check_photo_size(size):
+    """Gets the code of the error for a photo of size bytes, or None if the size is acceptable."""
+    if size > PHOTO_MAX_BYTES:
+        return 'photo_too_large'
+
+    return None
+
+
+def check_photo_dimensions(width, height):
+    """Gets the code of the error for a photo of width x height pixels, or None if they are acceptable."""
+    if width * height > PHOTO_MAX_PIXELS:
+        return 'photo_too_many_pixels'
+
+    return None
+
+
+def get_upload_errors(request):
+    """Gets the messages of the files that PhotoUploadHandler dropped, keyed by field name."""
+    return getattr(request, 'upload_errors', {})
+
+
+class PhotoUploadHandler(TemporaryFileUploadHandler):
+    def new_file(self, field_name, *args, **kwargs):
+        super(PhotoUploadHandler, self).new_file(field_name, *args, **kwargs)
+
+        self.size = 0
+        self.header = b''
+
+    def reject(self, code):
+        if not hasattr(self.request, 'upload_errors'):
+            self.request.upload_errors = {}
+
+        self.request.upload_errors[self.field_name] = UPLOAD_ERRORS[code]
+
+        # The parser closes, and so deletes, the temporary file...
+        raise SkipFile
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+
+        code = check_photo_size(self.size)
+
+        if code:
+            self.reject(code)
+
+        # Keep the start of the file until its dimensions are known...
+        if self.header is not None:
+            self.header += raw_data
+            size = get_image_size(self.header)
+
+            if size is not None:
+                self.header = None
+                code = check_photo_dimensions(*size)
+
+                if code:
+                    self.reject(code)
+            elif len(self.header) >= PHOTO_HEADER_BYTES:
+                # Not an image the header can be read from; the form will reject it if need be...
+                self.header = None
+
+        return super(PhotoUploadHandler, self).receive_data_chunk(raw_data, start)
@@ -7,11 +7,16 @@ from django.contrib.auth.decorators import login_required
 from django.core.urlresolvers import reverse
 from django.shortcuts import redirect
 from django.shortcuts import render
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.csrf import csrf_protect
 
 # Local imports...
+from .conditions import profile_condition
 from .forms import LogInForm
 from .forms import ProfileForm
 from .forms import SignUpForm
+from .uploads import PhotoUploadHandler
+from .uploads import get_upload_errors
 
 
 def home_view(request):
@@ -58,17 +63,30 @@ def log_out_view(request):
 
 
 @login_required
+@profile_condition
 def profile_view(request):
     return render(request, 'accounts/profile.html')
 
 
+@csrf_exempt
 @login_required
 def profile_edit_view(request):
+    # The upload handlers have to be replaced before the CSRF check reads the request body...
+    request.upload_handlers = [PhotoUploadHandler(request)]
+
+    return _profile_edit_view(request)
+
+
+@csrf_protect
+def _profile_edit_view(request):
     form = ProfileForm(instance=request.user)
 
     if request.method == 'POST':
         form = ProfileForm(instance=request.user, data=request.POST, files=request.FILES)
 
+        for field, error in get_upload_errors(request).items():
+            form.add_error(field, error)
+
         if form.is_valid():
             form.save()
 
@@ -76,4 +94,4 @@ def profile_edit_view(request):
 
     return render(request, 'accounts/profile_edit.html', {
         'form': form
-    })
\ No newline at end of file
+    })
@@ -45,6 +45,7 @@ THIRD_PARTY_APPS = (
 LOCAL_APPS = (
     'accounts',
     'functional_tests',
+    'metrics',
     'recipes',
     'users',
 )
@@ -54,6 +55,7 @@ INSTALLED_APPS = DEFAULT_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 AUTH_USER_MODEL = 'accounts.User'
 
 MIDDLEWARE_CLASSES = (
+    'metrics.middleware.ProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -77,6 +79,18 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/1.7/topics/cache/
+# Friend ids are cached here. Use a shared backend (i.e. memcached) when running more than one
+# process, so that invalidation reaches every process.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'friends',
+    }
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/1.6/topics/i18n/
 
@@ -121,7 +135,42 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 MEDIA_URL = '/media/'
 
-DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
+DEFAULT_FILE_STORAGE = 'accounts.storage.ContentAddressedStorage'
+
+# The most queries each view should run, including the session and user lookups; going over is
+# logged by the metrics app...
+METRICS_QUERY_BUDGETS = {
+    'profile': 4,
+    'recipes:home': 7,
+    'recipes:search': 8,
+    'users:feed': 6,
+    'users:friends': 6,
+    'users:list': 5,
+    'users:requests': 6,
+    'users:suggestions': 6,
+    'users:api_feed': 6,
+    'users:api_friends': 6,
+    'users:api_list': 5,
+    'users:api_requests': 6,
+    'users:api_suggestions': 6,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'level': 'WARNING',
+            'class': 'logging.StreamHandler'
+        }
+    },
+    'loggers': {
+        'metrics': {
+            'handlers': ['console'],
+            'level': 'WARNING'
+        }
+    }
+}
 
 try:
     from .local_settings import *
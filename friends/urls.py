@@ -5,7 +5,6 @@ from django.conf import settings
 from django.conf.urls import include
 from django.conf.urls import patterns
 from django.conf.urls import url
-from django.conf.urls.static import static
 from django.contrib import admin
 
 admin.autodiscover()
@@ -17,10 +16,16 @@ urlpatterns = patterns('',
     url(r'^log_out/$', 'accounts.views.log_out_view', name='log_out'),
     url(r'^profile/$', 'accounts.views.profile_view', name='profile'),
     url(r'^profile/edit/$', 'accounts.views.profile_edit_view', name='profile_edit'),
+    url(r'^metrics/', include('metrics.urls', namespace='metrics')),
     url(r'^recipes/', include('recipes.urls', namespace='recipes')),
     url(r'^users/', include('users.urls', namespace='users')),
     url(r'^admin/', include(admin.site.urls)),
 )
 
 # Serves media files in development environment...
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+if settings.DEBUG:
+    urlpatterns += patterns('',
+        url(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), 'accounts.storage.serve_media', {
+            'document_root': settings.MEDIA_ROOT
+        }),
+    )
\ No newline at end of file
@@ -0,0 +1,13 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Django imports...
+from django.apps import AppConfig
+
+
+class MetricsConfig(AppConfig):
+    name = 'metrics'
+
+    def ready(self):
+        # Time database queries and template rendering...
+        from .instrumentation import install
+        install()
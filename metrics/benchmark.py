@@ -0,0 +1,123 @@
+"""
+Times the friendship pages and actions against the data in the database (see metrics.synthetic).
+
+Each benchmark is run as two users: one with the median number of friends and the one with the
+most, since the cost of most pages grows with the number of friends. The cache is cleared before
+every request, so that the timings are of the database work rather than of cache hits.
+"""
+
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import time
+from collections import Counter
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+# Local imports...
+from users.models import Friendship
+from .synthetic import PASSWORD
+
+User = get_user_model()
+
+
+def get_profiles():
+    """Gets the users to benchmark as, by name: the user with the median number of friends and the one with the most."""
+    degrees = Counter()
+
+    for sender_id, receiver_id in Friendship.objects.filter(status='A').values_list('sender_id', 'receiver_id'):
+        degrees.update((sender_id, receiver_id))
+
+    if not degrees:
+        return {}
+
+    ranked = sorted(degrees, key=lambda user_id: (degrees[user_id], user_id))
+    users = User.objects.in_bulk([ranked[len(ranked) // 2], ranked[-1]])
+
+    return {
+        'median': users[ranked[len(ranked) // 2]],
+        'hub': users[ranked[-1]]
+    }
+
+
+def log_in(user):
+    client = Client()
+
+    if not client.login(username=user.username, password=PASSWORD):
+        raise ValueError('Could not log in as %s; was the user generated?' % user.username)
+
+    return client
+
+
+def time_request(client, url):
+    """Gets the url with a cold cache, and returns the time it took in milliseconds and its query count."""
+    for cache in caches.all():
+        cache.clear()
+
+    with CaptureQueriesContext(connection) as queries:
+        start = time.time()
+        response = client.get(url)
+        duration = (time.time() - start) * 1000
+
+    if response.status_code not in (200, 302):
+        raise ValueError('Got a %d response for %s' % (response.status_code, url))
+
+    return duration, len(queries)
+
+
+def summarize(name, profile, timings):
+    durations = sorted(duration for duration, queries in timings)
+    queries = sorted(queries for duration, queries in timings)
+
+    return {
+        'name': name,
+        'profile': profile,
+        'requests': len(timings),
+        'min_ms': round(durations[0], 3),
+        'median_ms': round(durations[len(durations) // 2], 3),
+        'p90_ms': round(durations[min(len(durations) - 1, int(len(durations) * 0.9))], 3),
+        'max_ms': round(durations[-1], 3),
+        'queries': queries[len(queries) // 2]
+    }
+
+
+def run_benchmark(repeat=10):
+    """
+    Runs every benchmark repeat times as each profile user, and returns a list of summaries (the
+    timings in milliseconds and the median query count) named after the URL names.
+    """
+    results = []
+
+    for profile, user in sorted(get_profiles().items()):
+        client = log_in(user)
+        search = user.first_name.lower()
+
+        for name, url in (
+            ('users:feed', reverse('users:feed')),
+            ('users:list', '%s?search=%s' % (reverse('users:list'), search)),
+            ('users:friends', reverse('users:friends')),
+            ('users:requests', reverse('users:requests')),
+        ):
+            timings = [time_request(client, url) for i in range(repeat)]
+            results.append(summarize(name, profile, timings))
+
+        # Send requests to strangers, and have each of them accept...
+        strangers = list(Friendship.user_exclude_friends(user, User.objects.all()).order_by('pk')[:repeat])
+        added = []
+        accepted = []
+
+        for stranger in strangers:
+            added.append(time_request(client, reverse('users:add', args=[stranger.pk])))
+            accepted.append(time_request(log_in(stranger), reverse('users:accept', args=[user.pk])))
+
+        if strangers:
+            results.append(summarize('users:add', profile, added))
+            results.append(summarize('users:accept', profile, accepted))
+
+    return results
@@ -0,0 +1,74 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import bisect
+import math
+
+# The upper bounds of the buckets (0, 1, 2, 5, 10, 20, 50, ...), which suit milliseconds, counts and
+# bytes alike; larger values fall into a final, unbounded bucket...
+BUCKETS = (0,) + tuple(m * 10 ** e for e in range(8) for m in (1, 2, 5))
+
+PERCENTILES = (50, 90, 99)
+
+
+class Histogram(object):
+    """
+    Counts values into fixed buckets, so that histograms take constant space however many values
+    they count, merge by adding counts and estimate percentiles to within a bucket.
+    """
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+
+        for value in (other.minimum, other.maximum):
+            if value is not None:
+                self.minimum = value if self.minimum is None else min(self.minimum, value)
+                self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def percentile(self, percent):
+        """Estimates the value below which the percent of values fall, as the upper bound of its bucket."""
+        if not self.count:
+            return None
+
+        rank = max(1, int(math.ceil(self.count * percent / 100.0)))
+        seen = 0
+
+        for index, count in enumerate(self.counts):
+            seen += count
+
+            if seen >= rank:
+                break
+
+        # Never estimate past the largest value seen...
+        return min(BUCKETS[index], self.maximum) if index < len(BUCKETS) else self.maximum
+
+    def to_dict(self):
+        data = {
+            'count': self.count,
+            'mean': float(self.total) / self.count if self.count else None,
+            'min': self.minimum,
+            'max': self.maximum,
+            'buckets': [
+                [BUCKETS[index] if index < len(BUCKETS) else None, count]
+                for index, count in enumerate(self.counts) if count
+            ]
+        }
+
+        data.update(('p%d' % percent, self.percentile(percent)) for percent in PERCENTILES)
+
+        return data
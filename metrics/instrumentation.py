@@ -0,0 +1,96 @@
+"""
+Times the database queries and template rendering of the request being recorded, and checks the
+queries for slow and duplicate ones (see metrics.queries).
+
+Django 1.7 has no hooks for either, so install() wraps the cursors that database connections hand
+out and Template.render. Outside of a recorded request, both cost a thread-local lookup.
+"""
+
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import time
+from functools import wraps
+
+# Django imports...
+from django.db.backends import BaseDatabaseWrapper
+from django.db.backends.utils import CursorWrapper
+from django.template.base import Template
+
+# Local imports...
+from .queries import check_query
+from .recorder import get_record
+
+
+class TimedCursorWrapper(CursorWrapper):
+    """Adds the queries run through the cursor, and the time they take, to a request record."""
+    def __init__(self, cursor, db, record):
+        super(TimedCursorWrapper, self).__init__(cursor, db)
+
+        self.record = record
+
+    def execute(self, sql, params=None):
+        start = time.time()
+
+        try:
+            return super(TimedCursorWrapper, self).execute(sql, params)
+        finally:
+            self.add_query(sql, time.time() - start)
+
+    def executemany(self, sql, param_list):
+        start = time.time()
+
+        try:
+            return super(TimedCursorWrapper, self).executemany(sql, param_list)
+        finally:
+            self.add_query(sql, time.time() - start)
+
+    def add_query(self, sql, duration):
+        self.record.add_query(duration)
+        check_query(self.record, sql, duration)
+
+
+def instrument_cursor(cursor):
+    @wraps(cursor)
+    def wrapper(self):
+        record = get_record()
+
+        if record is None:
+            return cursor(self)
+
+        return TimedCursorWrapper(cursor(self), self, record)
+
+    wrapper.instrumented = True
+
+    return wrapper
+
+
+def instrument_render(render):
+    @wraps(render)
+    def wrapper(self, context):
+        record = get_record()
+
+        # Included templates are rendered within their parent, so only time the outermost one...
+        if record is None or record.rendering:
+            return render(self, context)
+
+        record.rendering = True
+        start = time.time()
+
+        try:
+            return render(self, context)
+        finally:
+            record.render_time += time.time() - start
+            record.rendering = False
+
+    wrapper.instrumented = True
+
+    return wrapper
+
+
+def install():
+    if not getattr(BaseDatabaseWrapper.cursor, 'instrumented', False):
+        BaseDatabaseWrapper.cursor = instrument_cursor(BaseDatabaseWrapper.cursor)
+
+    if not getattr(Template.render, 'instrumented', False):
+        Template.render = instrument_render(Template.render)
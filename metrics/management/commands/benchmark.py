@@ -0,0 +1,105 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import json
+import subprocess
+import time
+from optparse import make_option
+
+# Django imports...
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.test.utils import setup_test_environment
+from django.test.utils import teardown_test_environment
+from django.utils import timezone
+
+# Local imports...
+from metrics.benchmark import run_benchmark
+from metrics.synthetic import generate
+
+# A fast hasher, so that logging in the benchmark users doesn't dominate the run...
+BENCHMARK_HASHERS = ('django.contrib.auth.hashers.MD5PasswordHasher',)
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.STDOUT).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Times the friendship pages and actions on synthetic data at several scales, and writes the '
+        'results as JSON for comparison across commits. Each scale is run in a new test database.'
+    )
+
+    option_list = BaseCommand.option_list + (
+        make_option('--scales', default='100,1000',
+                    help='Comma separated numbers of users to benchmark with.'),
+        make_option('--repeat', type='int', default=10,
+                    help='The number of times to time each request.'),
+        make_option('--degree', type='float', default=10,
+                    help='The average number of friendships per user.'),
+        make_option('--recipes', type='int', default=2,
+                    help='The average number of recipes per user.'),
+        make_option('--seed', type='int', default=0,
+                    help='The seed of the random data.'),
+        make_option('--output',
+                    help='The file to write the results to, instead of standard output.'),
+    )
+
+    def handle(self, *args, **options):
+        try:
+            scales = [int(scale) for scale in options['scales'].split(',')]
+        except ValueError:
+            raise CommandError('--scales must be a comma separated list of numbers.')
+
+        # Let the test client through ALLOWED_HOSTS, like the test runner does...
+        setup_test_environment()
+
+        try:
+            results = {
+                'commit': get_commit(),
+                'date': timezone.now().isoformat(),
+                'vendor': connection.vendor,
+                'repeat': options['repeat'],
+                'scales': [self.run_scale(scale, options) for scale in scales]
+            }
+        finally:
+            teardown_test_environment()
+
+        content = json.dumps(results, indent=2, sort_keys=True)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(content)
+        else:
+            self.stdout.write(content)
+
+    def run_scale(self, users, options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+        try:
+            with override_settings(PASSWORD_HASHERS=BENCHMARK_HASHERS):
+                start = time.time()
+                counts = generate(
+                    users=users,
+                    average_degree=options['degree'],
+                    recipes_per_user=options['recipes'],
+                    seed=options['seed']
+                )
+                generate_time = time.time() - start
+
+                scale = dict(counts, generate_seconds=round(generate_time, 3))
+                scale['results'] = run_benchmark(options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if int(options['verbosity']) > 1:
+            self.stderr.write('Benchmarked %d users.' % users)
+
+        return scale
@@ -0,0 +1,50 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import json
+from optparse import make_option
+
+# Django imports...
+from django.core.management.base import BaseCommand
+
+# Local imports...
+from metrics.histograms import PERCENTILES
+from metrics.recorder import METRICS
+from metrics.recorder import get_metrics
+from metrics.recorder import reset
+
+
+class Command(BaseCommand):
+    help = (
+        'Dumps the request metrics that the web processes have flushed to the metrics cache. Needs a '
+        'cache shared between processes (e.g. memcached); a local memory cache is only seen by its own process.'
+    )
+
+    option_list = BaseCommand.option_list + (
+        make_option('--json', action='store_true', default=False,
+                    help='Dump the full histograms as JSON, instead of a table of percentiles.'),
+        make_option('--reset', action='store_true', default=False,
+                    help='Start the metrics over after dumping them.'),
+    )
+
+    def handle(self, *args, **options):
+        metrics = get_metrics()
+
+        if options['json']:
+            self.stdout.write(json.dumps(metrics, indent=2, sort_keys=True))
+        else:
+            self.write_table(metrics)
+
+        if options['reset']:
+            reset()
+
+    def write_table(self, metrics):
+        columns = ['p%d' % percent for percent in PERCENTILES] + ['max']
+
+        for view_name in sorted(metrics):
+            histograms = metrics[view_name]
+            self.stdout.write('%s (%d requests)' % (view_name, histograms['time']['count']))
+
+            for metric in METRICS:
+                values = ' '.join('%s=%.1f' % (column, histograms[metric][column]) for column in columns)
+                self.stdout.write('    %-12s %s' % (metric, values))
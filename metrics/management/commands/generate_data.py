@@ -0,0 +1,40 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+from optparse import make_option
+
+# Django imports...
+from django.core.management.base import BaseCommand
+
+# Local imports...
+from metrics.synthetic import PASSWORD
+from metrics.synthetic import generate
+
+
+class Command(BaseCommand):
+    help = 'Adds synthetic users, friendships and recipes to the database, for benchmarks.'
+
+    option_list = BaseCommand.option_list + (
+        make_option('--users', type='int', default=1000,
+                    help='The number of users to create.'),
+        make_option('--degree', type='float', default=10,
+                    help='The average number of friendships per user.'),
+        make_option('--exponent', type='float', default=2.5,
+                    help='The exponent of the power law that friendship degrees follow.'),
+        make_option('--recipes', type='int', default=2,
+                    help='The average number of recipes per user.'),
+        make_option('--seed', type='int', default=0,
+                    help='The seed of the random data; the same seed generates the same data.'),
+    )
+
+    def handle(self, *args, **options):
+        counts = generate(
+            users=options['users'],
+            average_degree=options['degree'],
+            exponent=options['exponent'],
+            recipes_per_user=options['recipes'],
+            seed=options['seed']
+        )
+
+        self.stdout.write('Created %(users)d users, %(friendships)d friendships and %(recipes)d recipes.' % counts)
+        self.stdout.write('The users log in with the password %s.' % PASSWORD)
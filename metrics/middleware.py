@@ -0,0 +1,42 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Local imports...
+from .queries import check_request
+from .recorder import UNRESOLVED
+from .recorder import finish_request
+from .recorder import get_record
+from .recorder import start_request
+
+
+class ProfilingMiddleware(object):
+    """
+    Records the wall time, query count, SQL time, template render time and response size of each
+    request under its URL name (e.g. users:feed), and checks its queries (see metrics.queries). It
+    should come first in MIDDLEWARE_CLASSES, so that the other middleware is timed too.
+    """
+    def process_request(self, request):
+        start_request()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        record = get_record()
+
+        # Name the view in the slow query log...
+        if record is not None:
+            record.view_name = request.resolver_match.view_name
+
+    def process_response(self, request, response):
+        resolver_match = getattr(request, 'resolver_match', None)
+        view_name = resolver_match.view_name if resolver_match else UNRESOLVED
+
+        # Streamed content is only produced after the middleware has run...
+        size = 0 if response.streaming else len(response.content)
+
+        record = get_record()
+
+        try:
+            if record is not None:
+                check_request(record)
+        finally:
+            finish_request(view_name, size)
+
+        return response
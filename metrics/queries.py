@@ -0,0 +1,102 @@
+"""
+A slow-query log and a duplicate-query (N+1) detector for the request being recorded.
+
+Queries that take longer than METRICS_SLOW_QUERY_TIME milliseconds are logged as they run. Queries
+are also counted by shape, i.e. their SQL with the parameters left out and IN lists collapsed, and a
+shape that runs METRICS_DUPLICATE_QUERY_COUNT times or more in one request, which is usually a
+lazily loaded relation in a loop, is logged once the response is ready. Both logs name the view and
+the line of project code that ran the query.
+
+A view can also be given a query budget in METRICS_QUERY_BUDGETS. Going over it is logged, or,
+with METRICS_STRICT_QUERY_BUDGETS (see metrics.testing.query_budgets), fails the request.
+"""
+
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import logging
+import os
+import re
+import sys
+
+# Django imports...
+from django.conf import settings
+
+METRICS_SLOW_QUERY_TIME = getattr(settings, 'METRICS_SLOW_QUERY_TIME', 100)
+
+METRICS_DUPLICATE_QUERY_COUNT = getattr(settings, 'METRICS_DUPLICATE_QUERY_COUNT', 5)
+
+# The most queries each view (by URL name) should run...
+METRICS_QUERY_BUDGETS = getattr(settings, 'METRICS_QUERY_BUDGETS', {})
+
+METRICS_STRICT_QUERY_BUDGETS = getattr(settings, 'METRICS_STRICT_QUERY_BUDGETS', False)
+
+PROJECT_ROOT = os.path.abspath(getattr(settings, 'BASE_DIR', os.getcwd()))
+
+METRICS_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)')
+
+WHITESPACE = re.compile(r'\s+')
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def get_shape(sql):
+    """Gets the shape of a query, so that queries that differ only in their parameters are alike."""
+    return IN_LIST.sub('IN (...)', WHITESPACE.sub(' ', sql).strip())
+
+
+def get_origin():
+    """Gets the innermost line of project code on the stack (outside of this app), e.g. 'users/views.py:40'."""
+    frame = sys._getframe(1)
+
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+
+        if filename.startswith(PROJECT_ROOT + os.sep) and os.path.dirname(filename) != METRICS_ROOT:
+            return '%s:%d' % (os.path.relpath(filename, PROJECT_ROOT), frame.f_lineno)
+
+        frame = frame.f_back
+
+    return 'unknown'
+
+
+def check_query(record, sql, duration):
+    """Counts the query's shape in the request record, and logs it if it is slow."""
+    shape = get_shape(sql)
+    record.shapes[shape] += 1
+
+    # Remember where each shape ran first, which is where a loop of them starts...
+    if shape not in record.origins:
+        record.origins[shape] = get_origin()
+
+    if duration * 1000 >= METRICS_SLOW_QUERY_TIME:
+        logger.warning(
+            'Slow query (%.1f ms) in %s at %s: %s',
+            duration * 1000, record.view_name, get_origin(), shape
+        )
+
+
+def check_request(record):
+    """Logs the repeated query shapes of the request, and checks the view's query budget."""
+    for shape, count in record.shapes.items():
+        if count >= METRICS_DUPLICATE_QUERY_COUNT:
+            logger.warning(
+                'Duplicate queries (%d of the same shape) in %s at %s: %s',
+                count, record.view_name, record.origins[shape], shape
+            )
+
+    budget = METRICS_QUERY_BUDGETS.get(record.view_name)
+
+    if budget is not None and record.queries > budget:
+        message = '%s ran %d queries, over its budget of %d' % (record.view_name, record.queries, budget)
+
+        if METRICS_STRICT_QUERY_BUDGETS:
+            raise QueryBudgetExceeded(message)
+
+        logger.warning(message)
@@ -0,0 +1,193 @@
+"""
+Per-request metrics, aggregated into histograms per URL name.
+
+The metrics of the request being handled by a thread are kept in a thread-local record, which the
+database and template instrumentation add to. When the request is done, its metrics are added to
+this process's histograms. Every METRICS_FLUSH_INTERVAL seconds, each process publishes a snapshot
+of its histograms to METRICS_CACHE, where the staff endpoint and the dump_metrics command merge the
+snapshots of all the processes.
+"""
+
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import copy
+import os
+import socket
+import threading
+import time
+from collections import Counter
+from collections import defaultdict
+
+# Django imports...
+from django.conf import settings
+from django.core.cache import caches
+
+# Local imports...
+from .histograms import Histogram
+
+METRICS_CACHE = getattr(settings, 'METRICS_CACHE', 'default')
+
+METRICS_FLUSH_INTERVAL = getattr(settings, 'METRICS_FLUSH_INTERVAL', 10)
+
+# How long the snapshot of a process outlives its last flush, in seconds...
+METRICS_SNAPSHOT_TIMEOUT = getattr(settings, 'METRICS_SNAPSHOT_TIMEOUT', 24 * 60 * 60)
+
+# The metrics of a request: wall time, query count and SQL time, template render time (all times in
+# milliseconds) and response size in bytes...
+METRICS = ('time', 'queries', 'sql_time', 'render_time', 'size')
+
+# The name that requests for URLs that did not resolve are recorded under...
+UNRESOLVED = '<unresolved>'
+
+GENERATION_KEY = 'metrics:generation'
+
+SNAPSHOTS_KEY = 'metrics:snapshots'
+
+_local = threading.local()
+
+_lock = threading.Lock()
+
+_state = {
+    'histograms': defaultdict(dict),
+    'generation': None,
+    'flushed': 0
+}
+
+
+class RequestRecord(object):
+    def __init__(self):
+        self.start = time.time()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.rendering = False
+        self.view_name = UNRESOLVED
+
+        # The number of queries of each shape, and where each shape first ran (see metrics.queries)...
+        self.shapes = Counter()
+        self.origins = {}
+
+    def add_query(self, duration):
+        self.queries += 1
+        self.sql_time += duration
+
+
+def get_record():
+    """Gets the record of the request this thread is handling, or None outside of a request."""
+    return getattr(_local, 'record', None)
+
+
+def start_request():
+    _local.record = RequestRecord()
+
+    return _local.record
+
+
+def finish_request(view_name, size):
+    """Adds the metrics of the thread's request to the histograms of the view name."""
+    record = get_record()
+
+    if record is None:
+        return
+
+    _local.record = None
+
+    add_metrics(view_name, {
+        'time': (time.time() - record.start) * 1000,
+        'queries': record.queries,
+        'sql_time': record.sql_time * 1000,
+        'render_time': record.render_time * 1000,
+        'size': size
+    })
+
+    if time.time() - _state['flushed'] >= METRICS_FLUSH_INTERVAL:
+        flush()
+
+
+def add_metrics(view_name, values):
+    with _lock:
+        histograms = _state['histograms'][view_name]
+
+        for metric in METRICS:
+            histograms.setdefault(metric, Histogram()).add(values[metric])
+
+
+def get_generation(cache):
+    generation = cache.get(GENERATION_KEY)
+
+    if generation is None:
+        cache.add(GENERATION_KEY, 0, None)
+        generation = cache.get(GENERATION_KEY, 0)
+
+    return generation
+
+
+def snapshot_key(generation):
+    return 'metrics:snapshot:%d:%s:%d' % (generation, socket.gethostname(), os.getpid())
+
+
+def flush():
+    """Publishes a snapshot of this process's histograms to the cache."""
+    cache = caches[METRICS_CACHE]
+    generation = get_generation(cache)
+
+    with _lock:
+        # The metrics were reset since the last flush, so start over...
+        if _state['generation'] not in (None, generation):
+            _state['histograms'].clear()
+
+        _state['generation'] = generation
+
+        histograms = copy.deepcopy(dict(_state['histograms']))
+        _state['flushed'] = time.time()
+
+    key = snapshot_key(generation)
+    cache.set(key, histograms, METRICS_SNAPSHOT_TIMEOUT)
+
+    # Register the snapshot; one lost to a concurrent write is registered again by the next flush...
+    keys = cache.get(SNAPSHOTS_KEY) or set()
+
+    if key not in keys:
+        keys.add(key)
+        cache.set(SNAPSHOTS_KEY, keys, None)
+
+
+def get_metrics():
+    """
+    Gets the histograms of every metric by view name, merged across all processes, as nested
+    dicts (see Histogram.to_dict).
+    """
+    flush()
+
+    cache = caches[METRICS_CACHE]
+    prefix = 'metrics:snapshot:%d:' % get_generation(cache)
+    keys = [key for key in cache.get(SNAPSHOTS_KEY) or () if key.startswith(prefix)]
+    merged = defaultdict(dict)
+
+    for histograms in cache.get_many(keys).values():
+        for view_name, metrics in histograms.items():
+            for metric, histogram in metrics.items():
+                merged[view_name].setdefault(metric, Histogram()).merge(histogram)
+
+    return {
+        view_name: {metric: histogram.to_dict() for metric, histogram in metrics.items()}
+        for view_name, metrics in merged.items()
+    }
+
+
+def reset():
+    """Starts every process's metrics over, from their next flush on."""
+    cache = caches[METRICS_CACHE]
+    keys = cache.get(SNAPSHOTS_KEY) or set()
+
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
+
+    cache.delete_many(list(keys) + [SNAPSHOTS_KEY])
+
+    with _lock:
+        _state['histograms'].clear()
+        _state['generation'] = None
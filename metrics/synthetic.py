@@ -0,0 +1,250 @@
+"""
+Generates a synthetic social graph for benchmarks: users, friendships and recipes.
+
+Friendship degrees follow a power law: each user is given a weight from a Zipf-like distribution
+and both ends of every friendship are drawn in proportion to the weights, so that a few users have
+many friends and most have a few. Everything is written with bulk_create, so the fields and rows
+that save() and the signals would otherwise maintain are filled in here: the friendships' pair keys,
+the feed events, the users' search index and the recipes' ingredient counts and search tokens.
+"""
+
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import bisect
+import random
+from collections import Counter
+from itertools import chain
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import F
+from django.db.models import Max
+
+# Local imports...
+from accounts.search import rebuild_index
+from recipes.models import Ingredient
+from recipes.models import Recipe
+from recipes.models import RecipeIngredient
+from recipes.models import RecipeToken
+from recipes.models import get_tokens
+from users.graph import bump_version
+from users.graph import reset_graph
+from users.models import FeedEvent
+from users.models import Friendship
+from users.signals import flush_deferred
+
+User = get_user_model()
+
+# Every generated user can log in with this password...
+PASSWORD = 'password1'
+
+BATCH_SIZE = 500
+
+STATUS_WEIGHTS = (('A', 0.7), ('P', 0.2), ('R', 0.1))
+
+FIRST_NAMES = (
+    'Alice', 'Ben', 'Carla', 'David', 'Emma', 'Frank', 'Grace', 'Henry', 'Irene', 'Jason', 'Karen',
+    'Louis', 'Maria', 'Nathan', 'Olivia', 'Peter', 'Regina', 'Sam', 'Travis', 'Victoria'
+)
+
+LAST_NAMES = (
+    'Adams', 'Brown', 'Carney', 'Davis', 'Evans', 'Garcia', 'Harris', 'Jones', 'Lopez', 'Miller',
+    'Mills', 'Nguyen', 'Parent', 'Smith', 'Taylor', 'Walker'
+)
+
+DISHES = ('Pancakes', 'Waffles', 'Bread', 'Soup', 'Salad', 'Curry', 'Pasta', 'Stew', 'Pie', 'Tacos')
+
+ADJECTIVES = ('Easy', 'Spicy', 'Classic', 'Quick', 'Creamy', 'Roasted', 'Vegan', 'Hearty')
+
+TAGS = ('breakfast', 'lunch', 'dinner', 'dessert', 'vegetarian', 'quick', 'sweet', 'spicy')
+
+INGREDIENTS = (
+    'flour', 'milk', 'eggs', 'butter', 'sugar', 'salt', 'pepper', 'olive oil', 'garlic', 'onion',
+    'tomato', 'rice', 'chicken', 'beef', 'potato', 'carrot', 'cheese', 'yeast', 'water', 'lemon',
+    'basil', 'cumin', 'cream', 'honey', 'beans'
+)
+
+QUANTITIES = ('1 cup', '2 cups', '1 tbsp', '2 tsp', '1 pinch', '3', '200 g', '')
+
+
+def get_max_pk(model):
+    return model.objects.aggregate(max_pk=Max('pk'))['max_pk'] or 0
+
+
+def choose_status(rng):
+    value = rng.random()
+
+    for status, weight in STATUS_WEIGHTS:
+        value -= weight
+
+        if value < 0:
+            return status
+
+    return STATUS_WEIGHTS[-1][0]
+
+
+def create_users(rng, count):
+    """Creates the users, and returns them by id. Their search text is filled in by rebuild_index."""
+    start = get_max_pk(User)
+    password = make_password(PASSWORD)
+
+    # Number the usernames after the existing users, so that they don't clash...
+    User.objects.bulk_create([User(
+        username='user%d' % (start + i),
+        email='user%d@example.com' % (start + i),
+        first_name=rng.choice(FIRST_NAMES),
+        last_name=rng.choice(LAST_NAMES),
+        password=password
+    ) for i in range(1, count + 1)], batch_size=BATCH_SIZE)
+
+    return {user.pk: user for user in User.objects.filter(pk__gt=start).only('id', 'first_name')}
+
+
+def draw_pairs(rng, user_ids, average_degree, exponent):
+    """Draws distinct pairs of users, with degrees that follow a power law of the exponent."""
+    user_ids = list(user_ids)
+    rng.shuffle(user_ids)
+
+    # A Zipf-like weight per user gives a degree distribution with a power-law tail...
+    cumulative = []
+    total = 0.0
+
+    for rank in range(1, len(user_ids) + 1):
+        total += rank ** (-1.0 / (exponent - 1))
+        cumulative.append(total)
+
+    target = int(len(user_ids) * average_degree // 2)
+    pairs = {}
+
+    # Give up on dense small graphs, where most draws repeat a pair...
+    for attempt in range(target * 3):
+        if len(pairs) >= target:
+            break
+
+        a = user_ids[bisect.bisect_left(cumulative, rng.random() * total)]
+        b = user_ids[bisect.bisect_left(cumulative, rng.random() * total)]
+        key = (min(a, b), max(a, b))
+
+        if a != b and key not in pairs:
+            pairs[key] = (a, b)
+
+    return pairs.values()
+
+
+def create_friendships(rng, users, average_degree, exponent):
+    """Creates power-law friendships of mixed statuses between the users, and their feed events."""
+    start = get_max_pk(Friendship)
+    pairs = draw_pairs(rng, sorted(users), average_degree, exponent)
+
+    Friendship.objects.bulk_create([Friendship(
+        sender_id=sender_id,
+        receiver_id=receiver_id,
+        status=choose_status(rng),
+        low_user_id=min(sender_id, receiver_id),
+        high_user_id=max(sender_id, receiver_id)
+    ) for sender_id, receiver_id in pairs], batch_size=BATCH_SIZE)
+
+    friendships = list(Friendship.objects.filter(pk__gt=start).only(
+        'id', 'sender', 'receiver', 'status', 'created', 'updated'
+    ))
+
+    # Set the users from memory, so that building the events' headings runs no queries...
+    for friendship in friendships:
+        friendship.sender = users[friendship.sender_id]
+        friendship.receiver = users[friendship.receiver_id]
+
+    answered = [friendship for friendship in friendships if friendship.status != 'P']
+
+    FeedEvent.objects.bulk_create(list(chain(
+        chain.from_iterable(map(FeedEvent.added, friendships)),
+        chain.from_iterable(map(FeedEvent.answered, answered))
+    )), batch_size=BATCH_SIZE)
+
+    return len(friendships)
+
+
+def create_recipes(rng, users, recipes_per_user):
+    """Creates recipes for the users, with an average of recipes_per_user each."""
+    start = get_max_pk(Recipe)
+    ingredients = Ingredient.objects.get_or_create_all(INGREDIENTS)
+    specs = []
+
+    for user_id in sorted(users):
+        for i in range(rng.randint(0, recipes_per_user * 2)):
+            names = rng.sample(INGREDIENTS, rng.randint(3, 8))
+            specs.append((
+                user_id,
+                '%s %s' % (rng.choice(ADJECTIVES), rng.choice(DISHES)),
+                ', '.join(rng.sample(TAGS, rng.randint(0, 2))),
+                names
+            ))
+
+    Recipe.objects.bulk_create([Recipe(
+        owner_id=user_id,
+        name=name,
+        tags=tags,
+        ingredient_count=len(names)
+    ) for user_id, name, tags, names in specs], batch_size=BATCH_SIZE)
+
+    # The rows of a bulk insert get ascending ids in the order they were given...
+    recipe_ids = Recipe.objects.filter(pk__gt=start).order_by('pk').values_list('pk', flat=True)
+    recipe_ingredients = []
+    tokens = []
+    counts = Counter()
+
+    for recipe_id, (user_id, name, tags, names) in zip(recipe_ids, specs):
+        counts.update(names)
+
+        recipe_ingredients.extend(RecipeIngredient(
+            recipe_id=recipe_id,
+            ingredient=ingredients[ingredient_name],
+            quantity=rng.choice(QUANTITIES),
+            position=position
+        ) for position, ingredient_name in enumerate(names))
+
+        tokens.extend(
+            RecipeToken(recipe_id=recipe_id, owner_id=user_id, kind=kind, token=token)
+            for kind, token in get_tokens(name, tags, names)
+        )
+
+    RecipeIngredient.objects.bulk_create(recipe_ingredients, batch_size=BATCH_SIZE)
+    RecipeToken.objects.bulk_create(tokens, batch_size=BATCH_SIZE)
+
+    for ingredient_name, count in counts.items():
+        Ingredient.objects.filter(pk=ingredients[ingredient_name].pk).update(
+            recipe_count=F('recipe_count') + count
+        )
+
+    return len(specs)
+
+
+def generate(users=1000, average_degree=10, exponent=2.5, recipes_per_user=2, seed=0):
+    """
+    Generates the users, with friendships averaging average_degree per user and recipes averaging
+    recipes_per_user, and returns the number of rows of each that were created. The same seed
+    always generates the same data.
+    """
+    rng = random.Random(seed)
+
+    with transaction.atomic():
+        created = create_users(rng, users)
+        friendship_count = create_friendships(rng, created, average_degree, exponent)
+        recipe_count = create_recipes(rng, created, recipes_per_user)
+
+        rebuild_index()
+
+    # Caches dropped inside the transaction may have been filled again before it committed...
+    flush_deferred()
+
+    # The friend graphs of this and the other processes don't know about the bulk inserts...
+    reset_graph()
+    bump_version()
+
+    return {
+        'users': len(created),
+        'friendships': friendship_count,
+        'recipes': recipe_count
+    }
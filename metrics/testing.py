@@ -0,0 +1,20 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Third-party imports...
+from mock import patch
+
+# Local imports...
+from .queries import METRICS_QUERY_BUDGETS
+
+
+def query_budgets(budgets=None):
+    """
+    Makes requests to views that run more queries than their budget fail with QueryBudgetExceeded,
+    so that tests catch them. The budgets given, by URL name, are added to METRICS_QUERY_BUDGETS.
+    Use it as a decorator or a context manager; requests must go through ProfilingMiddleware.
+    """
+    return patch.multiple(
+        'metrics.queries',
+        METRICS_QUERY_BUDGETS=dict(METRICS_QUERY_BUDGETS, **(budgets or {})),
+        METRICS_STRICT_QUERY_BUDGETS=True
+    )
@@ -0,0 +1 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
\ No newline at end of file
@@ -0,0 +1,43 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Django imports...
+from django.test import SimpleTestCase
+
+# Local imports...
+from ..histograms import Histogram
+
+
+class HistogramTest(SimpleTestCase):
+    def create_histogram(self, values):
+        histogram = Histogram()
+
+        for value in values:
+            histogram.add(value)
+
+        return histogram
+
+    def test_estimates_percentiles_to_bucket_bounds(self):
+        histogram = self.create_histogram([3] * 90 + [40] * 9 + [700])
+
+        self.assertEqual(histogram.percentile(50), 5)
+        self.assertEqual(histogram.percentile(90), 5)
+        self.assertEqual(histogram.percentile(99), 50)
+        self.assertEqual(histogram.percentile(100), 700)
+
+    def test_does_not_estimate_past_maximum(self):
+        self.assertEqual(self.create_histogram([3, 3]).percentile(99), 3)
+        self.assertEqual(self.create_histogram([10 ** 9]).percentile(50), 10 ** 9)
+        self.assertEqual(self.create_histogram([0, 0, 1]).percentile(50), 0)
+        self.assertIsNone(Histogram().percentile(50))
+
+    def test_merges_histograms(self):
+        histogram = self.create_histogram([1, 2])
+        histogram.merge(self.create_histogram([300]))
+        histogram.merge(Histogram())
+
+        data = histogram.to_dict()
+
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(data['mean'], 101)
+        self.assertEqual((data['min'], data['max']), (1, 300))
+        self.assertListEqual(data['buckets'], [[1, 1], [2, 1], [500, 1]])
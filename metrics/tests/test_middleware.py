@@ -0,0 +1,87 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+from StringIO import StringIO
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.test import override_settings
+
+# Local imports...
+from users.models import Friendship
+from ..recorder import UNRESOLVED
+from ..recorder import get_metrics
+from ..recorder import reset
+
+User = get_user_model()
+
+
+@override_settings(
+    MIDDLEWARE_CLASSES=(
+        'metrics.middleware.ProfilingMiddleware',
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+    )
+)
+class ProfilingMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset()
+
+        self.user = User.objects.create_user('john', 'john@example.com', 'password1')
+        friend = User.objects.create_user('regina', 'regina@example.com', 'password1')
+        Friendship.objects.create(sender=self.user, receiver=friend, status='A')
+
+        self.client.login(username='john', password='password1')
+
+    def test_records_metrics_per_url_name(self):
+        self.client.get('/users/friends/')
+        self.client.get('/users/friends/')
+        response = self.client.get('/users/api/friends/')
+
+        metrics = get_metrics()
+        friends = metrics['users:friends']
+
+        self.assertEqual(friends['time']['count'], 2)
+        self.assertGreater(friends['queries']['max'], 0)
+        self.assertGreater(friends['render_time']['max'], 0)
+        self.assertGreater(friends['size']['min'], 0)
+
+        # The API renders no templates...
+        self.assertEqual(metrics['users:api_friends']['render_time']['max'], 0)
+        self.assertEqual(metrics['users:api_friends']['size']['max'], len(response.content))
+
+    def test_records_unresolved_urls_together(self):
+        self.client.get('/nonsense/')
+
+        self.assertEqual(get_metrics()[UNRESOLVED]['time']['count'], 1)
+
+    def test_reset_starts_metrics_over(self):
+        self.client.get('/users/friends/')
+        reset()
+        self.client.get('/users/requests/')
+
+        self.assertListEqual(list(get_metrics()), ['users:requests'])
+
+    def test_metrics_view_is_staff_only(self):
+        self.client.get('/users/friends/')
+
+        self.assertEqual(self.client.get('/metrics/').status_code, 302)
+
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        response = self.client.get('/metrics/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('users:friends', response.content)
+
+    def test_dump_metrics_command(self):
+        self.client.get('/users/friends/')
+        stdout = StringIO()
+
+        call_command('dump_metrics', stdout=stdout, reset=True)
+
+        self.assertIn('users:friends (1 requests)', stdout.getvalue())
+        self.assertDictEqual(get_metrics(), {})
@@ -0,0 +1,88 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Third-party imports...
+from mock import patch
+
+# Django imports...
+from django.conf.urls import patterns
+from django.conf.urls import url
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test import override_settings
+
+# Local imports...
+from users.models import Friendship
+from ..queries import QueryBudgetExceeded
+from ..queries import get_shape
+from ..testing import query_budgets
+
+User = get_user_model()
+
+
+def n_plus_one_view(request):
+    # Loads each sender with a query of its own...
+    names = [friendship.sender.username for friendship in Friendship.objects.all()]
+
+    return HttpResponse(', '.join(names))
+
+
+urlpatterns = patterns('',
+    url(r'^n_plus_one/$', n_plus_one_view, name='n_plus_one'),
+)
+
+
+@override_settings(MIDDLEWARE_CLASSES=('metrics.middleware.ProfilingMiddleware',))
+class QueryCheckTest(TestCase):
+    urls = 'metrics.tests.test_queries'
+
+    def setUp(self):
+        receiver = User.objects.create_user('john', 'john@example.com', 'password1')
+
+        for i in range(5):
+            sender = User.objects.create_user('user%d' % i, 'user%d@example.com' % i, 'password1')
+            Friendship.objects.create(sender=sender, receiver=receiver)
+
+    def test_shapes_ignore_parameters(self):
+        self.assertEqual(
+            get_shape('SELECT "id"\n  FROM "t" WHERE "id" IN (%s, %s, %s) AND "x" = %s'),
+            'SELECT "id" FROM "t" WHERE "id" IN (...) AND "x" = %s'
+        )
+        self.assertEqual(get_shape('WHERE "id" IN (%s)'), get_shape('WHERE "id" IN (%s, %s)'))
+
+    @patch('metrics.queries.logger')
+    def test_logs_duplicate_queries_with_view_and_origin(self, mock_logger):
+        self.client.get('/n_plus_one/')
+
+        message, count, view_name, origin, shape = mock_logger.warning.call_args[0]
+
+        self.assertTrue(message.startswith('Duplicate queries'))
+        self.assertEqual((count, view_name), (5, 'n_plus_one'))
+        self.assertRegexpMatches(origin, r'^metrics/tests/test_queries\.py:\d+$')
+        self.assertIn('"accounts_user"', shape)
+
+    @patch('metrics.queries.logger')
+    @patch('metrics.queries.METRICS_DUPLICATE_QUERY_COUNT', 10)
+    @patch('metrics.queries.METRICS_SLOW_QUERY_TIME', 0)
+    def test_logs_slow_queries(self, mock_logger):
+        self.client.get('/n_plus_one/')
+
+        self.assertEqual(mock_logger.warning.call_count, 6)
+        self.assertTrue(mock_logger.warning.call_args[0][0].startswith('Slow query'))
+        self.assertEqual(mock_logger.warning.call_args[0][2], 'n_plus_one')
+
+    @patch('metrics.queries.logger')
+    def test_logs_views_over_budget(self, mock_logger):
+        with patch('metrics.queries.METRICS_QUERY_BUDGETS', {'n_plus_one': 2}):
+            self.client.get('/n_plus_one/')
+
+        mock_logger.warning.assert_called_with('n_plus_one ran 6 queries, over its budget of 2')
+
+    @patch('metrics.queries.logger')
+    def test_strict_budgets_fail_requests(self, mock_logger):
+        with query_budgets({'n_plus_one': 6}):
+            self.client.get('/n_plus_one/')
+
+            with self.assertRaises(QueryBudgetExceeded):
+                with query_budgets({'n_plus_one': 5}):
+                    self.client.get('/n_plus_one/')
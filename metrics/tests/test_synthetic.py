@@ -0,0 +1,101 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+from collections import Counter
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+
+# Local imports...
+from accounts.search import search
+from recipes.models import INGREDIENT_NAME
+from recipes.models import Ingredient
+from recipes.models import Recipe
+from recipes.models import RecipeIngredient
+from users.models import FeedEvent
+from users.models import Friendship
+from ..benchmark import run_benchmark
+from ..synthetic import generate
+
+User = get_user_model()
+
+
+@override_settings(PASSWORD_HASHERS=('django.contrib.auth.hashers.MD5PasswordHasher',))
+class SyntheticDataTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.counts = generate(users=60, average_degree=6, recipes_per_user=2, seed=1)
+
+    def test_creates_users_friendships_and_recipes(self):
+        self.assertEqual(self.counts['users'], 60)
+        self.assertEqual(User.objects.count(), 60)
+        self.assertEqual(Friendship.objects.count(), self.counts['friendships'])
+        self.assertEqual(Recipe.objects.count(), self.counts['recipes'])
+        self.assertGreater(self.counts['friendships'], 60 * 6 // 2 * 0.9)
+        self.assertSetEqual(set(Friendship.objects.values_list('status', flat=True)), {'A', 'P', 'R'})
+
+    def test_accepts_fractional_average_degree(self):
+        counts = generate(users=20, average_degree=2.5, recipes_per_user=0, seed=2)
+
+        self.assertEqual(counts['users'], 20)
+        self.assertGreater(counts['friendships'], 0)
+        self.assertLessEqual(counts['friendships'], 20 * 2.5 // 2)
+
+    def test_degrees_are_skewed(self):
+        degrees = Counter()
+
+        for friendship in Friendship.objects.all():
+            degrees.update((friendship.sender_id, friendship.receiver_id))
+
+        ranked = sorted(degrees.values())
+
+        self.assertGreater(ranked[-1], 3 * ranked[len(ranked) // 2])
+
+    def test_fills_in_what_saving_would(self):
+        for friendship in Friendship.objects.all():
+            self.assertEqual(
+                (friendship.low_user_id, friendship.high_user_id),
+                Friendship.pair_key(friendship.sender, friendship.receiver)
+            )
+
+        answered = Friendship.objects.exclude(status='P').count()
+
+        self.assertEqual(FeedEvent.objects.count(), 2 * (self.counts['friendships'] + answered))
+
+        user = User.objects.order_by('pk').last()
+
+        self.assertIn(user, search(User.objects.all(), user.username))
+
+        for ingredient in Ingredient.objects.all():
+            self.assertEqual(ingredient.recipe_count, RecipeIngredient.objects.filter(ingredient=ingredient).count())
+
+        for recipe in Recipe.objects.all():
+            self.assertEqual(recipe.ingredient_count, recipe.recipe_ingredients.count())
+            self.assertEqual(recipe.tokens.filter(kind=INGREDIENT_NAME).count(), recipe.ingredient_count)
+
+    def test_same_seed_generates_same_graph(self):
+        def degrees(users):
+            counts = Counter()
+
+            for friendship in Friendship.objects.filter(sender__in=users):
+                counts.update((friendship.sender_id - users[0], friendship.receiver_id - users[0]))
+
+            return counts
+
+        first = list(User.objects.order_by('pk').values_list('pk', flat=True))
+        generate(users=60, average_degree=6, recipes_per_user=2, seed=1)
+        second = list(User.objects.exclude(pk__in=first).order_by('pk').values_list('pk', flat=True))
+
+        self.assertEqual(degrees(first), degrees(second))
+
+    def test_runs_benchmark(self):
+        results = run_benchmark(repeat=1)
+
+        self.assertSetEqual(set(result['name'] for result in results), {
+            'users:feed', 'users:list', 'users:friends', 'users:requests', 'users:add', 'users:accept'
+        })
+        self.assertSetEqual(set(result['profile'] for result in results), {'median', 'hub'})
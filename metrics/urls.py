@@ -0,0 +1,9 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Django imports...
+from django.conf.urls import patterns
+from django.conf.urls import url
+
+urlpatterns = patterns('metrics.views',
+    url(r'^$', 'metrics_view', name='metrics'),
+)
@@ -0,0 +1,13 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Django imports...
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+# Local imports...
+from .recorder import get_metrics
+
+
+@staff_member_required
+def metrics_view(request):
+    return JsonResponse(get_metrics())
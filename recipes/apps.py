@@ -0,0 +1,12 @@
+__author__ = 'parentj@eab.com (Jason Parent)'
+
+# Django imports...
+from django.apps import AppConfig
+
+
+class RecipesConfig(AppConfig):
+    name = 'recipes'
+
+    def ready(self):
+        # Connect signal handlers...
+        from . import signals
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+from django.conf import settings
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ingredient',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('name', models.CharField(unique=True, max_length=100)),
+                ('recipe_count', models.PositiveIntegerField(default=0, editable=False)),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.CreateModel(
+            name='Recipe',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('name', models.CharField(max_length=250)),
+                ('description', models.TextField(default=b'', blank=True)),
+                ('instructions', models.TextField(default=b'', blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('ingredient_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('owner', models.ForeignKey(related_name='recipes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.CreateModel(
+            name='RecipeIngredient',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('quantity', models.CharField(default=b'', max_length=100, blank=True)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('ingredient', models.ForeignKey(related_name='recipe_ingredients', to='recipes.Ingredient')),
+                ('recipe', models.ForeignKey(related_name='recipe_ingredients', to='recipes.Recipe')),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AlterUniqueTogether(
+            name='recipeingredient',
+            unique_together=set([('recipe', 'ingredient')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='recipe',
+            index_together=set([('owner', 'created')]),
+        ),
+    ]
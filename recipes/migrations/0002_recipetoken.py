@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import re
+import unicodedata
+
+from django.db import models, migrations
+from django.conf import settings
+from django.utils.encoding import force_text
+
+# Frozen copies of the recipes.models and accounts.search helpers as of this migration, so that later
+# changes to them don't change what the migration does...
+NON_ALPHANUMERIC = re.compile(r'[^a-z0-9]+')
+
+
+def normalize(value):
+    value = unicodedata.normalize('NFKD', force_text(value or ''))
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+
+    return NON_ALPHANUMERIC.sub(' ', value.lower()).strip()
+
+
+def get_tags(tags):
+    return sorted(set(normalize(tag) for tag in tags.split(',')) - {''})
+
+
+def get_tokens(name, tags, ingredient_names):
+    tokens = set(('T', word) for word in normalize(name).split())
+    tokens.update(('G', word) for tag in get_tags(tags) for word in tag.split())
+
+    for ingredient_name in ingredient_names:
+        ingredient_name = normalize(ingredient_name)
+
+        if ingredient_name:
+            tokens.update(('I', word) for word in ingredient_name.split())
+            tokens.add(('N', ingredient_name))
+
+    return tokens
+
+
+def fill_tokens(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeToken = apps.get_model('recipes', 'RecipeToken')
+
+    for recipe in Recipe.objects.prefetch_related('recipe_ingredients__ingredient'):
+        ingredient_names = [ri.ingredient.name for ri in recipe.recipe_ingredients.all()]
+
+        RecipeToken.objects.bulk_create([
+            RecipeToken(recipe=recipe, owner_id=recipe.owner_id, kind=kind, token=token)
+            for kind, token in get_tokens(recipe.name, recipe.tags, ingredient_names)
+        ])
+
+
+def empty_tokens(apps, schema_editor):
+    # The token table is dropped when unapplying, so there is nothing to undo...
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeToken',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('token', models.CharField(max_length=100)),
+                ('kind', models.CharField(max_length=1, choices=[(b'T', b'title'), (b'G', b'tag'), (b'I', b'ingredient'), (b'N', b'ingredient name')])),
+                ('owner', models.ForeignKey(related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('recipe', models.ForeignKey(related_name='tokens', to='recipes.Recipe')),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AlterUniqueTogether(
+            name='recipetoken',
+            unique_together=set([('recipe', 'kind', 'token')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='recipetoken',
+            index_together=set([('token', 'owner')]),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='tags',
+            field=models.CharField(default=b'', help_text=b'Comma separated, e.g. breakfast, sweet', max_length=250, blank=True),
+            preserve_default=True,
+        ),
+        migrations.RunPython(fill_tokens, empty_tokens),
+    ]
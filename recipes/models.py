@@ -1,3 +1,251 @@
+__author__ = 'parentj@eab.com (Jason Parent)'
+
+# Django imports...
+from django.conf import settings
+from django.db import IntegrityError
 from django.db import models
+from django.db import transaction
+from django.db.models import F
+from django.db.models import Prefetch
+from django.db.models import QuerySet
+
+# Local imports...
+from accounts.search import normalize
+from users.models import Friendship
+
+AUTH_USER_MODEL = getattr(settings, 'AUTH_USER_MODEL')
+
+# The owner fields needed to render a recipe in a list...
+OWNER_FIELDS = ('id', 'first_name', 'last_name', 'photo', 'photo_small', 'photo_small_2x', 'modified')
+
+# The kinds of words that recipes can be searched by...
+TOKEN_KINDS = (
+    ('T', 'title'),
+    ('G', 'tag'),
+    ('I', 'ingredient'),
+)
+
+# The kind of the tokens that hold whole ingredient names, to match lists of ingredients...
+INGREDIENT_NAME = 'N'
+
+
+def normalize_name(name):
+    """Collapses whitespace and lowercases an ingredient name, so that equal ingredients share a row."""
+    return ' '.join(name.split()).lower()
+
+
+def get_tags(tags):
+    """Splits a comma separated list of tags into normalized tags, without repeats."""
+    return sorted(set(normalize(tag) for tag in tags.split(',')) - {''})
+
+
+def get_tokens(name, tags, ingredient_names):
+    """
+    Gets the (kind, token) pairs that a recipe is found by: the words of its title, tags and
+    ingredients, and its whole ingredient names. Tokens are normalized like search queries (see
+    accounts.search.normalize).
+    """
+    tokens = set(('T', word) for word in normalize(name).split())
+    tokens.update(('G', word) for tag in get_tags(tags) for word in tag.split())
+
+    for ingredient_name in ingredient_names:
+        ingredient_name = normalize(ingredient_name)
+
+        if ingredient_name:
+            tokens.update(('I', word) for word in ingredient_name.split())
+            tokens.add((INGREDIENT_NAME, ingredient_name))
+
+    return tokens
+
+
+class IngredientQuerySet(QuerySet):
+    def get_or_create_all(self, names):
+        """
+        Gets a dict of ingredients keyed by normalized name, creating the missing ones. Takes two
+        queries, unless another request created one of the same ingredients concurrently: the bulk
+        insert is then rolled back, and the ingredients that are still missing are created one by one.
+        """
+        names = set(normalize_name(name) for name in names) - {''}
+        ingredients = {ingredient.name: ingredient for ingredient in self.filter(name__in=names)}
+        missing = names.difference(ingredients)
+
+        if missing:
+            try:
+                with transaction.atomic():
+                    self.bulk_create([Ingredient(name=name) for name in missing])
+            except IntegrityError:
+                # The whole insert was rolled back, not only the ingredient that clashed...
+                for name in missing:
+                    ingredients[name] = self.get_or_create(name=name)[0]
+            else:
+                ingredients.update((ingredient.name, ingredient) for ingredient in self.filter(name__in=missing))
+
+        return ingredients
+
+
+class Ingredient(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    # The number of recipes that use the ingredient...
+    recipe_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = IngredientQuerySet.as_manager()
+
+    def __unicode__(self):
+        return self.name
+
+
+class RecipeQuerySet(QuerySet):
+    def for_users(self, user_ids):
+        """Get all recipes owned by the users."""
+        return self.filter(owner__in=user_ids)
+
+    def for_friends(self, user):
+        """Get all recipes owned by the user's current friends (see Friendship.user_friends_q)."""
+        return self.filter(Friendship.user_friends_q(user, 'owner'))
+
+    def with_owner(self, fields=OWNER_FIELDS):
+        """
+        Fetches each recipe's owner in the same query, loading only the owner fields given. The
+        instructions are left out too, since lists do not show them.
+        """
+        return self.select_related('owner').only(
+            'name', 'description', 'tags', 'created', 'updated', 'ingredient_count', 'owner',
+            *['owner__%s' % field for field in fields]
+        )
+
+    def with_ingredients(self):
+        """
+        Fetches the ingredients of all the recipes with a single extra query, in order, as the
+        recipe_ingredients of each recipe (each with its ingredient).
+        """
+        return self.prefetch_related(Prefetch(
+            'recipe_ingredients',
+            queryset=RecipeIngredient.objects.select_related('ingredient').order_by('position', 'id')
+        ))
+
+
+class Recipe(models.Model):
+    owner = models.ForeignKey(AUTH_USER_MODEL, related_name='recipes')
+    name = models.CharField(max_length=250)
+    description = models.TextField(blank=True, default='')
+    tags = models.CharField(max_length=250, blank=True, default='', help_text='Comma separated, e.g. breakfast, sweet')
+    instructions = models.TextField(blank=True, default='')
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    # The number of ingredients in the recipe...
+    ingredient_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = RecipeQuerySet.as_manager()
+
+    class Meta:
+        index_together = [
+            ('owner', 'created'),
+        ]
+
+    def __unicode__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        super(Recipe, self).save(*args, **kwargs)
+
+        update_fields = kwargs.get('update_fields')
+
+        # Only the name and tags are indexed; the ingredients are indexed by set_ingredients...
+        if update_fields is None or {'name', 'tags'}.intersection(update_fields):
+            self.update_tokens()
+
+    @property
+    def tag_list(self):
+        return get_tags(self.tags)
+
+    def update_tokens(self, ingredient_names=None):
+        """Rewrites the recipe's entries in the search index, with a constant number of queries."""
+        if ingredient_names is None:
+            ingredient_names = Ingredient.objects.filter(recipe_ingredients__recipe=self).values_list('name', flat=True)
+
+        with transaction.atomic():
+            RecipeToken.objects.filter(recipe=self).delete()
+            RecipeToken.objects.bulk_create([
+                RecipeToken(recipe=self, owner_id=self.owner_id, kind=kind, token=token)
+                for kind, token in get_tokens(self.name, self.tags, ingredient_names)
+            ])
+
+    def set_ingredients(self, ingredients):
+        """
+        Replaces the ingredients of the recipe with a list of (name, quantity) pairs, in order. The
+        ingredients are written with a constant number of queries, however many there are, and the
+        denormalized counts are kept up to date; recipe ingredients should only be written here.
+        """
+        with transaction.atomic():
+            removed = self.recipe_ingredients.all()
+
+            Ingredient.objects.filter(recipe_ingredients__in=removed).update(recipe_count=F('recipe_count') - 1)
+            removed.delete()
+
+            by_name = Ingredient.objects.get_or_create_all(name for name, quantity in ingredients)
+            recipe_ingredients = []
+            seen = set()
+
+            for position, (name, quantity) in enumerate(ingredients):
+                name = normalize_name(name)
+
+                # Skip blank and repeated ingredients...
+                if name not in by_name or name in seen:
+                    continue
+
+                seen.add(name)
+                recipe_ingredients.append(RecipeIngredient(
+                    recipe=self,
+                    ingredient=by_name[name],
+                    quantity=quantity,
+                    position=position
+                ))
+
+            RecipeIngredient.objects.bulk_create(recipe_ingredients)
+
+            Ingredient.objects.filter(pk__in=[ri.ingredient_id for ri in recipe_ingredients]).update(
+                recipe_count=F('recipe_count') + 1
+            )
+            Recipe.objects.filter(pk=self.pk).update(ingredient_count=len(recipe_ingredients))
+            self.ingredient_count = len(recipe_ingredients)
+
+            self.update_tokens(seen)
+
+        return recipe_ingredients
+
+
+class RecipeIngredient(models.Model):
+    recipe = models.ForeignKey(Recipe, related_name='recipe_ingredients')
+    ingredient = models.ForeignKey(Ingredient, related_name='recipe_ingredients')
+    quantity = models.CharField(max_length=100, blank=True, default='')
+    position = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        unique_together = (
+            ('recipe', 'ingredient'),
+        )
+
+    def __unicode__(self):
+        return ('%s %s' % (self.quantity, self.ingredient.name)).strip()
+
+
+class RecipeToken(models.Model):
+    """
+    An entry of the recipe search index: a normalized token that the recipe is found by. The owner
+    is copied from the recipe, so that a token's posting list can be scoped to a user's friends
+    without a join.
+    """
+    token = models.CharField(max_length=100)
+    kind = models.CharField(max_length=1, choices=TOKEN_KINDS + ((INGREDIENT_NAME, 'ingredient name'),))
+    recipe = models.ForeignKey(Recipe, related_name='tokens')
+    owner = models.ForeignKey(AUTH_USER_MODEL, related_name='+')
 
-# Create your models here.
+    class Meta:
+        unique_together = (
+            ('recipe', 'kind', 'token'),
+        )
+        index_together = [
+            ('token', 'owner'),
+        ]
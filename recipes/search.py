@@ -0,0 +1,125 @@
+"""
+Recipe search backed by an inverted index (recipes.RecipeToken).
+
+Every recipe is indexed under the words of its title, its tags and its ingredients, and under its
+whole ingredient names, and each index row carries the recipe's owner. A search reads the posting
+lists (the recipe ids) of all its terms, restricted to the user's friends, in a single query on the
+(token, owner) index, and then intersects them in memory, smallest first, instead of joining the
+ingredient tables once per term.
+"""
+
+__author__ = 'parentj@eab.com (Jason Parent)'
+
+# Standard library imports...
+from collections import Counter
+from collections import defaultdict
+
+# Django imports...
+from django.conf import settings
+from django.db.models import Count
+from django.db.models import Q
+
+# Local imports...
+from accounts.search import normalize
+from users.models import Friendship
+from .models import INGREDIENT_NAME
+from .models import Recipe
+from .models import RecipeToken
+from .models import TOKEN_KINDS
+
+SEARCH_LIMIT = getattr(settings, 'RECIPE_SEARCH_LIMIT', 50)
+
+# The most recipe ids to send in one query, well under the parameter limits of the databases...
+BATCH_SIZE = 500
+
+
+def intersect(postings):
+    """Intersects posting lists, starting with the smallest, and stops as soon as nothing is left."""
+    postings = sorted(postings, key=len)
+    result = set(postings[0]) if postings else set()
+
+    for posting in postings[1:]:
+        if not result:
+            break
+
+        result &= posting
+
+    return result
+
+
+def get_makeable(postings, tokens):
+    """
+    Gets the recipes that use only the given ingredients: those that are in as many ingredient
+    posting lists as they have ingredient names. The recipes are those of the tokens, a queryset of
+    the matched ingredient tokens, which is sent as a subquery.
+    """
+    matches = Counter(recipe_id for posting in postings for recipe_id in posting)
+    counts = RecipeToken.objects.filter(kind=INGREDIENT_NAME, recipe__in=tokens.values('recipe'))
+
+    return set(
+        recipe_id for recipe_id, count in counts.values_list('recipe').annotate(count=Count('id'))
+        if matches[recipe_id] >= count
+    )
+
+
+def get_newest(recipe_ids, limit):
+    """Gets the ids of the newest recipes, up to the limit, reading their dates a batch at a time."""
+    recipe_ids = list(recipe_ids)
+
+    if len(recipe_ids) <= BATCH_SIZE:
+        return recipe_ids
+
+    dates = []
+
+    for i in range(0, len(recipe_ids), BATCH_SIZE):
+        batch = Recipe.objects.filter(pk__in=recipe_ids[i:i + BATCH_SIZE])
+        dates.extend(batch.order_by('-created', '-id').values_list('created', 'id')[:limit])
+
+    return [recipe_id for created, recipe_id in sorted(dates, reverse=True)[:limit]]
+
+
+def search_recipes(user, query='', ingredients=(), can_make=False, kind=None, limit=SEARCH_LIMIT):
+    """
+    Searches the recipes of the user's friends, newest first.
+
+    A recipe matches every word of the query in its title, its tags or its ingredients (or only in
+    one of those, if kind is given), and, when ingredients are given, uses all of them. With
+    can_make, it instead uses nothing but the given ingredients, i.e. the recipes the user can make
+    with them. Words and ingredients are normalized the same way as the index, so e.g. 'creme
+    fraiche' finds an ingredient with accents.
+    """
+    terms = set(normalize(query).split())
+    ingredients = set(normalize(name) for name in ingredients) - {''}
+
+    if not (terms or ingredients):
+        return []
+
+    # The friends are matched by subqueries, so that no list of ids is sent with the query...
+    friend_tokens = RecipeToken.objects.filter(Friendship.user_friends_q(user, 'owner'))
+    ingredient_tokens = friend_tokens.filter(token__in=ingredients, kind=INGREDIENT_NAME)
+    term_kinds = [kind] if kind is not None else [value for value, label in TOKEN_KINDS]
+    tokens = friend_tokens.filter(Q(token__in=terms, kind__in=term_kinds) | Q(token__in=ingredients, kind=INGREDIENT_NAME))
+    term_postings = defaultdict(set)
+    ingredient_postings = defaultdict(set)
+
+    for token, token_kind, recipe_id in tokens.values_list('token', 'kind', 'recipe_id'):
+        if token_kind == INGREDIENT_NAME:
+            ingredient_postings[token].add(recipe_id)
+        else:
+            term_postings[token].add(recipe_id)
+
+    postings = [term_postings[term] for term in terms]
+
+    if can_make:
+        postings.append(get_makeable(ingredient_postings.values(), ingredient_tokens))
+    else:
+        postings.extend(ingredient_postings[name] for name in ingredients)
+
+    recipe_ids = intersect(postings)
+
+    if not recipe_ids:
+        return []
+
+    recipes = Recipe.objects.filter(pk__in=get_newest(recipe_ids, limit)).with_owner().with_ingredients()
+
+    return list(recipes.order_by('-created', '-id')[:limit])
@@ -0,0 +1,16 @@
+__author__ = 'parentj@eab.com (Jason Parent)'
+
+# Django imports...
+from django.db.models import F
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+# Local imports...
+from .models import Ingredient
+from .models import Recipe
+
+
+@receiver(pre_delete, sender=Recipe)
+def uncount_ingredients(sender, instance, **kwargs):
+    """Keeps the recipe counts of the ingredients up to date when a recipe (or its owner) is deleted."""
+    Ingredient.objects.filter(recipe_ingredients__recipe=instance).update(recipe_count=F('recipe_count') - 1)
@@ -0,0 +1,115 @@
+__author__ = 'parentj@eab.com (Jason Parent)'
+
+# Third-party imports...
+from mock import patch
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+# Local imports...
+from ..models import Ingredient
+from ..models import IngredientQuerySet
+from ..models import Recipe
+
+User = get_user_model()
+
+
+class RecipeModelTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            first_name='Jason',
+            last_name='Parent',
+            username='parentj@eab.com',
+            email='parentj@eab.com',
+            password='pAssw0rd'
+        )
+
+        self.recipe = Recipe.objects.create(owner=self.user, name='Pancakes')
+
+    def create_recipes(self, count, ingredients):
+        for i in range(count):
+            recipe = Recipe.objects.create(owner=self.user, name='Recipe %d' % i)
+            recipe.set_ingredients(ingredients)
+
+    def test_sets_ingredients_in_order(self):
+        self.recipe.set_ingredients([('Flour', '2 cups'), ('Milk', '1 cup'), ('Eggs', '2')])
+
+        self.assertListEqual(
+            ['2 cups flour', '1 cup milk', '2 eggs'],
+            [unicode(ri) for ri in self.recipe.recipe_ingredients.order_by('position')]
+        )
+
+    def test_shares_normalized_ingredients(self):
+        other = Recipe.objects.create(owner=self.user, name='Bread')
+
+        self.recipe.set_ingredients([('Flour', '2 cups'), ('  flour ', '1 cup'), ('', '1')])
+        other.set_ingredients([('FLOUR', '3 cups')])
+
+        self.assertEqual(Ingredient.objects.count(), 1)
+        self.assertEqual(self.recipe.ingredient_count, 1)
+
+    def test_creates_every_ingredient_when_another_request_creates_one(self):
+        Ingredient.objects.create(name='milk')
+
+        # Another request inserts one of the ingredients first, so the whole bulk insert fails...
+        with patch.object(IngredientQuerySet, 'bulk_create', side_effect=IntegrityError):
+            ingredients = Ingredient.objects.get_or_create_all(['Flour', 'Milk', 'Eggs', 'Salt'])
+
+        self.assertSetEqual(set(ingredients), {'flour', 'milk', 'eggs', 'salt'})
+        self.assertSetEqual(set(Ingredient.objects.values_list('name', flat=True)), {'flour', 'milk', 'eggs', 'salt'})
+
+    def test_keeps_counts_up_to_date(self):
+        self.recipe.set_ingredients([('Flour', ''), ('Milk', '')])
+        Recipe.objects.create(owner=self.user, name='Bread').set_ingredients([('Flour', '')])
+
+        self.assertEqual(Recipe.objects.get(pk=self.recipe.pk).ingredient_count, 2)
+        self.assertEqual(Ingredient.objects.get(name='flour').recipe_count, 2)
+
+        self.recipe.set_ingredients([('Milk', ''), ('Eggs', '')])
+
+        counts = dict(Ingredient.objects.values_list('name', 'recipe_count'))
+
+        self.assertDictEqual(counts, {'flour': 1, 'milk': 1, 'eggs': 1})
+
+    def test_deleting_recipe_updates_ingredient_counts(self):
+        self.recipe.set_ingredients([('Flour', ''), ('Milk', '')])
+        Recipe.objects.create(owner=self.user, name='Bread').set_ingredients([('Flour', '')])
+
+        self.recipe.delete()
+
+        self.assertDictEqual(dict(Ingredient.objects.values_list('name', 'recipe_count')), {'flour': 1, 'milk': 0})
+
+        self.user.delete()
+
+        self.assertDictEqual(dict(Ingredient.objects.values_list('name', 'recipe_count')), {'flour': 0, 'milk': 0})
+
+    def test_sets_ingredients_in_constant_number_of_queries(self):
+        with CaptureQueriesContext(connection) as few:
+            self.recipe.set_ingredients([('Flour', '')])
+
+        with CaptureQueriesContext(connection) as many:
+            self.recipe.set_ingredients([('Ingredient %d' % i, '') for i in range(10)])
+
+        self.assertEqual(len(few), len(many))
+
+    def test_lists_recipes_with_owners_and_ingredients_in_two_queries(self):
+        self.create_recipes(5, [('Flour', '2 cups'), ('Milk', '1 cup')])
+
+        with self.assertNumQueries(2):
+            recipes = list(Recipe.objects.with_owner().with_ingredients())
+
+            for recipe in recipes:
+                recipe.owner.get_full_name()
+                [ri.ingredient.name for ri in recipe.recipe_ingredients.all()]
+
+        self.assertEqual(len(recipes), 6)
+
+    def test_filters_recipes_by_owner(self):
+        regina = User.objects.create_user('regina', 'regina@example.com', 'password1')
+        Recipe.objects.create(owner=regina, name='Waffles')
+
+        self.assertListEqual(['Waffles'], [r.name for r in Recipe.objects.for_users([regina.pk])])
@@ -0,0 +1,136 @@
+__author__ = 'parentj@eab.com (Jason Parent)'
+
+# Third-party imports...
+from mock import patch
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+# Local imports...
+from users.models import Friendship
+from ..models import Recipe
+from ..models import RecipeToken
+from ..search import intersect
+from ..search import search_recipes
+
+User = get_user_model()
+
+
+class RecipeSearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create_user(
+            username='parentj@eab.com',
+            email='parentj@eab.com',
+            password='pAssw0rd'
+        )
+
+        self.friend = User.objects.create_user('regina', 'regina@example.com', 'pAssw0rd')
+        Friendship.objects.create(sender=self.user, receiver=self.friend, status='A')
+
+        self.create_recipe('Pancakes', 'Breakfast, Sweet', ['Flour', 'Milk', 'Eggs'])
+        self.create_recipe('Scrambled Eggs', 'Breakfast', ['Eggs', 'Butter'])
+        self.create_recipe('Flatbread', '', ['Flour', 'Water'])
+
+    def create_recipe(self, name, tags, ingredients, owner=None):
+        recipe = Recipe.objects.create(owner=owner or self.friend, name=name, tags=tags)
+        recipe.set_ingredients([(ingredient, '') for ingredient in ingredients])
+
+        return recipe
+
+    def search(self, **kwargs):
+        return sorted(recipe.name for recipe in search_recipes(self.user, **kwargs))
+
+    def test_intersects_smallest_posting_first(self):
+        self.assertSetEqual(intersect([{1, 2, 3}, {2}, {2, 3}]), {2})
+        self.assertSetEqual(intersect([]), set())
+
+    def test_indexes_title_tags_and_ingredients(self):
+        recipe = Recipe.objects.get(name='Pancakes')
+
+        self.assertSetEqual(set(recipe.tokens.values_list('kind', 'token')), {
+            ('T', 'pancakes'), ('G', 'breakfast'), ('G', 'sweet'), ('I', 'flour'), ('I', 'milk'), ('I', 'eggs'),
+            ('N', 'flour'), ('N', 'milk'), ('N', 'eggs')
+        })
+
+    def test_reindexes_renamed_recipe(self):
+        recipe = Recipe.objects.get(name='Flatbread')
+        recipe.name = 'Naan'
+        recipe.save()
+
+        self.assertListEqual(self.search(query='flatbread'), [])
+        self.assertListEqual(self.search(query='naan'), ['Naan'])
+
+    def test_matches_every_query_word(self):
+        self.assertListEqual(self.search(query='breakfast'), ['Pancakes', 'Scrambled Eggs'])
+        self.assertListEqual(self.search(query='breakfast sweet'), ['Pancakes'])
+        self.assertListEqual(self.search(query='Eggs'), ['Pancakes', 'Scrambled Eggs'])
+
+    def test_restricts_query_to_kind(self):
+        self.assertListEqual(self.search(query='eggs', kind='T'), ['Scrambled Eggs'])
+        self.assertListEqual(self.search(query='eggs', kind='G'), [])
+
+    def test_matches_all_ingredients(self):
+        self.assertListEqual(self.search(ingredients=['flour']), ['Flatbread', 'Pancakes'])
+        self.assertListEqual(self.search(ingredients=['FLOUR', ' milk ']), ['Pancakes'])
+
+    def test_finds_recipes_that_can_be_made(self):
+        self.assertListEqual(self.search(ingredients=['flour', 'water', 'eggs', 'butter'], can_make=True), [
+            'Flatbread', 'Scrambled Eggs'
+        ])
+        self.assertListEqual(self.search(ingredients=['flour', 'eggs'], can_make=True), [])
+        self.assertListEqual(self.search(query='breakfast', ingredients=['eggs', 'butter', 'water'], can_make=True), [
+            'Scrambled Eggs'
+        ])
+
+    def test_matches_multi_word_tags(self):
+        self.create_recipe('Mac and Cheese', 'Comfort Food', ['Macaroni', 'Cheese'])
+
+        self.assertListEqual(self.search(query='comfort food', kind='G'), ['Mac and Cheese'])
+        self.assertListEqual(self.search(query='Comfort  Food'), ['Mac and Cheese'])
+
+    def test_matches_multi_word_ingredients(self):
+        self.create_recipe('Focaccia', '', ['Flour', 'Olive Oil'])
+
+        self.assertListEqual(self.search(query='olive oil', kind='I'), ['Focaccia'])
+        self.assertListEqual(self.search(ingredients=['olive oil']), ['Focaccia'])
+        self.assertListEqual(self.search(ingredients=['olive']), [])
+        self.assertListEqual(self.search(ingredients=['flour', 'olive  oil', 'water'], can_make=True), [
+            'Flatbread', 'Focaccia'
+        ])
+
+    def test_matches_accented_ingredients(self):
+        self.create_recipe('Poppers', '', [u'Jalape\xf1o', u'Cr\xe8me Fra\xeeche'])
+
+        self.assertListEqual(self.search(query=u'jalape\xf1o'), ['Poppers'])
+        self.assertListEqual(self.search(query='jalapeno', kind='I'), ['Poppers'])
+        self.assertListEqual(self.search(ingredients=[u'Cr\xe8me Fra\xeeche']), ['Poppers'])
+        self.assertListEqual(self.search(ingredients=['creme fraiche', 'jalapeno'], can_make=True), ['Poppers'])
+
+    def test_only_finds_friends_recipes(self):
+        stranger = User.objects.create_user('stranger', 'stranger@example.com', 'pAssw0rd')
+        self.create_recipe('Pancakes', 'Breakfast', ['Flour'], owner=stranger)
+        self.create_recipe('Toast', 'Breakfast', ['Bread'], owner=self.user)
+
+        self.assertListEqual(self.search(query='breakfast'), ['Pancakes', 'Scrambled Eggs'])
+
+    def test_searches_in_constant_number_of_queries(self):
+        with self.assertNumQueries(3):
+            recipes = search_recipes(self.user, query='breakfast', ingredients=['eggs'])
+            [ri.ingredient.name for recipe in recipes for ri in recipe.recipe_ingredients.all()]
+
+        self.assertEqual(len(recipes), 2)
+
+    def test_keeps_newest_matches_when_fetching_in_batches(self):
+        with patch('recipes.search.BATCH_SIZE', 1):
+            recipes = search_recipes(self.user, query='breakfast', limit=1)
+
+        self.assertListEqual([recipe.name for recipe in recipes], ['Scrambled Eggs'])
+
+    def test_deleting_recipe_removes_tokens(self):
+        Recipe.objects.all().delete()
+
+        self.assertFalse(RecipeToken.objects.exists())
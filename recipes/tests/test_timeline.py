@@ -0,0 +1,114 @@
+__author__ = 'parentj@eab.com (Jason Parent)'
+
+# Standard library imports...
+import datetime
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+# Local imports...
+from users.models import Friendship
+from ..models import Recipe
+from ..timeline import get_timeline
+
+User = get_user_model()
+
+
+class TimelineTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create_user(
+            username='parentj@eab.com',
+            email='parentj@eab.com',
+            password='pAssw0rd'
+        )
+
+        self.now = timezone.now()
+
+    def create_friend(self, username, status='A'):
+        friend = User.objects.create_user(username, '%s@example.com' % username, 'pAssw0rd')
+        Friendship.objects.create(sender=self.user, receiver=friend, status=status)
+
+        return friend
+
+    def create_recipe(self, owner, name, minutes_ago):
+        recipe = Recipe.objects.create(owner=owner, name=name)
+
+        # Recipes are created now, so move them back in time...
+        Recipe.objects.filter(pk=recipe.pk).update(created=self.now - datetime.timedelta(minutes=minutes_ago))
+
+        return recipe
+
+    def test_timeline_shows_accepted_friends_recipes_newest_first(self):
+        regina = self.create_friend('regina')
+        travis = self.create_friend('travis')
+        pending = self.create_friend('pending', status='P')
+
+        self.create_recipe(regina, 'Waffles', 30)
+        self.create_recipe(travis, 'Chili', 10)
+        self.create_recipe(regina, 'Pancakes', 20)
+        self.create_recipe(pending, 'Tacos', 5)
+        self.create_recipe(self.user, 'Omelette', 1)
+
+        recipes, next_cursor = get_timeline(self.user)
+
+        self.assertListEqual(['Chili', 'Pancakes', 'Waffles'], [r.name for r in recipes])
+        self.assertIsNone(next_cursor)
+
+    def test_timeline_pages_through_all_recipes(self):
+        regina = self.create_friend('regina')
+
+        for i in range(5):
+            self.create_recipe(regina, 'Recipe %d' % i, i)
+
+        names = []
+        cursor = None
+
+        while True:
+            recipes, cursor = get_timeline(self.user, cursor, limit=2)
+            names.extend(r.name for r in recipes)
+
+            if cursor is None:
+                break
+
+        self.assertListEqual(['Recipe %d' % i for i in range(5)], names)
+
+    def test_timeline_query_count_does_not_grow_with_friends(self):
+        for i in range(10):
+            friend = self.create_friend('friend%d' % i)
+            self.create_recipe(friend, 'Recipe %d' % i, i).set_ingredients([('Flour', '1 cup')])
+
+        with self.assertNumQueries(2):
+            recipes, next_cursor = get_timeline(self.user, limit=5)
+
+            for recipe in recipes:
+                recipe.owner.get_full_name()
+                list(recipe.recipe_ingredients.all())
+
+    def test_timeline_handles_more_friends_than_query_parameters(self):
+        # More friends than SQLite allows parameters in one query (999)...
+        User.objects.bulk_create([
+            User(username='friend%d' % i, email='friend%d@example.com' % i) for i in range(1200)
+        ])
+        friend_ids = User.objects.filter(username__startswith='friend').values_list('pk', flat=True)
+
+        Friendship.objects.bulk_create([Friendship(
+            sender=self.user,
+            receiver_id=friend_id,
+            status='A',
+            low_user_id=min(self.user.pk, friend_id),
+            high_user_id=max(self.user.pk, friend_id)
+        ) for friend_id in friend_ids])
+
+        self.create_recipe(User.objects.get(username='friend1100'), 'Waffles', 1)
+
+        recipes, next_cursor = get_timeline(self.user)
+
+        self.assertListEqual(['Waffles'], [r.name for r in recipes])
+
+    def test_timeline_is_empty_without_friends(self):
+        self.assertEqual(get_timeline(self.user), ([], None))
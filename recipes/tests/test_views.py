@@ -2,17 +2,24 @@ __author__ = 'parentj@eab.com (Jason Parent)'
 
 # Django imports...
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
 from django.test import TestCase
 from django.test.client import RequestFactory
 
 # Local imports...
+from users.models import Friendship
+from ..models import Recipe
 from ..views import home_view
+from ..views import search_view
 
 User = get_user_model()
 
 
 class HomeViewTest(TestCase):
     def setUp(self):
+        cache.clear()
+
         self.factory = RequestFactory()
         self.request = self.factory.get('/recipes/')
         self.request.user = User.objects.create_user(
@@ -24,4 +31,58 @@ class HomeViewTest(TestCase):
     def test_home_view_renders_home_template(self):
         response = home_view(self.request)
 
-        self.assertTemplateUsed(response, 'recipes/home.html')
\ No newline at end of file
+        self.assertTemplateUsed(response, 'recipes/home.html')
+
+    def test_home_view_renders_friends_recipes(self):
+        friend = User.objects.create_user('regina', 'regina@example.com', 'pAssw0rd')
+        Friendship.objects.create(sender=self.request.user, receiver=friend, status='A')
+        Recipe.objects.create(owner=friend, name='Waffles').set_ingredients([('Flour', '2 cups')])
+
+        response = home_view(self.request)
+
+        self.assertContains(response, 'Waffles')
+        self.assertContains(response, '2 cups flour')
+
+    def test_home_view_raises_404_for_malformed_cursor(self):
+        request = self.factory.get('/recipes/', {'cursor': 'nonsense'})
+        request.user = self.request.user
+
+        self.assertRaises(Http404, home_view, request)
+
+
+class SearchViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(
+            username='parentj@eab.com',
+            email='parentj@eab.com',
+            password='pAssw0rd'
+        )
+
+        friend = User.objects.create_user('regina', 'regina@example.com', 'pAssw0rd')
+        Friendship.objects.create(sender=self.user, receiver=friend, status='A')
+        Recipe.objects.create(owner=friend, name='Waffles', tags='Breakfast').set_ingredients([('Flour', '2 cups')])
+        Recipe.objects.create(owner=friend, name='Bread').set_ingredients([('Flour', '3 cups'), ('Yeast', '')])
+
+    def search(self, **params):
+        request = self.factory.get('/recipes/search/', params)
+        request.user = self.user
+
+        return search_view(request)
+
+    def test_search_view_renders_matching_recipes(self):
+        response = self.search(search='breakfast', kind='tag')
+
+        self.assertContains(response, 'Waffles')
+        self.assertNotContains(response, 'Bread')
+
+    def test_search_view_finds_recipes_that_can_be_made(self):
+        response = self.search(ingredients='flour', can_make='1')
+
+        self.assertContains(response, 'Waffles')
+        self.assertNotContains(response, 'Bread')
+
+    def test_search_view_raises_404_for_unknown_kind(self):
+        self.assertRaises(Http404, self.search, search='waffles', kind='nonsense')
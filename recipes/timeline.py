@@ -0,0 +1,25 @@
+__author__ = 'parentj@eab.com (Jason Parent)'
+
+# Django imports...
+from django.conf import settings
+
+# Local imports...
+from users.pagination import paginate
+from .models import Recipe
+
+TIMELINE_PAGE_SIZE = getattr(settings, 'TIMELINE_PAGE_SIZE', 20)
+
+
+def get_timeline(user, cursor=None, limit=TIMELINE_PAGE_SIZE):
+    """
+    Gets a page of the recipes of the user's friends, newest first, along with the cursor for the
+    next page (None on the last page). Raises a ValueError for a malformed cursor.
+
+    The friends are matched with subqueries on the friendships, so the query stays the same size
+    however many friends the user has. The page is a single range scan on the indexed created column
+    that starts at the cursor, plus one query for the ingredients, instead of loading and sorting
+    every friend's recipes, so deep pages cost the same as the first one.
+    """
+    recipes = Recipe.objects.for_friends(user).with_owner().with_ingredients()
+
+    return paginate(recipes, cursor, limit=limit, field='created', descending=True)
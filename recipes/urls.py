@@ -5,4 +5,5 @@ from django.conf.urls import patterns, url
 
 urlpatterns = patterns('recipes.views',
     url(r'^$', 'home_view', name='home'),
+    url(r'^search/$', 'search_view', name='search'),
 )
\ No newline at end of file
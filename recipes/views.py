@@ -3,11 +3,57 @@ __author__ = 'parentj@eab.com (Jason Parent)'
 # Django imports...
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.http import Http404
 from django.shortcuts import render
 
+# Local imports...
+from .models import TOKEN_KINDS
+from .search import search_recipes
+from .timeline import get_timeline
+
 User = get_user_model()
 
 
 @login_required
 def home_view(request):
-    return render(request, 'recipes/home.html')
\ No newline at end of file
+    try:
+        recipes, next_cursor = get_timeline(request.user, request.GET.get('cursor'))
+    except ValueError:
+        raise Http404
+
+    return render(request, 'recipes/home.html', {
+        'recipes': recipes,
+        'next_cursor': next_cursor,
+        'kinds': TOKEN_KINDS
+    })
+
+
+@login_required
+def search_view(request):
+    search = request.GET.get('search', '')
+    kind = request.GET.get('kind', '')
+    ingredients = request.GET.get('ingredients', '')
+    can_make = bool(request.GET.get('can_make'))
+
+    # The kind is given by its label, e.g. 'tag'...
+    kinds = {label: value for value, label in TOKEN_KINDS}
+
+    if kind and kind not in kinds:
+        raise Http404
+
+    recipes = search_recipes(
+        request.user,
+        query=search,
+        ingredients=ingredients.split(','),
+        can_make=can_make,
+        kind=kinds.get(kind)
+    )
+
+    return render(request, 'recipes/search.html', {
+        'recipes': recipes,
+        'search': search,
+        'kind': kind,
+        'kinds': TOKEN_KINDS,
+        'ingredients': ingredients,
+        'can_make': can_make
+    })
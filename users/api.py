@@ -0,0 +1,154 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import hashlib
+import json
+from functools import wraps
+
+# Django imports...
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth import get_user_model
+from django.contrib.auth.decorators import login_required
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404
+from django.http import HttpResponse
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.utils.http import quote_etag
+
+# Local imports...
+from accounts.search import search as search_users
+from .conditions import friendship_condition
+from .models import FRIEND_FIELDS
+from .models import FeedEvent
+from .models import Friendship
+from .page_cache import get_stats
+from .pagination import paginate
+from .suggestions import suggest_friends
+from .views import FEED_PAGE_SIZE
+from .views import SUGGESTION_LIMIT
+from .views import USER_SEARCH_LIMIT
+
+User = get_user_model()
+
+
+def json_view(view):
+    """Renders the data returned by the view as JSON."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        content = json.dumps(view(request, *args, **kwargs), cls=DjangoJSONEncoder, separators=(',', ':'))
+
+        return HttpResponse(content, content_type='application/json')
+
+    return wrapper
+
+
+def content_etag(view):
+    """
+    Adds a strong ETag computed from the content to the view's responses. A request whose
+    If-None-Match header carries the same ETag gets an empty 304 response instead. Unlike the
+    version-based conditions, this still runs the view, so it is for responses that depend on more
+    than the user's own friendships (i.e. search results).
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        etag = hashlib.md5(response.content).hexdigest()
+
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+
+        response['ETag'] = quote_etag(etag)
+
+        # Responses differ per user, so they may only be cached by the user's browser...
+        patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+        patch_vary_headers(response, ['Cookie'])
+
+        return response
+
+    return wrapper
+
+
+def serialize_user(user):
+    """Projects a user onto the fields that the users pages display."""
+    return {
+        'id': user.pk,
+        'name': user.get_full_name(),
+        'photo_url': user.photo_small_url,
+        'photo_2x_url': user.photo_small_2x_url
+    }
+
+
+@login_required
+@content_etag
+@json_view
+def list_view(request):
+    users = Friendship.user_exclude_friends(request.user, User.objects.only(*FRIEND_FIELDS))
+    users = search_users(users, request.GET.get('search', ''))[:USER_SEARCH_LIMIT]
+
+    return {
+        'users': map(serialize_user, users)
+    }
+
+
+@login_required
+@content_etag
+@json_view
+def suggestions_view(request):
+    users = suggest_friends(request.user, limit=SUGGESTION_LIMIT)
+
+    return {
+        'users': [dict(serialize_user(user), mutual_friends=user.mutual_friends) for user in users]
+    }
+
+
+@login_required
+@friendship_condition
+@json_view
+def requests_view(request):
+    friendships = Friendship.objects.pending_received(request.user, fields=FRIEND_FIELDS)
+
+    return {
+        'users': map(serialize_user, Friendship.user_list_friends(request.user, friendships))
+    }
+
+
+@login_required
+@friendship_condition
+@json_view
+def friends_view(request):
+    friendships = Friendship.objects.current(request.user, fields=FRIEND_FIELDS)
+
+    return {
+        'users': map(serialize_user, Friendship.user_list_friends(request.user, friendships))
+    }
+
+
+@login_required
+@friendship_condition
+@json_view
+def feed_view(request):
+    events = FeedEvent.objects.for_user(request.user).select_related('first_subject', 'indirect_object')
+
+    try:
+        events, next_cursor = paginate(events, request.GET.get('cursor'), limit=FEED_PAGE_SIZE, descending=True)
+    except ValueError:
+        raise Http404
+
+    return {
+        'events': [{
+            'heading': event.heading,
+            'date': event.date,
+            'first_subject': serialize_user(event.first_subject),
+            'indirect_object': serialize_user(event.indirect_object)
+        } for event in events],
+        'next_cursor': next_cursor
+    }
+
+
+@staff_member_required
+@json_view
+def page_cache_view(request):
+    return get_stats()
@@ -0,0 +1,41 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Django imports...
+from django.db.models import Count
+from django.db.models import Max
+from django.db.models import Q
+
+# Local imports...
+from accounts.conditions import private_condition
+from accounts.conditions import version_etag
+from .models import Friendship
+
+
+def friendship_version(user):
+    """
+    Gets a version of everything the friendship pages show the user, with a single aggregate query:
+    the number of friendships (which changes when one is removed), the last time one was updated and
+    the last time either user in one of them edited their profile.
+    """
+    version = Friendship.objects.filter(Q(sender=user) | Q(receiver=user)).aggregate(
+        count=Count('id'),
+        updated=Max('updated'),
+        sender_modified=Max('sender__modified'),
+        receiver_modified=Max('receiver__modified')
+    )
+
+    return (
+        user.pk,
+        user.modified,
+        version['count'],
+        version['updated'],
+        max(version['sender_modified'], version['receiver_modified'])
+    )
+
+
+def friendship_etag(request, *args, **kwargs):
+    return version_etag(*friendship_version(request.user))
+
+
+# For views that only display the request user and their friendships...
+friendship_condition = private_condition(etag_func=friendship_etag)
@@ -0,0 +1,344 @@
+"""
+An in-memory graph of accepted friendships, stored in compressed sparse row (CSR) form.
+
+The users are kept in a sorted int32 array and each user's neighbors in a slice of one shared int32
+array, so the graph costs 8 bytes per friendship (4 bytes in each direction) plus 8 bytes per user,
+instead of Python objects per edge. Changes made after the graph was built are kept in a small
+overlay and folded into the arrays once the overlay grows past REBUILD_THRESHOLD.
+
+The graph lives in the process that loaded it, and the friendship signals keep it up to date (see
+users.signals). Changes made inside a transaction are read back from the database once the request
+is finished, so a rolled back friendship never shows up. Every change also bumps a version shared
+by all processes in FRIEND_CACHE, and a process whose graph is behind reloads it, at most every
+FRIEND_GRAPH_MAX_AGE seconds.
+
+Reads and changes may come from any of the process's threads, so both take the graph's lock.
+"""
+
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import bisect
+import threading
+import time
+from array import array
+from collections import deque
+
+# Django imports...
+from django.conf import settings
+from django.core.cache import caches
+
+# Local imports...
+from .models import FRIEND_CACHE
+from .models import Friendship
+
+# The number of overlay edges that triggers rebuilding the arrays...
+REBUILD_THRESHOLD = getattr(settings, 'FRIEND_GRAPH_REBUILD_THRESHOLD', 1000)
+
+# The longest a graph that other processes have changed friendships since is used, in seconds...
+FRIEND_GRAPH_MAX_AGE = getattr(settings, 'FRIEND_GRAPH_MAX_AGE', 60)
+
+# The most friendships read back in one query (see sync_graph), well under the parameter limits...
+SYNC_LIMIT = 400
+
+VERSION_KEY = 'friend_graph:version'
+
+# 'i' is a 4 byte signed int on every platform we deploy to...
+INT32 = 'i'
+
+
+class FriendGraph(object):
+    def __init__(self, edges=()):
+        self._lock = threading.RLock()
+        self._build(edges)
+
+    @classmethod
+    def load(cls):
+        """Builds a graph from the accepted friendships in the database."""
+        return cls(Friendship.objects.filter(status='A').values_list('sender_id', 'receiver_id').iterator())
+
+    def _build(self, edges):
+        adjacency = {}
+
+        for user_id, friend_id in edges:
+            if user_id == friend_id:
+                continue
+
+            adjacency.setdefault(user_id, set()).add(friend_id)
+            adjacency.setdefault(friend_id, set()).add(user_id)
+
+        nodes = array(INT32, sorted(adjacency))
+        offsets = array(INT32, [0])
+        neighbors = array(INT32)
+
+        for user_id in nodes:
+            neighbors.extend(sorted(adjacency[user_id]))
+            offsets.append(len(neighbors))
+
+        with self._lock:
+            self.nodes, self.offsets, self.neighbors = nodes, offsets, neighbors
+
+            # Edges changed since the arrays were built, keyed by user id in both directions...
+            self._added = {}
+            self._removed = {}
+            self._overlay_size = 0
+
+    def _index(self, user_id):
+        i = bisect.bisect_left(self.nodes, user_id)
+
+        if i < len(self.nodes) and self.nodes[i] == user_id:
+            return i
+
+        return None
+
+    def _stored_range(self, user_id):
+        """Gets the (start, end) positions of the user's friends in the neighbors array."""
+        i = self._index(user_id)
+
+        if i is None:
+            return 0, 0
+
+        return self.offsets[i], self.offsets[i + 1]
+
+    def _is_stored(self, user_id, friend_id):
+        start, end = self._stored_range(user_id)
+        i = bisect.bisect_left(self.neighbors, friend_id, start, end)
+
+        return i < end and self.neighbors[i] == friend_id
+
+    def _edges(self):
+        for user_id in self.users():
+            for friend_id in self.friends(user_id):
+                if user_id < friend_id:
+                    yield user_id, friend_id
+
+    def _change(self, user_id, friend_id, add):
+        if user_id == friend_id:
+            return
+
+        with self._lock:
+            for a, b in ((user_id, friend_id), (friend_id, user_id)):
+                stored = self._is_stored(a, b)
+                added, removed = self._added.setdefault(a, set()), self._removed.setdefault(a, set())
+
+                if add:
+                    removed.discard(b)
+
+                    if not stored:
+                        added.add(b)
+                else:
+                    added.discard(b)
+
+                    if stored:
+                        removed.add(b)
+
+            self._overlay_size += 1
+
+            if self._overlay_size > REBUILD_THRESHOLD:
+                self.rebuild()
+
+    def add_friendship(self, user_id, friend_id):
+        self._change(user_id, friend_id, add=True)
+
+    def remove_friendship(self, user_id, friend_id):
+        self._change(user_id, friend_id, add=False)
+
+    def rebuild(self):
+        """Folds the overlay into the arrays."""
+        with self._lock:
+            self._build(list(self._edges()))
+
+    def users(self):
+        """Gets the ids of all users with at least one friend."""
+        with self._lock:
+            users = set(self.nodes)
+            users.update(user_id for user_id, added in self._added.items() if added)
+
+            return sorted(user_id for user_id in users if self.degree(user_id))
+
+    def friends(self, user_id):
+        """Gets the ids of the user's friends, in ascending order."""
+        with self._lock:
+            start, end = self._stored_range(user_id)
+            stored = self.neighbors[start:end]
+            added, removed = self._added.get(user_id), self._removed.get(user_id)
+
+            if not added and not removed:
+                return list(stored)
+
+            return sorted(set(stored).difference(removed or ()).union(added or ()))
+
+    def degree(self, user_id):
+        return len(self.friends(user_id))
+
+    def mutual_count(self, user_id, friend_id):
+        """Counts the friends that both users share, merging their sorted friend lists."""
+        with self._lock:
+            a, b = self.friends(user_id), self.friends(friend_id)
+        i = j = count = 0
+
+        while i < len(a) and j < len(b):
+            if a[i] == b[j]:
+                count += 1
+                i += 1
+                j += 1
+            elif a[i] < b[j]:
+                i += 1
+            else:
+                j += 1
+
+        return count
+
+    def distance(self, user_id, friend_id, max_depth=None):
+        """
+        Gets the degrees of separation between the users with a breadth-first search, or None if they
+        are not connected (within max_depth, if given).
+        """
+        if user_id == friend_id:
+            return 0
+
+        visited = {user_id}
+        frontier = deque([(user_id, 0)])
+
+        while frontier:
+            current, depth = frontier.popleft()
+
+            if max_depth is not None and depth >= max_depth:
+                continue
+
+            for neighbor in self.friends(current):
+                if neighbor == friend_id:
+                    return depth + 1
+
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    frontier.append((neighbor, depth + 1))
+
+        return None
+
+    def degree_stats(self):
+        with self._lock:
+            degrees = sorted(self.degree(user_id) for user_id in self.users())
+
+        if not degrees:
+            return {'users': 0, 'friendships': 0, 'min': 0, 'max': 0, 'mean': 0.0, 'median': 0}
+
+        return {
+            'users': len(degrees),
+            'friendships': sum(degrees) // 2,
+            'min': degrees[0],
+            'max': degrees[-1],
+            'mean': float(sum(degrees)) / len(degrees),
+            'median': degrees[len(degrees) // 2],
+        }
+
+    @property
+    def nbytes(self):
+        """The size of the arrays in bytes, excluding the overlay."""
+        with self._lock:
+            return sum(a.itemsize * len(a) for a in (self.nodes, self.offsets, self.neighbors))
+
+    @property
+    def bytes_per_edge(self):
+        edges = len(self.neighbors) // 2
+
+        return float(self.nbytes) / edges if edges else 0.0
+
+
+_graph_lock = threading.Lock()
+
+_state = {
+    'graph': None,
+    'version': None,
+    'loaded': 0
+}
+
+
+def get_graph():
+    """
+    Gets the process-wide friend graph, loading it on first use, and reloading it once other
+    processes have changed friendships and it is older than FRIEND_GRAPH_MAX_AGE.
+    """
+    cache = caches[FRIEND_CACHE]
+    version = cache.get(VERSION_KEY)
+    graph = _state['graph']
+
+    # Changes made while the version was missing from the cache are unknown, so start over...
+    stale = version is None
+
+    if stale:
+        cache.add(VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(VERSION_KEY)
+
+    expired = version != _state['version'] and time.time() - _state['loaded'] >= FRIEND_GRAPH_MAX_AGE
+
+    if graph is None or stale or expired:
+        with _graph_lock:
+            # Another thread may have reloaded it while this one waited...
+            if _state['graph'] is graph:
+                _state.update(graph=FriendGraph.load(), version=version, loaded=time.time())
+
+    return _state['graph']
+
+
+def reset_graph():
+    """Drops the process-wide friend graph, so that the next get_graph reloads it."""
+    with _graph_lock:
+        _state.update(graph=None, version=None, loaded=0)
+
+
+def bump_version():
+    """Tells the other processes that friendships changed, so that they reload their graphs."""
+    try:
+        version = caches[FRIEND_CACHE].incr(VERSION_KEY)
+    except ValueError:
+        # The version is missing, so every process reloads anyway...
+        return
+
+    with _graph_lock:
+        # If no other process changed friendships since the graph was loaded, it is still current...
+        if _state['graph'] is not None and version == _state['version'] + 1:
+            _state['version'] = version
+
+
+def update_graph(friendships, deleted=False):
+    """
+    Applies saved or deleted friendships to the process-wide graph, if it has been loaded. Only call
+    this once the changes are committed.
+    """
+    graph = _state['graph']
+
+    if graph is not None:
+        for friendship in friendships:
+            if not deleted and friendship.status == 'A':
+                graph.add_friendship(friendship.sender_id, friendship.receiver_id)
+            else:
+                graph.remove_friendship(friendship.sender_id, friendship.receiver_id)
+
+    bump_version()
+
+
+def sync_graph(pairs):
+    """
+    Reads the friendships between pairs of user ids (as (low, high) pair keys) back from the database
+    and applies them to the process-wide graph, for changes made inside a transaction that may have
+    been rolled back.
+    """
+    graph = _state['graph']
+
+    if graph is not None and len(pairs) > SYNC_LIMIT:
+        reset_graph()
+    elif graph is not None:
+        accepted = set(Friendship.objects.filter(
+            status='A',
+            low_user_id__in=set(low for low, high in pairs),
+            high_user_id__in=set(high for low, high in pairs)
+        ).values_list('low_user_id', 'high_user_id'))
+
+        for low, high in pairs:
+            if (low, high) in accepted:
+                graph.add_friendship(low, high)
+            else:
+                graph.remove_friendship(low, high)
+
+    bump_version()
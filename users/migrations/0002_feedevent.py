@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+from django.conf import settings
+
+FRIENDSHIP_STATUS_DISPLAY = {
+    'A': 'accepted',
+    'R': 'rejected',
+}
+
+
+def publish_feed_events(apps, schema_editor):
+    """Backfills feed events for friendships that were created before the feed was materialized."""
+    Friendship = apps.get_model('users', 'Friendship')
+    FeedEvent = apps.get_model('users', 'FeedEvent')
+
+    events = []
+
+    for friendship in Friendship.objects.select_related('sender', 'receiver'):
+        sender, receiver = friendship.sender, friendship.receiver
+
+        for owner in (sender, receiver):
+            events.append(FeedEvent(
+                owner=owner,
+                friendship=friendship,
+                first_subject=sender,
+                indirect_object=receiver,
+                heading='%s added %s as a friend' % (sender.first_name, receiver.first_name),
+                date=friendship.created
+            ))
+
+            if friendship.updated != friendship.created and friendship.status != 'P':
+                events.append(FeedEvent(
+                    owner=owner,
+                    friendship=friendship,
+                    first_subject=receiver,
+                    indirect_object=sender,
+                    heading='%s %s %s\'s friendship' % (
+                        receiver.first_name,
+                        FRIENDSHIP_STATUS_DISPLAY[friendship.status],
+                        sender.first_name
+                    ),
+                    date=friendship.updated
+                ))
+
+    FeedEvent.objects.bulk_create(events)
+
+
+def unpublish_feed_events(apps, schema_editor):
+    FeedEvent = apps.get_model('users', 'FeedEvent')
+    FeedEvent.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEvent',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('heading', models.CharField(max_length=250)),
+                ('date', models.DateTimeField()),
+                ('first_subject', models.ForeignKey(related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('friendship', models.ForeignKey(related_name='feed_events', to='users.Friendship')),
+                ('indirect_object', models.ForeignKey(related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('owner', models.ForeignKey(related_name='feed_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AlterIndexTogether(
+            name='feedevent',
+            index_together=set([('owner', 'date')]),
+        ),
+        migrations.RunPython(publish_feed_events, unpublish_feed_events),
+    ]
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+def set_pair_keys(apps, schema_editor):
+    """
+    Sets the canonical pair key on existing friendships. When both users sent each other a request,
+    only one friendship can keep the key: accepted wins over pending, which wins over rejected,
+    and the oldest friendship breaks ties.
+    """
+    Friendship = apps.get_model('users', 'Friendship')
+
+    pairs = set()
+
+    for friendship in Friendship.objects.order_by('status', 'created'):
+        pair = tuple(sorted((friendship.sender_id, friendship.receiver_id)))
+
+        if pair in pairs:
+            friendship.delete()
+            continue
+
+        pairs.add(pair)
+
+        friendship.low_user_id, friendship.high_user_id = pair
+        friendship.save(update_fields=['low_user_id', 'high_user_id'])
+
+
+def unset_pair_keys(apps, schema_editor):
+    # The pair key columns are dropped when unapplying, so there is nothing to undo...
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_feedevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='friendship',
+            name='high_user_id',
+            field=models.PositiveIntegerField(null=True, editable=False),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='friendship',
+            name='low_user_id',
+            field=models.PositiveIntegerField(null=True, editable=False),
+            preserve_default=True,
+        ),
+        migrations.RunPython(set_pair_keys, unset_pair_keys),
+        migrations.AlterField(
+            model_name='friendship',
+            name='high_user_id',
+            field=models.PositiveIntegerField(editable=False),
+            preserve_default=True,
+        ),
+        migrations.AlterField(
+            model_name='friendship',
+            name='low_user_id',
+            field=models.PositiveIntegerField(editable=False),
+            preserve_default=True,
+        ),
+        migrations.AlterUniqueTogether(
+            name='friendship',
+            unique_together=set([('sender', 'receiver'), ('low_user_id', 'high_user_id')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='friendship',
+            index_together=set([('sender', 'status', 'updated'), ('receiver', 'status', 'updated')]),
+        ),
+    ]
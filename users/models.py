@@ -1,10 +1,17 @@
 __author__ = 'jason.parent@carneylabs.com (Jason Parent)'
 
+# Standard library imports...
+from itertools import chain
+
 # Django imports...
 from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError
 from django.db import models
+from django.db import transaction
 from django.db.models import Q
 from django.db.models import QuerySet
+from django.dispatch import Signal
 from django.utils import timezone
 
 AUTH_USER_MODEL = getattr(settings, 'AUTH_USER_MODEL')
@@ -15,24 +22,53 @@ FRIENDSHIP_STATUS = (
     ('R', 'rejected'),
 )
 
+# The user fields needed to render a friend in a list...
+FRIEND_FIELDS = ('id', 'first_name', 'last_name', 'photo', 'photo_small', 'photo_small_2x', 'modified')
+
+FRIEND_CACHE = getattr(settings, 'FRIEND_CACHE', 'default')
+
+FRIEND_CACHE_TIMEOUT = getattr(settings, 'FRIEND_CACHE_TIMEOUT', 60 * 60)
+
+# Sent with the friendships written (or deleted) by the methods below once their transaction has
+# committed, since bulk operations bypass the model signals and those signals may run before a commit...
+friendships_changed = Signal(providing_args=['friendships', 'deleted'])
+
+
+class FriendIds(object):
+    """The ids of the users that share a friendship with a user, grouped by the friendship's state."""
+
+    def __init__(self, accepted=(), sent=(), received=(), rejected=()):
+        self.accepted = frozenset(accepted)
+        self.sent = frozenset(sent)
+        self.received = frozenset(received)
+        self.rejected = frozenset(rejected)
+
+    @property
+    def pending(self):
+        """The ids of users with a pending friendship, whoever sent the request."""
+        return self.sent | self.received
+
+    @property
+    def all(self):
+        """The ids of users with a friendship in any state."""
+        return self.accepted | self.pending | self.rejected
+
 
 class FriendshipQuerySet(QuerySet):
     def get_friendship(self, user, friend):
         """Gets a friendship between the user and the specified friend, if one exists."""
-        query = Q(
-            Q(sender=user, receiver=friend) |
-            Q(sender=friend, receiver=user)
-        )
+        low_user_id, high_user_id = Friendship.pair_key(user, friend)
 
         try:
-            return self.get(query)
+            return self.get(low_user_id=low_user_id, high_user_id=high_user_id)
         except Friendship.DoesNotExist:
             return None
 
-    def get_friendships(self, user, status=None, sent=True, received=True):
+    def get_friendships(self, user, status=None, sent=True, received=True, fields=None):
         """
         Get all friendships associated with the user according to the status and whether the user
-        sent and/or received the friendship request.
+        sent and/or received the friendship request. Both users are fetched in the same query; pass
+        fields to load only those user fields (i.e. FRIEND_FIELDS).
         """
         query = Q()
 
@@ -42,28 +78,33 @@ class FriendshipQuerySet(QuerySet):
         if received:
             query |= Q(receiver=user)
 
-        friendships = self.filter(query)
+        friendships = self.filter(query).select_related('sender', 'receiver')
+
+        if fields:
+            friendships = friendships.only('status', 'created', 'updated', 'sender', 'receiver', *[
+                '%s__%s' % (relation, field) for relation in ('sender', 'receiver') for field in fields
+            ])
 
         if status:
             friendships = friendships.filter(status=status)
 
         return friendships.order_by('updated')
 
-    def pending(self, user):
+    def pending(self, user, fields=None):
         """Get all pending friendships associated with the user."""
-        return self.get_friendships(user, 'P')
+        return self.get_friendships(user, 'P', fields=fields)
 
-    def pending_sent(self, user):
+    def pending_sent(self, user, fields=None):
         """Get all pending friendships that were sent by the user."""
-        return self.get_friendships(user, 'P', sent=True, received=False)
+        return self.get_friendships(user, 'P', sent=True, received=False, fields=fields)
 
-    def pending_received(self, user):
+    def pending_received(self, user, fields=None):
         """Get all pending friendships that were received by the user."""
-        return self.get_friendships(user, 'P', sent=False, received=True)
+        return self.get_friendships(user, 'P', sent=False, received=True, fields=fields)
 
-    def current(self, user):
+    def current(self, user, fields=None):
         """Get all current (accepted) friendships associated with the user."""
-        return self.get_friendships(user, 'A')
+        return self.get_friendships(user, 'A', fields=fields)
 
 
 class Friendship(models.Model):
@@ -73,23 +114,138 @@ class Friendship(models.Model):
     updated = models.DateTimeField(auto_now=True)
     status = models.CharField(max_length=1, choices=FRIENDSHIP_STATUS, default='P')
 
+    # The users' ids in ascending order, so that a friendship has the same key in both directions...
+    low_user_id = models.PositiveIntegerField(editable=False)
+    high_user_id = models.PositiveIntegerField(editable=False)
+
     objects = FriendshipQuerySet.as_manager()
 
     class Meta:
-        unique_together = ('sender', 'receiver')
+        unique_together = (
+            ('sender', 'receiver'),
+            ('low_user_id', 'high_user_id'),
+        )
+        index_together = [
+            ('sender', 'status', 'updated'),
+            ('receiver', 'status', 'updated'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.low_user_id, self.high_user_id = sorted((self.sender_id, self.receiver_id))
+
+        return super(Friendship, self).save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        # The post_delete signal is sent before the deletion commits, so announce it afterwards...
+        super(Friendship, self).delete(*args, **kwargs)
+
+        friendships_changed.send(sender=Friendship, friendships=[self], deleted=True)
+
+    @staticmethod
+    def pair_key(user, friend):
+        """Gets the (low_user_id, high_user_id) key shared by both directions of a friendship."""
+        return tuple(sorted((user.pk, friend.pk)))
+
+    @staticmethod
+    def friend_ids_key(user_id):
+        return 'users:friend-ids:%d' % user_id
+
+    @staticmethod
+    def user_friend_ids(user):
+        """
+        Gets the FriendIds of the user from the cache, loading them with a single query on a miss.
+        Cached ids are invalidated whenever one of the user's friendships is saved or deleted.
+        """
+        return Friendship.users_friend_ids([user.pk])[user.pk]
+
+    @staticmethod
+    def users_friend_ids(user_ids):
+        """
+        Gets a dict of FriendIds keyed by user id for many users at once. Cached ids are fetched in
+        a single round trip and the misses are loaded together with a single query.
+        """
+        cache = caches[FRIEND_CACHE]
+        cached = cache.get_many([Friendship.friend_ids_key(user_id) for user_id in user_ids])
+        friend_ids = {}
+        missing = set()
+
+        for user_id in user_ids:
+            try:
+                friend_ids[user_id] = cached[Friendship.friend_ids_key(user_id)]
+            except KeyError:
+                missing.add(user_id)
+
+        if missing:
+            ids = dict((user_id, {
+                'accepted': [],
+                'sent': [],
+                'received': [],
+                'rejected': []
+            }) for user_id in missing)
+            groups = {'A': 'accepted', 'R': 'rejected'}
+
+            friendships = Friendship.objects.filter(
+                Q(sender_id__in=missing) | Q(receiver_id__in=missing)
+            ).values_list('sender_id', 'receiver_id', 'status')
+
+            for sender_id, receiver_id, status in friendships:
+                if sender_id in missing:
+                    ids[sender_id][groups.get(status, 'sent')].append(receiver_id)
+
+                if receiver_id in missing:
+                    ids[receiver_id][groups.get(status, 'received')].append(sender_id)
+
+            loaded = dict((user_id, FriendIds(**ids[user_id])) for user_id in missing)
+
+            cache.set_many(dict(
+                (Friendship.friend_ids_key(user_id), loaded[user_id]) for user_id in missing
+            ), FRIEND_CACHE_TIMEOUT)
+
+            friend_ids.update(loaded)
+
+        return friend_ids
+
+    @staticmethod
+    def invalidate_friend_ids(*user_ids):
+        """Removes the cached FriendIds of the users."""
+        caches[FRIEND_CACHE].delete_many([Friendship.friend_ids_key(user_id) for user_id in user_ids])
 
     @staticmethod
     def user_has_friend(user, friend):
         """Checks whether the user is part of a friendship with the specified friend."""
-        return Friendship.objects.get_friendship(user, friend) is not None
+        return friend.pk in Friendship.user_friend_ids(user).all
 
     @staticmethod
     def user_add_friend(user, friend):
-        """Creates a pending friendship between the user and the specified friend."""
-        if friend == user or Friendship.user_has_friend(user, friend):
+        """
+        Creates a pending friendship between the user and the specified friend. Adding a friend is
+        idempotent: if the users already share a friendship, it is returned instead, and if it is a
+        pending request that the friend sent to the user, it is accepted.
+        """
+        if friend == user:
             return None
 
-        return Friendship.objects.create(sender=user, receiver=friend)
+        # Insert first and let the pair key catch duplicates, so that concurrent requests from
+        # either user can't both create a friendship...
+        try:
+            with transaction.atomic():
+                friendship = Friendship.objects.create(sender=user, receiver=friend)
+                FeedEvent.publish_added(friendship)
+
+            friendships_changed.send(sender=Friendship, friendships=[friendship])
+
+            return friendship
+        except IntegrityError:
+            friendship = Friendship.objects.get_friendship(user, friend)
+
+            # The insert failed for some other reason than an existing friendship...
+            if friendship is None:
+                raise
+
+        if friendship.receiver_id == user.pk:
+            friendship.accept()
+
+        return friendship
 
     @staticmethod
     def user_remove_friend(user, friend):
@@ -106,14 +262,143 @@ class Friendship(models.Model):
 
         return friendship
 
+    @staticmethod
+    def user_add_friends(user, friends):
+        """
+        Creates pending friendships between the user and each of the friends that doesn't already
+        share a friendship with the user. Returns the number of friendships created.
+        """
+        existing = Friendship.user_friend_ids(user).all
+        friends = dict((f.pk, f) for f in friends if f.pk != user.pk and f.pk not in existing)
+
+        if not friends:
+            return 0
+
+        with transaction.atomic():
+            Friendship.objects.bulk_create([Friendship(
+                sender=user,
+                receiver=friend,
+                low_user_id=min(user.pk, friend.pk),
+                high_user_id=max(user.pk, friend.pk)
+            ) for friend in friends.values()])
+
+            # bulk_create doesn't set primary keys, so fetch the friendships for their feed events...
+            friendships = list(Friendship.objects.pending_sent(user, fields=FRIEND_FIELDS).filter(
+                receiver_id__in=friends.keys()
+            ))
+
+            FeedEvent.publish_added(*friendships)
+
+        friendships_changed.send(sender=Friendship, friendships=friendships)
+
+        return len(friendships)
+
+    @staticmethod
+    def user_accept_friends(user, friends=None):
+        """
+        Accepts the pending friendships that the user received from the friends, or all of them if no
+        friends are specified. Returns the number of friendships accepted.
+        """
+        return Friendship.user_answer_friends(user, 'A', friends)
+
+    @staticmethod
+    def user_reject_friends(user, friends=None):
+        """
+        Rejects the pending friendships that the user received from the friends, or all of them if no
+        friends are specified. Returns the number of friendships rejected.
+        """
+        return Friendship.user_answer_friends(user, 'R', friends)
+
+    @staticmethod
+    def user_answer_friends(user, status, friends=None):
+        """Sets the status of pending friendships received by the user with a single update."""
+        friendships = Friendship.objects.pending_received(user, fields=FRIEND_FIELDS)
+
+        if friends is not None:
+            friendships = friendships.filter(sender__in=[f.pk for f in friends])
+
+        updated = timezone.now()
+
+        with transaction.atomic():
+            friendships = list(friendships.select_for_update())
+
+            count = Friendship.objects.filter(pk__in=[f.pk for f in friendships], status='P').update(
+                status=status,
+                updated=updated
+            )
+
+            for friendship in friendships:
+                friendship.status = status
+                friendship.updated = updated
+
+            FeedEvent.publish_answered(*friendships)
+
+        friendships_changed.send(sender=Friendship, friendships=friendships)
+
+        return count
+
+    @staticmethod
+    def user_remove_friends(user, friends):
+        """
+        Removes the friendships between the user and each of the friends, with a single delete of
+        the friendships (and one of their feed events). Returns the number of friendships removed.
+        """
+        friend_ids = [f.pk for f in friends]
+
+        with transaction.atomic():
+            removed = list(Friendship.objects.select_for_update().filter(
+                Q(sender=user, receiver__in=friend_ids) |
+                Q(receiver=user, sender__in=friend_ids)
+            ).only('sender', 'receiver'))
+
+            if not removed:
+                return 0
+
+            # Raw deletes skip the collector, which would load and signal each row. So the feed
+            # events, the only rows referring to friendships (as a test checks), are deleted here,
+            # and friendships_changed below updates the caches and the graph...
+            pks = [friendship.pk for friendship in removed]
+            FeedEvent.objects.filter(friendship__in=pks)._raw_delete(using=FeedEvent.objects.db)
+            Friendship.objects.filter(pk__in=pks)._raw_delete(using=Friendship.objects.db)
+
+        friendships_changed.send(sender=Friendship, friendships=removed, deleted=True)
+
+        return len(removed)
+
     @staticmethod
     def user_list_friends(user, friendships=None):
         """Gets a list of friends from the specified friendships."""
         if friendships is None:
             friendships = Friendship.objects.current(user)
 
-        # Extract non-self friends from friendships...
-        return map((lambda f: f.sender if f.receiver == user else f.receiver), friendships)
+        # Extract non-self friends from friendships, comparing ids to avoid fetching the user...
+        return map((lambda f: f.sender if f.receiver_id == user.pk else f.receiver), friendships)
+
+    @staticmethod
+    def user_friends_q(user, field):
+        """
+        Gets a Q object that matches rows whose field (a user foreign key, e.g. 'owner') is one of
+        the user's current friends. The friendships are subqueries, so however many friends the user
+        has, no ids are loaded into Python or sent as query parameters.
+        """
+        friendships = Friendship.objects.filter(status='A')
+
+        return (
+            Q(**{'%s__in' % field: friendships.filter(sender=user).values('receiver')}) |
+            Q(**{'%s__in' % field: friendships.filter(receiver=user).values('sender')})
+        )
+
+    @staticmethod
+    def user_exclude_friends(user, users):
+        """
+        Excludes the user and everyone who shares a friendship with the user from the users. The
+        friendships are anti-joined as subqueries, so no friends are loaded into Python.
+        """
+        return users.exclude(pk=user.pk).exclude(
+            pk__in=Friendship.objects.filter(sender=user).values('receiver')
+        ).exclude(
+            pk__in=Friendship.objects.filter(receiver=user).values('sender')
+        )
 
     def __unicode__(self):
         return '%s to %s (%s)' % (
@@ -124,18 +409,107 @@ class Friendship(models.Model):
 
     def accept(self):
         """Accepts a pending friendship."""
-        if self.status != 'P':
-            return None
-
-        self.status = 'A'
-        self.updated = timezone.now()
-        self.save()
+        return self.answer('A')
 
     def reject(self):
         """Rejects a pending friendship."""
+        return self.answer('R')
+
+    def answer(self, status):
+        """
+        Sets the status of a pending friendship. The update is conditional on the friendship still
+        being pending, so only one of several concurrent answers takes effect.
+        """
         if self.status != 'P':
             return None
 
-        self.status = 'R'
-        self.updated = timezone.now()
-        self.save()
\ No newline at end of file
+        updated = timezone.now()
+
+        with transaction.atomic():
+            if not Friendship.objects.filter(pk=self.pk, status='P').update(status=status, updated=updated):
+                return None
+
+            self.status = status
+            self.updated = updated
+
+            FeedEvent.publish_answered(self)
+
+        friendships_changed.send(sender=Friendship, friendships=[self])
+
+
+class FeedEventQuerySet(QuerySet):
+    def for_user(self, user):
+        """Get all feed events owned by the user, oldest first."""
+        return self.filter(owner=user).order_by('date', 'id')
+
+
+class FeedEvent(models.Model):
+    """
+    A single entry in a user's activity feed. Events are written once per owner when a friendship
+    changes (fan-out on write), so reading a feed is a range scan over the (owner, date) index.
+    """
+    owner = models.ForeignKey(AUTH_USER_MODEL, related_name='feed_events')
+    friendship = models.ForeignKey(Friendship, related_name='feed_events')
+    first_subject = models.ForeignKey(AUTH_USER_MODEL, related_name='+')
+    indirect_object = models.ForeignKey(AUTH_USER_MODEL, related_name='+')
+    heading = models.CharField(max_length=250)
+    date = models.DateTimeField()
+
+    objects = FeedEventQuerySet.as_manager()
+
+    class Meta:
+        index_together = [('owner', 'date')]
+
+    def __unicode__(self):
+        return self.heading
+
+    @staticmethod
+    def for_both_users(friendship, heading, date, first_subject, indirect_object):
+        """Builds (without saving) an event for the feeds of both users that share the friendship."""
+        return [FeedEvent(
+            owner_id=owner_id,
+            friendship=friendship,
+            first_subject=first_subject,
+            indirect_object=indirect_object,
+            heading=heading,
+            date=date
+        ) for owner_id in (friendship.sender_id, friendship.receiver_id)]
+
+    @staticmethod
+    def added(friendship):
+        """Builds the events for a newly requested friendship."""
+        return FeedEvent.for_both_users(
+            friendship,
+            heading='%s added %s as a friend' % (
+                friendship.sender.first_name,
+                friendship.receiver.first_name
+            ),
+            date=friendship.created,
+            first_subject=friendship.sender,
+            indirect_object=friendship.receiver
+        )
+
+    @staticmethod
+    def answered(friendship):
+        """Builds the events for a friendship that was accepted or rejected."""
+        return FeedEvent.for_both_users(
+            friendship,
+            heading='%s %s %s\'s friendship' % (
+                friendship.receiver.first_name,
+                friendship.get_status_display(),
+                friendship.sender.first_name
+            ),
+            date=friendship.updated,
+            first_subject=friendship.receiver,
+            indirect_object=friendship.sender
+        )
+
+    @staticmethod
+    def publish_added(*friendships):
+        """Writes the events for newly requested friendships with a single insert."""
+        return FeedEvent.objects.bulk_create(list(chain.from_iterable(map(FeedEvent.added, friendships))))
+
+    @staticmethod
+    def publish_answered(*friendships):
+        """Writes the events for accepted or rejected friendships with a single insert."""
+        return FeedEvent.objects.bulk_create(list(chain.from_iterable(map(FeedEvent.answered, friendships))))
@@ -0,0 +1,128 @@
+"""
+A per-user cache of the rendered friendship pages (feed, friends and requests).
+
+Pages are cached under the user's id, a friendship version and the request path. The version is a
+counter in PAGE_CACHE that the signal handlers bump whenever one of the user's friendships is
+written or the profile of the user or of a friend changes, which makes all of the user's cached
+pages unreachable at once; they then expire after PAGE_CACHE_TIMEOUT. Hits and misses are counted
+in the cache, so that every process adds to the same totals.
+"""
+
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import hashlib
+import time
+from functools import wraps
+
+# Django imports...
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.encoding import force_bytes
+
+PAGE_CACHE = getattr(settings, 'PAGE_CACHE', 'default')
+
+PAGE_CACHE_TIMEOUT = getattr(settings, 'PAGE_CACHE_TIMEOUT', 10 * 60)
+
+HITS_KEY = 'users:page-cache:hits'
+
+MISSES_KEY = 'users:page-cache:misses'
+
+
+def version_key(user_id):
+    return 'users:friendship-version:%d' % user_id
+
+
+def page_key(user_id, version, path):
+    return 'users:page:%d:%d:%s' % (user_id, version, hashlib.md5(force_bytes(path)).hexdigest())
+
+
+def initial_version():
+    # Start from the clock rather than 0, so that a version that was evicted never comes back...
+    return int(time.time() * 1000)
+
+
+def get_version(user_id):
+    cache = caches[PAGE_CACHE]
+    key = version_key(user_id)
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, initial_version(), None)
+        version = cache.get(key, initial_version())
+
+    return version
+
+
+def bump_versions(*user_ids):
+    """Moves the users to new friendship versions, so that their cached pages are no longer used."""
+    cache = caches[PAGE_CACHE]
+
+    for user_id in user_ids:
+        try:
+            cache.incr(version_key(user_id))
+        except ValueError:
+            cache.set(version_key(user_id), initial_version(), None)
+
+
+def count(key):
+    cache = caches[PAGE_CACHE]
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_stats():
+    hits = caches[PAGE_CACHE].get(HITS_KEY, 0)
+    misses = caches[PAGE_CACHE].get(MISSES_KEY, 0)
+    requests = hits + misses
+
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': float(hits) / requests if requests else 0.0
+    }
+
+
+def reset_stats():
+    caches[PAGE_CACHE].delete_many([HITS_KEY, MISSES_KEY])
+
+
+def cache_per_user(view):
+    """
+    Serves successful GET responses of a view for the request user from the cache, with their
+    headers (e.g. ETag, Last-Modified, Vary and Cache-Control), until the user's friendship version
+    changes. Cookies are not cached.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+
+        cache = caches[PAGE_CACHE]
+        key = page_key(request.user.pk, get_version(request.user.pk), request.get_full_path())
+        cached = cache.get(key)
+
+        if cached is not None:
+            count(HITS_KEY)
+            content, headers = cached
+            response = HttpResponse(content)
+
+            for header, value in headers:
+                response[header] = value
+
+            return response
+
+        count(MISSES_KEY)
+        response = view(request, *args, **kwargs)
+
+        if response.status_code == 200 and not response.streaming:
+            cache.set(key, (response.content, response.items()), PAGE_CACHE_TIMEOUT)
+
+        return response
+
+    return wrapper
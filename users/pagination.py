@@ -0,0 +1,58 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import calendar
+import datetime
+
+# Django imports...
+from django.db.models import Q
+from django.utils import timezone
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_cursor(date, pk):
+    """Encodes a (date, id) position as an opaque string that is safe to use in a query string."""
+    microseconds = calendar.timegm(date.utctimetuple()) * 10 ** 6 + date.microsecond
+
+    return '%d-%d' % (microseconds, pk)
+
+
+def decode_cursor(cursor):
+    """Decodes a cursor created by encode_cursor. Raises a ValueError if the cursor is malformed."""
+    microseconds, pk = map(int, cursor.split('-'))
+
+    try:
+        return EPOCH + datetime.timedelta(microseconds=microseconds), pk
+    except OverflowError:
+        # Only a crafted cursor has a date out of range...
+        raise ValueError('Cursor date out of range: %r' % cursor)
+
+
+def paginate(queryset, cursor=None, limit=20, field='date', descending=False):
+    """
+    Gets a page of objects that follow the cursor from a queryset ordered by (field, id), along
+    with the cursor for the next page (None on the last page). Each page is a bounded range scan
+    that starts at the cursor, so deep pages cost the same as the first one. Pass descending to
+    page from the newest objects to the oldest.
+    """
+    lookup, order = ('lt', '-') if descending else ('gt', '')
+
+    if cursor:
+        date, pk = decode_cursor(cursor)
+
+        queryset = queryset.filter(
+            Q(**{'%s__%s' % (field, lookup): date}) |
+            Q(**{field: date, 'pk__%s' % lookup: pk})
+        )
+
+    # Fetch one extra object to find out whether there is another page...
+    objects = list(queryset.order_by(order + field, order + 'pk')[:limit + 1])
+
+    if len(objects) <= limit:
+        return objects, None
+
+    objects = objects[:limit]
+    last = objects[-1]
+
+    return objects, encode_cursor(getattr(last, field), last.pk)
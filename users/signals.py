@@ -0,0 +1,147 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import threading
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+# Local imports...
+from accounts.models import photo_processed
+from .graph import sync_graph
+from .graph import update_graph
+from .models import Friendship
+from .models import friendships_changed
+from .page_cache import bump_versions
+
+User = get_user_model()
+
+# The users whose caches, and the friendships whose graph edges, were changed inside a transaction
+# by this thread's current request (or, outside requests, since the last flush)...
+_deferred = threading.local()
+
+
+def invalidate_after_request(friend_ids=(), pages=(), pairs=()):
+    """
+    Remembers users whose cached friend ids (and pages) or only pages were dropped inside a
+    transaction, so that they are dropped again once the request is finished and the transaction
+    has committed; a concurrent request may have cached the old data in between. (Django 1.7 has no
+    on_commit hook.) Friendships changed inside a transaction are given as pairs of user ids, and
+    are read back into the friend graph then, since they may have been rolled back.
+
+    Outside requests, as in management commands, they are dropped again as soon as the thread is
+    next seen outside a transaction, or by flush_deferred.
+    """
+    if transaction.get_connection().in_atomic_block:
+        _deferred.__dict__.setdefault('friend_ids', set()).update(friend_ids)
+        _deferred.__dict__.setdefault('pages', set()).update(pages)
+        _deferred.__dict__.setdefault('pairs', set()).update(pairs)
+    elif not getattr(_deferred, 'in_request', False):
+        flush_deferred()
+
+
+def flush_deferred():
+    """
+    Drops the caches remembered by invalidate_after_request again and reads their friendships back
+    into the graph. Code that changes users outside requests calls this once its transactions end.
+    """
+    friend_ids = _deferred.__dict__.pop('friend_ids', set())
+    pages = _deferred.__dict__.pop('pages', set())
+    pairs = _deferred.__dict__.pop('pairs', set())
+
+    if friend_ids:
+        Friendship.invalidate_friend_ids(*friend_ids)
+
+    if friend_ids or pages:
+        bump_versions(*friend_ids.union(pages))
+
+    if pairs:
+        sync_graph(pairs)
+
+
+@receiver(request_started)
+def clear_deferred(sender, **kwargs):
+    # Only transactions of the request are committed by its end...
+    _deferred.__dict__.clear()
+    _deferred.in_request = True
+
+
+@receiver(request_finished)
+def invalidate_deferred(sender, **kwargs):
+    _deferred.in_request = False
+    flush_deferred()
+
+
+@receiver(post_save, sender=Friendship)
+@receiver(post_delete, sender=Friendship)
+def invalidate_friend_ids(sender, instance, **kwargs):
+    """
+    Drops the cached friend ids and pages of both users whenever their friendship changes. The
+    Friendship methods drop them again after their transactions commit (see apply_bulk_changes), and
+    other transactions have them dropped again at the end of the request.
+    """
+    Friendship.invalidate_friend_ids(instance.sender_id, instance.receiver_id)
+    bump_versions(instance.sender_id, instance.receiver_id)
+    invalidate_after_request(friend_ids=(instance.sender_id, instance.receiver_id))
+
+
+@receiver(post_save, sender=Friendship)
+def add_to_graph(sender, instance, **kwargs):
+    # A friendship saved in a transaction may yet be rolled back, so it is read back afterwards...
+    if transaction.get_connection().in_atomic_block:
+        invalidate_after_request(pairs=[tuple(sorted((instance.sender_id, instance.receiver_id)))])
+    else:
+        update_graph([instance])
+
+
+@receiver(post_delete, sender=Friendship)
+def remove_from_graph(sender, instance, **kwargs):
+    # Deletes, including those cascaded from a user or made through a queryset, run in a transaction...
+    if transaction.get_connection().in_atomic_block:
+        invalidate_after_request(pairs=[tuple(sorted((instance.sender_id, instance.receiver_id)))])
+    else:
+        update_graph([instance], deleted=True)
+
+
+@receiver(friendships_changed, sender=Friendship)
+def apply_bulk_changes(sender, friendships, deleted=False, **kwargs):
+    """Invalidates friend ids and pages and updates the graph for committed friendship changes."""
+    user_ids = set()
+
+    for friendship in friendships:
+        user_ids.update((friendship.sender_id, friendship.receiver_id))
+
+    Friendship.invalidate_friend_ids(*user_ids)
+    bump_versions(*user_ids)
+    update_graph(friendships, deleted=deleted)
+
+
+def invalidate_pages_showing(user):
+    """
+    Drops the cached pages that show the user: the user's own and those of the user's friends. If
+    the user was changed inside a transaction, they are dropped again at the end of the request.
+    """
+    user_ids = [user.pk] + list(Friendship.user_friend_ids(user).all)
+
+    bump_versions(*user_ids)
+    invalidate_after_request(pages=user_ids)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_pages(sender, instance, created, raw, update_fields, **kwargs):
+    # New users have no cached pages yet, and logging in only updates last_login...
+    if raw or created or update_fields == frozenset(['last_login']):
+        return
+
+    invalidate_pages_showing(instance)
+
+
+@receiver(photo_processed, sender=User)
+def invalidate_photo_pages(sender, user, **kwargs):
+    invalidate_pages_showing(user)
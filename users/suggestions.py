@@ -0,0 +1,58 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import heapq
+from collections import Counter
+
+# Django imports...
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+# Local imports...
+from .graph import get_graph
+from .models import FRIEND_FIELDS
+from .models import Friendship
+
+User = get_user_model()
+
+# The most friends whose friends are counted for a single request...
+SUGGESTION_FRIEND_LIMIT = getattr(settings, 'SUGGESTION_FRIEND_LIMIT', 200)
+
+
+def suggest_friends(user, limit=10):
+    """
+    Gets people the user may know: friends of the user's friends, ranked by the number of mutual
+    friends. Each user is annotated with that number as mutual_friends.
+
+    The friends of friends are read from the in-memory friend graph (see users.graph), for at most
+    SUGGESTION_FRIEND_LIMIT friends, so the cost of a request is bounded no matter how many friends
+    the user has, and only the suggested users are loaded from the database.
+    """
+    graph = get_graph()
+    friends = graph.friends(user.pk)[:SUGGESTION_FRIEND_LIMIT]
+
+    # Skip the user and anyone who already shares a friendship with the user, pending or not...
+    excluded = Friendship.user_friend_ids(user).all | set(friends) | {user.pk}
+
+    mutual_friends = Counter()
+
+    for friend_id in friends:
+        mutual_friends.update(user_id for user_id in graph.friends(friend_id) if user_id not in excluded)
+
+    # Most mutual friends first, ties broken by id...
+    ranked = heapq.nsmallest(limit, mutual_friends.items(), key=lambda item: (-item[1], item[0]))
+
+    users = User.objects.only(*FRIEND_FIELDS).in_bulk([user_id for user_id, count in ranked])
+
+    suggestions = []
+
+    for user_id, count in ranked:
+        # The graph can outlive a deleted user until it is reloaded...
+        if user_id not in users:
+            continue
+
+        suggestion = users[user_id]
+        suggestion.mutual_friends = count
+        suggestions.append(suggestion)
+
+    return suggestions
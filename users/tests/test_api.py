@@ -0,0 +1,113 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import json
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+# Local imports...
+from ..models import Friendship
+
+User = get_user_model()
+
+
+class ApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create_user(
+            first_name='John',
+            last_name='Carney',
+            username='john.carney@carneylabs.com',
+            email='john.carney@carneylabs.com',
+            password='password1'
+        )
+
+        self.regina = User.objects.create_user(
+            first_name='Regina',
+            last_name='McDonald',
+            username='regina.mcdonalid93@example.com',
+            email='regina.mcdonalid93@example.com',
+            password='password1'
+        )
+
+        self.client = Client()
+        self.client.login(username='john.carney@carneylabs.com', password='password1')
+
+    def get_json(self, url, **extra):
+        response = self.client.get(url, **extra)
+
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+        return json.loads(response.content)
+
+    def test_list_api_returns_projected_users(self):
+        self.assertDictEqual(self.get_json('/users/api/list/?search=regina'), {
+            'users': [{
+                'id': self.regina.pk,
+                'name': 'Regina McDonald',
+                'photo_url': '/media/photos/no-image.jpg',
+                'photo_2x_url': '/media/photos/no-image.jpg'
+            }]
+        })
+
+    def test_requests_api_returns_pending_received_friendships(self):
+        Friendship.user_add_friend(self.regina, self.user)
+
+        self.assertListEqual([self.regina.pk], [u['id'] for u in self.get_json('/users/api/requests/')['users']])
+
+    def test_friends_api_returns_current_friendships(self):
+        Friendship.user_add_friend(self.regina, self.user).accept()
+
+        self.assertListEqual([self.regina.pk], [u['id'] for u in self.get_json('/users/api/friends/')['users']])
+
+    def test_suggestions_api_returns_mutual_friends(self):
+        travis = User.objects.create_user('travis', 'travis@example.com', 'password1')
+
+        Friendship.objects.create(sender=self.user, receiver=self.regina, status='A')
+        Friendship.objects.create(sender=self.regina, receiver=travis, status='A')
+
+        users = self.get_json('/users/api/suggestions/')['users']
+
+        self.assertListEqual([(travis.pk, 1)], [(u['id'], u['mutual_friends']) for u in users])
+
+    def test_feed_api_returns_events_and_next_cursor(self):
+        Friendship.user_add_friend(self.user, self.regina).accept()
+
+        data = self.get_json('/users/api/feed/')
+
+        self.assertListEqual(
+            ['Regina accepted John\'s friendship', 'John added Regina as a friend'],
+            [e['heading'] for e in data['events']]
+        )
+        self.assertEqual(data['events'][0]['first_subject']['id'], self.regina.pk)
+        self.assertIsNone(data['next_cursor'])
+
+    def test_api_returns_not_modified_for_matching_etag(self):
+        response = self.client.get('/users/api/friends/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+        response = self.client.get('/users/api/friends/', HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, '')
+
+    def test_api_returns_new_content_once_changed(self):
+        etag = self.client.get('/users/api/friends/')['ETag']
+
+        Friendship.user_add_friend(self.regina, self.user).accept()
+
+        response = self.client.get('/users/api/friends/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_api_requires_log_in(self):
+        self.client.logout()
+
+        self.assertEqual(self.client.get('/users/api/friends/').status_code, 302)
@@ -0,0 +1,93 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+# Local imports...
+from ..conditions import friendship_version
+from ..models import Friendship
+
+User = get_user_model()
+
+
+class FriendshipConditionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create_user(
+            first_name='John',
+            last_name='Carney',
+            username='john.carney@carneylabs.com',
+            email='john.carney@carneylabs.com',
+            password='password1'
+        )
+
+        self.regina = User.objects.create_user(
+            first_name='Regina',
+            last_name='McDonald',
+            username='regina.mcdonalid93@example.com',
+            email='regina.mcdonalid93@example.com',
+            password='password1'
+        )
+
+        self.client = Client()
+        self.client.login(username='john.carney@carneylabs.com', password='password1')
+
+    def test_version_changes_when_friendship_is_added(self):
+        version = friendship_version(self.user)
+
+        Friendship.user_add_friend(self.regina, self.user)
+
+        self.assertNotEqual(friendship_version(self.user), version)
+
+    def test_version_changes_when_friendship_is_answered(self):
+        friendship = Friendship.user_add_friend(self.regina, self.user)
+        version = friendship_version(self.user)
+
+        friendship.accept()
+
+        self.assertNotEqual(friendship_version(self.user), version)
+
+    def test_version_changes_when_friendship_is_removed(self):
+        Friendship.objects.create(sender=self.user, receiver=self.regina, status='A')
+        version = friendship_version(self.user)
+
+        Friendship.user_remove_friends(self.user, [self.regina])
+
+        self.assertNotEqual(friendship_version(self.user), version)
+
+    def test_version_changes_when_friend_edits_profile(self):
+        Friendship.objects.create(sender=self.user, receiver=self.regina, status='A')
+        version = friendship_version(self.user)
+
+        self.regina.first_name = 'Reggie'
+        self.regina.save()
+
+        self.assertNotEqual(friendship_version(self.user), version)
+
+    def test_view_returns_not_modified_without_rendering(self):
+        Friendship.objects.create(sender=self.user, receiver=self.regina, status='A')
+
+        response = self.client.get('/users/friends/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+        response = self.client.get('/users/friends/', HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(response.status_code, 304)
+        self.assertTemplateNotUsed(response, 'users/friends.html')
+
+    def test_view_returns_new_content_once_friendship_is_removed(self):
+        Friendship.objects.create(sender=self.user, receiver=self.regina, status='A')
+
+        etag = self.client.get('/users/friends/')['ETag']
+
+        Friendship.user_remove_friends(self.user, [self.regina])
+
+        response = self.client.get('/users/friends/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
@@ -0,0 +1,180 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Third-party imports...
+from mock import patch
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.core.signals import request_started
+from django.db import IntegrityError
+from django.db import transaction
+from django.test import TestCase
+
+# Local imports...
+from ..graph import VERSION_KEY
+from ..graph import FriendGraph
+from ..graph import get_graph
+from ..graph import reset_graph
+from ..models import Friendship
+
+User = get_user_model()
+
+
+class FriendGraphTest(TestCase):
+    def setUp(self):
+        # 1 - 2 - 3 - 4, with 1 and 3 also friends with 5; 6 is on its own...
+        self.graph = FriendGraph([(1, 2), (2, 3), (3, 4), (5, 1), (3, 5), (6, 6)])
+
+    def test_friends_are_stored_in_both_directions(self):
+        self.assertListEqual([2, 5], self.graph.friends(1))
+        self.assertListEqual([2, 4, 5], self.graph.friends(3))
+        self.assertListEqual([], self.graph.friends(6))
+
+    def test_graph_is_stored_in_int32_arrays(self):
+        self.assertEqual(self.graph.nbytes, 4 * (5 + 6 + 10))
+        self.assertAlmostEqual(self.graph.bytes_per_edge, 4 * 21 / 5.0)
+
+    def test_mutual_count(self):
+        self.assertEqual(self.graph.mutual_count(1, 3), 2)
+        self.assertEqual(self.graph.mutual_count(1, 4), 0)
+
+    def test_distance(self):
+        self.assertEqual(self.graph.distance(1, 1), 0)
+        self.assertEqual(self.graph.distance(1, 2), 1)
+        self.assertEqual(self.graph.distance(1, 4), 3)
+        self.assertIsNone(self.graph.distance(1, 4, max_depth=2))
+        self.assertIsNone(self.graph.distance(1, 6))
+
+    def test_degree_stats(self):
+        self.assertDictEqual(self.graph.degree_stats(), {
+            'users': 5,
+            'friendships': 5,
+            'min': 1,
+            'max': 3,
+            'mean': 2.0,
+            'median': 2,
+        })
+
+    def test_changes_are_applied_before_rebuild(self):
+        self.graph.add_friendship(4, 6)
+        self.graph.remove_friendship(2, 3)
+
+        self.assertListEqual([3, 6], self.graph.friends(4))
+        self.assertListEqual([1], self.graph.friends(2))
+        self.assertEqual(self.graph.distance(1, 6), 4)
+
+    @patch('users.graph.REBUILD_THRESHOLD', 1)
+    def test_changes_are_folded_into_arrays_on_rebuild(self):
+        self.graph.add_friendship(4, 6)
+        self.graph.remove_friendship(2, 3)
+
+        self.assertEqual(self.graph._overlay_size, 0)
+        self.assertListEqual([3, 6], self.graph.friends(4))
+        self.assertListEqual([1], self.graph.friends(2))
+        self.assertEqual(len(self.graph.neighbors), 10)
+
+
+class FriendGraphSignalTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_graph()
+
+        self.user, self.friend = [User.objects.create_user(
+            username='%s@example.com' % name,
+            email='%s@example.com' % name,
+            password='password1'
+        ) for name in ('john', 'regina')]
+
+    def tearDown(self):
+        reset_graph()
+
+    def test_graph_loads_accepted_friendships(self):
+        Friendship.objects.create(sender=self.user, receiver=self.friend, status='A')
+
+        self.assertListEqual([self.friend.pk], get_graph().friends(self.user.pk))
+
+    def test_graph_follows_friendship_changes(self):
+        graph = get_graph()
+
+        friendship = Friendship.user_add_friend(self.user, self.friend)
+
+        self.assertListEqual([], graph.friends(self.user.pk))
+
+        friendship.accept()
+
+        self.assertListEqual([self.friend.pk], graph.friends(self.user.pk))
+
+        friendship.delete()
+
+        self.assertListEqual([], graph.friends(self.user.pk))
+
+    def test_graph_follows_bulk_removal(self):
+        Friendship.objects.create(sender=self.user, receiver=self.friend, status='A')
+        graph = get_graph()
+
+        Friendship.user_remove_friends(self.user, [self.friend])
+
+        self.assertListEqual([], graph.friends(self.user.pk))
+
+    def test_graph_ignores_rolled_back_friendship(self):
+        graph = get_graph()
+        request_started.send(sender=self.__class__)
+
+        try:
+            with transaction.atomic():
+                Friendship.objects.create(sender=self.user, receiver=self.friend, status='A')
+
+                raise IntegrityError
+        except IntegrityError:
+            pass
+
+        request_finished.send(sender=self.__class__)
+
+        self.assertListEqual([], graph.friends(self.user.pk))
+
+    def test_graph_reads_back_friendships_saved_in_other_transactions(self):
+        graph = get_graph()
+        request_started.send(sender=self.__class__)
+
+        with transaction.atomic():
+            Friendship.objects.create(sender=self.user, receiver=self.friend, status='A')
+
+        self.assertListEqual([], graph.friends(self.user.pk))
+
+        request_finished.send(sender=self.__class__)
+
+        self.assertListEqual([self.friend.pk], graph.friends(self.user.pk))
+
+    def test_graph_follows_cascaded_deletes(self):
+        Friendship.objects.create(sender=self.user, receiver=self.friend, status='A')
+        graph = get_graph()
+
+        request_started.send(sender=self.__class__)
+        self.friend.delete()
+        request_finished.send(sender=self.__class__)
+
+        self.assertListEqual([], graph.friends(self.user.pk))
+
+    def test_graph_is_reloaded_after_changes_in_other_processes(self):
+        graph = get_graph()
+
+        # Another process accepts a friendship...
+        Friendship.objects.filter(pk=Friendship.objects.create(sender=self.user, receiver=self.friend).pk).update(
+            status='A'
+        )
+        cache.incr(VERSION_KEY)
+
+        self.assertIs(get_graph(), graph)
+
+        with patch('users.graph.FRIEND_GRAPH_MAX_AGE', 0):
+            self.assertListEqual([self.friend.pk], get_graph().friends(self.user.pk))
+
+    def test_graph_is_not_reloaded_after_own_changes(self):
+        graph = get_graph()
+
+        with patch('users.graph.FRIEND_GRAPH_MAX_AGE', 0):
+            Friendship.user_add_friend(self.user, self.friend).accept()
+
+            self.assertIs(get_graph(), graph)
@@ -1,17 +1,31 @@
 __author__ = 'jason.parent@carneylabs.com (Jason Parent)'
 
+# Third-party imports...
+from mock import patch
+
 # Django imports...
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache import caches
+from django.core.signals import request_finished
+from django.db import IntegrityError
+from django.db import connection
 from django.test import TestCase
 
 # Local imports...
+from ..models import FRIEND_CACHE
+from ..models import FeedEvent
 from ..models import Friendship
+from ..signals import flush_deferred
+from ..signals import invalidate_after_request
 
 User = get_user_model()
 
 
 class FriendshipModelTest(TestCase):
     def setUp(self):
+        cache.clear()
+
         self.user = User.objects.create_user(
             username='john.carney@carneylabs.com',
             email='john.carney@carneylabs.com',
@@ -39,6 +53,49 @@ class FriendshipModelTest(TestCase):
 
         self.assertTrue(friendship.status, 'P')
 
+    def test_adding_friend_twice_returns_existing_friendship(self):
+        friendship = Friendship.user_add_friend(self.user, self.friend)
+
+        self.assertEqual(Friendship.user_add_friend(self.user, self.friend), friendship)
+        self.assertEqual(Friendship.objects.count(), 1)
+        self.assertEqual(FeedEvent.objects.for_user(self.user).count(), 1)
+
+    def test_adding_friend_accepts_reciprocal_request(self):
+        Friendship.user_add_friend(self.friend, self.user)
+
+        friendship = Friendship.user_add_friend(self.user, self.friend)
+
+        self.assertEqual(friendship.status, 'A')
+        self.assertEqual(Friendship.objects.get().status, 'A')
+        self.assertIn(self.friend.pk, Friendship.user_friend_ids(self.user).accepted)
+
+    def test_adding_rejected_friend_does_not_change_friendship(self):
+        Friendship.objects.create(sender=self.friend, receiver=self.user, status='R')
+
+        self.assertEqual(Friendship.user_add_friend(self.user, self.friend).status, 'R')
+
+    def test_adding_friend_is_safe_when_friend_ids_are_stale(self):
+        # Cache the friend ids, then create a friendship behind the cache's back...
+        Friendship.user_friend_ids(self.user)
+        Friendship.objects.bulk_create([Friendship(
+            sender=self.friend,
+            receiver=self.user,
+            low_user_id=min(self.user.pk, self.friend.pk),
+            high_user_id=max(self.user.pk, self.friend.pk)
+        )])
+
+        self.assertEqual(Friendship.user_add_friend(self.user, self.friend).status, 'A')
+        self.assertEqual(Friendship.objects.count(), 1)
+
+    def test_only_first_answer_to_friendship_takes_effect(self):
+        friendship = Friendship.objects.create(sender=self.user, receiver=self.friend, status='P')
+        stale_friendship = Friendship.objects.get(pk=friendship.pk)
+
+        friendship.accept()
+        stale_friendship.reject()
+
+        self.assertEqual(Friendship.objects.get().status, 'A')
+
     def test_friendship_abolished_when_sender_removes_friend(self):
         Friendship.objects.create(sender=self.user, receiver=self.friend, status='A')
         Friendship.user_remove_friend(self.user, self.friend)
@@ -58,6 +115,119 @@ class FriendshipModelTest(TestCase):
 
         self.assertIn(self.friend, Friendship.user_list_friends(self.user))
 
+    def test_friendship_has_same_pair_key_in_both_directions(self):
+        friendship = Friendship.objects.create(sender=self.friend, receiver=self.user)
+
+        self.assertEqual(
+            (friendship.low_user_id, friendship.high_user_id),
+            Friendship.pair_key(self.user, self.friend)
+        )
+        self.assertEqual(Friendship.pair_key(self.user, self.friend), Friendship.pair_key(self.friend, self.user))
+
+    def test_reciprocal_friendship_violates_pair_key(self):
+        Friendship.objects.create(sender=self.user, receiver=self.friend)
+
+        self.assertRaises(IntegrityError, Friendship.objects.create, sender=self.friend, receiver=self.user)
+
+    def test_exclude_friends_excludes_user_and_friends_in_single_query(self):
+        stranger = User.objects.create_user(
+            email='travis.mills57@example.com',
+            username='travis.mills57@example.com',
+            password='password1'
+        )
+
+        Friendship.objects.create(sender=self.friend, receiver=self.user, status='R')
+
+        with self.assertNumQueries(1):
+            self.assertListEqual([stranger], list(Friendship.user_exclude_friends(self.user, User.objects.all())))
+
+    def test_friend_ids_are_grouped_by_status(self):
+        regina = User.objects.create_user(
+            email='regina.jones@example.com',
+            username='regina.jones@example.com',
+            password='password1'
+        )
+
+        travis = User.objects.create_user(
+            email='travis.mills57@example.com',
+            username='travis.mills57@example.com',
+            password='password1'
+        )
+
+        Friendship.objects.create(sender=self.user, receiver=self.friend, status='A')
+        Friendship.objects.create(sender=self.user, receiver=regina, status='P')
+        Friendship.objects.create(sender=travis, receiver=self.user, status='P')
+
+        friend_ids = Friendship.user_friend_ids(self.user)
+
+        self.assertSetEqual(friend_ids.accepted, {self.friend.pk})
+        self.assertSetEqual(friend_ids.sent, {regina.pk})
+        self.assertSetEqual(friend_ids.received, {travis.pk})
+        self.assertSetEqual(friend_ids.pending, {regina.pk, travis.pk})
+        self.assertSetEqual(friend_ids.all, {self.friend.pk, regina.pk, travis.pk})
+
+    def test_friend_ids_are_cached(self):
+        Friendship.user_friend_ids(self.user)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(Friendship.user_has_friend(self.user, self.friend))
+
+    def test_friend_ids_are_invalidated_on_friendship_changes(self):
+        self.assertFalse(Friendship.user_has_friend(self.user, self.friend))
+
+        friendship = Friendship.user_add_friend(self.friend, self.user)
+
+        self.assertIn(self.friend.pk, Friendship.user_friend_ids(self.user).received)
+
+        friendship.accept()
+
+        self.assertIn(self.friend.pk, Friendship.user_friend_ids(self.user).accepted)
+
+        Friendship.user_remove_friend(self.user, self.friend)
+
+        self.assertFalse(Friendship.user_has_friend(self.user, self.friend))
+
+    def test_friend_ids_are_invalidated_after_commit(self):
+        stale = Friendship.user_friend_ids(self.user)
+
+        def cache_stale_friend_ids(*friendships):
+            # A concurrent request that read before the commit caches what it saw...
+            caches[FRIEND_CACHE].set(Friendship.friend_ids_key(self.user.pk), stale)
+
+        with patch.object(FeedEvent, 'publish_added', side_effect=cache_stale_friend_ids):
+            Friendship.user_add_friend(self.user, self.friend)
+
+        self.assertTrue(Friendship.user_has_friend(self.user, self.friend))
+
+    def test_friend_ids_changed_in_other_transactions_are_invalidated_after_request(self):
+        stale = Friendship.user_friend_ids(self.user)
+        Friendship.objects.create(sender=self.user, receiver=self.friend, status='A')
+        caches[FRIEND_CACHE].set(Friendship.friend_ids_key(self.user.pk), stale)
+
+        request_finished.send(sender=self.__class__)
+
+        self.assertTrue(Friendship.user_has_friend(self.user, self.friend))
+
+    def test_friend_ids_changed_outside_requests_are_invalidated_on_flush(self):
+        stale = Friendship.user_friend_ids(self.user)
+        Friendship.objects.create(sender=self.user, receiver=self.friend, status='A')
+        caches[FRIEND_CACHE].set(Friendship.friend_ids_key(self.user.pk), stale)
+
+        flush_deferred()
+
+        self.assertTrue(Friendship.user_has_friend(self.user, self.friend))
+
+    def test_friend_ids_changed_outside_requests_are_invalidated_outside_transactions(self):
+        stale = Friendship.user_friend_ids(self.user)
+        Friendship.objects.create(sender=self.user, receiver=self.friend, status='A')
+        caches[FRIEND_CACHE].set(Friendship.friend_ids_key(self.user.pk), stale)
+
+        # The next change seen outside a transaction, as in a management command...
+        with patch.object(connection, 'in_atomic_block', False):
+            invalidate_after_request()
+
+        self.assertTrue(Friendship.user_has_friend(self.user, self.friend))
+
     def test_friendship_has_accepted_status_when_accepted(self):
         friendship = Friendship.objects.create(sender=self.user, receiver=self.friend, status='P')
         friendship.accept()
@@ -71,6 +241,160 @@ class FriendshipModelTest(TestCase):
         self.assertEqual(friendship.status, 'R')
 
 
+class FriendshipBulkTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create_user(
+            first_name='John',
+            username='john.carney@carneylabs.com',
+            email='john.carney@carneylabs.com',
+            password='password1'
+        )
+
+        self.friends = [User.objects.create_user(
+            first_name=name.capitalize(),
+            username='%s@example.com' % name,
+            email='%s@example.com' % name,
+            password='password1'
+        ) for name in ('regina', 'brandon', 'tim')]
+
+    def test_add_friends_creates_pending_friendships(self):
+        Friendship.objects.create(sender=self.friends[0], receiver=self.user)
+
+        self.assertEqual(Friendship.user_add_friends(self.user, self.friends + [self.user]), 2)
+        self.assertSetEqual(Friendship.user_friend_ids(self.user).sent, {self.friends[1].pk, self.friends[2].pk})
+        self.assertEqual(FeedEvent.objects.for_user(self.user).count(), 2)
+
+    def test_add_friends_sets_pair_keys(self):
+        Friendship.user_add_friends(self.user, self.friends)
+
+        for friend in self.friends:
+            self.assertIsNotNone(Friendship.objects.get_friendship(friend, self.user))
+
+    def test_add_friends_uses_constant_number_of_queries(self):
+        Friendship.user_friend_ids(self.user)
+
+        # Savepoint, insert friendships, select friendships, insert feed events, release savepoint...
+        with self.assertNumQueries(5):
+            Friendship.user_add_friends(self.user, self.friends)
+
+    def test_accept_friends_accepts_all_pending_received_friendships(self):
+        for friend in self.friends:
+            Friendship.user_add_friend(friend, self.user)
+
+        Friendship.user_add_friend(self.user, User.objects.create_user('travis', 'travis@example.com', 'password1'))
+
+        self.assertEqual(Friendship.user_accept_friends(self.user), 3)
+        self.assertSetEqual(Friendship.user_friend_ids(self.user).accepted, set(f.pk for f in self.friends))
+        self.assertEqual(
+            FeedEvent.objects.for_user(self.user).last().heading,
+            'John accepted Tim\'s friendship'
+        )
+
+    def test_reject_friends_rejects_only_specified_friends(self):
+        for friend in self.friends:
+            Friendship.user_add_friend(friend, self.user)
+
+        self.assertEqual(Friendship.user_reject_friends(self.user, self.friends[:2]), 2)
+
+        friend_ids = Friendship.user_friend_ids(self.user)
+
+        self.assertSetEqual(friend_ids.rejected, {self.friends[0].pk, self.friends[1].pk})
+        self.assertSetEqual(friend_ids.received, {self.friends[2].pk})
+
+    def test_remove_friends_removes_friendships_in_both_directions(self):
+        Friendship.objects.create(sender=self.user, receiver=self.friends[0], status='A')
+        Friendship.objects.create(sender=self.friends[1], receiver=self.user, status='A')
+        Friendship.objects.create(sender=self.friends[2], receiver=self.user, status='A')
+
+        self.assertEqual(Friendship.user_remove_friends(self.user, self.friends[:2]), 2)
+        self.assertSetEqual(Friendship.user_friend_ids(self.user).accepted, {self.friends[2].pk})
+
+    def test_remove_friends_deletes_friendships_and_events_in_single_queries(self):
+        for friend in self.friends:
+            Friendship.user_add_friend(self.user, friend)
+
+        # Savepoint, select friendships, delete feed events, delete friendships, release savepoint...
+        with self.assertNumQueries(5):
+            self.assertEqual(Friendship.user_remove_friends(self.user, self.friends), len(self.friends))
+
+        self.assertFalse(Friendship.objects.exists())
+        self.assertFalse(FeedEvent.objects.exists())
+        self.assertSetEqual(Friendship.user_friend_ids(self.user).all, set())
+
+    def test_remove_friends_deletes_every_row_referring_to_friendships(self):
+        # The raw deletes in user_remove_friends skip the cascade, so each new reference to these
+        # tables has to be deleted there too...
+        def references(model):
+            return {
+                (related.model, related.field.name)
+                for related in model._meta.get_all_related_objects(include_hidden=True)
+            } | set(model._meta.get_all_related_many_to_many_objects())
+
+        self.assertSetEqual(references(Friendship), {(FeedEvent, 'friendship')})
+        self.assertSetEqual(references(FeedEvent), set())
+
+
+class FeedEventModelTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create_user(
+            first_name='John',
+            username='john.carney@carneylabs.com',
+            email='john.carney@carneylabs.com',
+            password='password1'
+        )
+
+        self.friend = User.objects.create_user(
+            first_name='Regina',
+            email='regina.mcdonalid93@example.com',
+            username='regina.mcdonalid93@example.com',
+            password='password1'
+        )
+
+    def test_added_friendship_publishes_event_to_both_users(self):
+        friendship = Friendship.user_add_friend(self.user, self.friend)
+
+        for owner in (self.user, self.friend):
+            events = FeedEvent.objects.for_user(owner)
+
+            self.assertListEqual(['John added Regina as a friend'], [e.heading for e in events])
+            self.assertEqual(events[0].date, friendship.created)
+
+    def test_accepted_friendship_publishes_event_to_both_users(self):
+        friendship = Friendship.user_add_friend(self.user, self.friend)
+        friendship.accept()
+
+        for owner in (self.user, self.friend):
+            events = FeedEvent.objects.for_user(owner)
+
+            self.assertEqual(events.count(), 2)
+            self.assertEqual(events.last().heading, 'Regina accepted John\'s friendship')
+            self.assertEqual(events.last().date, friendship.updated)
+
+    def test_rejected_friendship_publishes_event_to_both_users(self):
+        friendship = Friendship.user_add_friend(self.user, self.friend)
+        friendship.reject()
+
+        for owner in (self.user, self.friend):
+            self.assertEqual(FeedEvent.objects.for_user(owner).last().heading, 'Regina rejected John\'s friendship')
+
+    def test_answering_non_pending_friendship_does_not_publish_event(self):
+        friendship = Friendship.user_add_friend(self.user, self.friend)
+        friendship.accept()
+        friendship.reject()
+
+        self.assertEqual(FeedEvent.objects.for_user(self.user).count(), 2)
+
+    def test_removed_friendship_removes_events(self):
+        Friendship.user_add_friend(self.user, self.friend)
+        Friendship.user_remove_friend(self.user, self.friend)
+
+        self.assertFalse(FeedEvent.objects.for_user(self.user).exists())
+
+
 class FriendshipQuerySetTest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -137,4 +461,22 @@ class FriendshipQuerySetTest(TestCase):
     def test_current(self):
         friendships = Friendship.objects.current(self.user)
 
-        self.assertListEqual([self.user_and_regina], list(friendships))
\ No newline at end of file
+        self.assertListEqual([self.user_and_regina], list(friendships))
+
+    def test_get_friendships_fetches_users_in_same_query(self):
+        friendships = list(Friendship.objects.get_friendships(self.user))
+
+        with self.assertNumQueries(0):
+            self.assertListEqual(
+                [self.regina, self.brandon, self.tim],
+                Friendship.user_list_friends(self.user, friendships)
+            )
+
+    def test_get_friendships_defers_unrequested_user_fields(self):
+        friendship = Friendship.objects.get_friendships(self.user, fields=('id', 'first_name')).first()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(friendship.receiver.first_name, self.regina.first_name)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(friendship.receiver.email, self.regina.email)
@@ -0,0 +1,138 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import json
+
+# Third-party imports...
+from mock import patch
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase
+
+# Local imports...
+from accounts.models import photo_processed
+from ..models import Friendship
+from ..page_cache import cache_per_user
+from ..page_cache import get_stats
+from ..page_cache import get_version
+
+User = get_user_model()
+
+
+class PageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create_user(
+            first_name='John',
+            last_name='Carney',
+            username='john.carney@carneylabs.com',
+            email='john.carney@carneylabs.com',
+            password='password1'
+        )
+
+        self.regina = User.objects.create_user(
+            first_name='Regina',
+            last_name='McDonald',
+            username='regina.mcdonalid93@example.com',
+            email='regina.mcdonalid93@example.com',
+            password='password1'
+        )
+
+        Friendship.objects.create(sender=self.user, receiver=self.regina, status='A')
+
+        self.client = Client()
+        self.client.login(username='john.carney@carneylabs.com', password='password1')
+
+    def test_serves_unchanged_page_from_cache(self):
+        response = self.client.get('/users/friends/')
+
+        with patch('users.views.render') as mock_render:
+            cached = self.client.get('/users/friends/')
+
+        self.assertFalse(mock_render.called)
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(get_stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_serves_cached_page_with_its_headers(self):
+        @cache_per_user
+        def view(request):
+            response = HttpResponse('page', content_type='text/plain')
+            response['ETag'] = '"1"'
+            response['Cache-Control'] = 'private, max-age=0'
+            response['Vary'] = 'Cookie'
+
+            return response
+
+        request = RequestFactory().get('/users/friends/')
+        request.user = self.user
+        response = view(request)
+        cached = view(request)
+
+        self.assertEqual(get_stats()['hits'], 1)
+        self.assertEqual(cached.content, 'page')
+        self.assertItemsEqual(cached.items(), response.items())
+
+    def test_caches_each_path_separately(self):
+        self.client.get('/users/feed/')
+        self.client.get('/users/feed/?cursor=0-0')
+
+        self.assertEqual(get_stats()['misses'], 2)
+
+    def test_profile_change_in_transaction_invalidates_pages_again_after_request(self):
+        self.regina.first_name = 'Gina'
+        self.regina.save()
+
+        # A concurrent request that read before the commit cached the page under the new version...
+        version = get_version(self.user.pk)
+
+        request_finished.send(sender=self.__class__)
+
+        self.assertNotEqual(get_version(self.user.pk), version)
+
+    def test_friendship_change_invalidates_pages_of_both_users(self):
+        self.client.get('/users/friends/')
+        versions = get_version(self.user.pk), get_version(self.regina.pk)
+
+        Friendship.user_remove_friends(self.user, [self.regina])
+
+        self.assertNotContains(self.client.get('/users/friends/'), 'Regina McDonald')
+        self.assertNotEqual((get_version(self.user.pk), get_version(self.regina.pk)), versions)
+
+    def test_friend_profile_change_invalidates_pages(self):
+        self.client.get('/users/friends/')
+
+        self.regina.first_name = 'Reggie'
+        self.regina.save()
+
+        self.assertContains(self.client.get('/users/friends/'), 'Reggie McDonald')
+
+    def test_processed_photo_invalidates_pages(self):
+        version = get_version(self.user.pk)
+
+        photo_processed.send(sender=User, user=self.regina)
+
+        self.assertNotEqual(get_version(self.user.pk), version)
+
+    def test_logging_in_keeps_pages(self):
+        version = get_version(self.user.pk)
+
+        self.client.login(username='john.carney@carneylabs.com', password='password1')
+
+        self.assertEqual(get_version(self.user.pk), version)
+
+    def test_stats_require_staff(self):
+        self.assertEqual(self.client.get('/users/api/page_cache/').status_code, 302)
+
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self.client.get('/users/friends/')
+
+        self.assertDictEqual(json.loads(self.client.get('/users/api/page_cache/').content), {
+            'hits': 0,
+            'misses': 1,
+            'hit_rate': 0.0
+        })
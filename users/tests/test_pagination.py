@@ -0,0 +1,101 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Standard library imports...
+import datetime
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+# Local imports...
+from ..models import FeedEvent
+from ..models import Friendship
+from ..pagination import decode_cursor
+from ..pagination import encode_cursor
+from ..pagination import paginate
+
+User = get_user_model()
+
+
+class CursorTest(TestCase):
+    def test_cursor_round_trips_date_and_id(self):
+        date = datetime.datetime(2015, 3, 2, 22, 6, 15, 123456, tzinfo=timezone.utc)
+
+        self.assertEqual(decode_cursor(encode_cursor(date, 42)), (date, 42))
+
+    def test_malformed_cursor_raises_value_error(self):
+        self.assertRaises(ValueError, decode_cursor, 'nonsense')
+
+    def test_out_of_range_cursor_raises_value_error(self):
+        self.assertRaises(ValueError, decode_cursor, '99999999999999999999-1')
+        self.assertRaises(ValueError, decode_cursor, '-99999999999999999999-1')
+
+
+class PaginateTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='john.carney@carneylabs.com',
+            email='john.carney@carneylabs.com',
+            password='password1'
+        )
+
+        friend = User.objects.create_user(
+            username='regina.mcdonalid93@example.com',
+            email='regina.mcdonalid93@example.com',
+            password='password1'
+        )
+
+        friendship = Friendship.objects.create(sender=self.user, receiver=friend)
+        date = timezone.now()
+
+        # Events that share a date are ordered by id...
+        for heading in ('a', 'b', 'c', 'd', 'e'):
+            FeedEvent.objects.create(
+                owner=self.user,
+                friendship=friendship,
+                first_subject=self.user,
+                indirect_object=friend,
+                heading=heading,
+                date=date
+            )
+
+        self.events = FeedEvent.objects.for_user(self.user)
+
+    def test_paginate_returns_first_page_and_next_cursor(self):
+        events, next_cursor = paginate(self.events, limit=2)
+
+        self.assertListEqual(['a', 'b'], [e.heading for e in events])
+        self.assertIsNotNone(next_cursor)
+
+    def test_paginate_follows_cursor_to_last_page(self):
+        headings = []
+        cursor = None
+
+        while True:
+            events, cursor = paginate(self.events, cursor, limit=2)
+            headings.extend(e.heading for e in events)
+
+            if cursor is None:
+                break
+
+        self.assertListEqual(['a', 'b', 'c', 'd', 'e'], headings)
+
+    def test_paginate_returns_no_cursor_for_exact_page(self):
+        events, next_cursor = paginate(self.events, limit=5)
+
+        self.assertEqual(len(events), 5)
+        self.assertIsNone(next_cursor)
+
+    def test_paginate_pages_backwards_when_descending(self):
+        headings = []
+        cursor = None
+
+        while True:
+            events, cursor = paginate(self.events, cursor, limit=2, descending=True)
+            headings.extend(e.heading for e in events)
+
+            if cursor is None:
+                break
+
+        self.assertListEqual(['e', 'd', 'c', 'b', 'a'], headings)
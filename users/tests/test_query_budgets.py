@@ -0,0 +1,55 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+# Local imports...
+from metrics.testing import query_budgets
+from recipes.models import Recipe
+from ..models import Friendship
+
+User = get_user_model()
+
+
+@query_budgets()
+class QueryBudgetTest(TestCase):
+    """Fails if a page runs more queries than its budget in METRICS_QUERY_BUDGETS, e.g. one per friend."""
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create_user('john', 'john@example.com', 'password1')
+
+        for i in range(10):
+            friend = User.objects.create_user('friend%d' % i, 'friend%d@example.com' % i, 'password1')
+            stranger = User.objects.create_user('stranger%d' % i, 'stranger%d@example.com' % i, 'password1')
+
+            Friendship.objects.create(sender=self.user, receiver=friend, status='A')
+            Friendship.objects.create(sender=stranger, receiver=self.user, status='P')
+            Friendship.objects.create(sender=friend, receiver=stranger, status='A')
+
+            recipe = Recipe.objects.create(owner=friend, name='Pancakes %d' % i, tags='Breakfast')
+            recipe.set_ingredients([('Flour', '2 cups'), ('Milk', '1 cup')])
+
+        self.client.login(username='john', password='password1')
+
+    def test_pages_stay_within_query_budgets(self):
+        for url in (
+            '/profile/',
+            '/recipes/',
+            '/recipes/search/?search=breakfast',
+            '/users/feed/',
+            '/users/friends/',
+            '/users/list/',
+            '/users/requests/',
+            '/users/suggestions/',
+            '/users/api/feed/',
+            '/users/api/friends/',
+            '/users/api/list/',
+            '/users/api/requests/',
+            '/users/api/suggestions/',
+        ):
+            cache.clear()
+
+            self.assertEqual(self.client.get(url).status_code, 200)
@@ -0,0 +1,69 @@
+__author__ = 'jason.parent@carneylabs.com (Jason Parent)'
+
+# Third-party imports...
+from mock import patch
+
+# Django imports...
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+# Local imports...
+from ..models import Friendship
+from ..suggestions import suggest_friends
+
+User = get_user_model()
+
+
+class SuggestFriendsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.user, self.regina, self.brandon, self.tim, self.travis = [User.objects.create_user(
+            username='%s@example.com' % name,
+            email='%s@example.com' % name,
+            password='password1'
+        ) for name in ('john', 'regina', 'brandon', 'tim', 'travis')]
+
+        # John is friends with Regina and Brandon...
+        Friendship.objects.create(sender=self.user, receiver=self.regina, status='A')
+        Friendship.objects.create(sender=self.brandon, receiver=self.user, status='A')
+
+        # ...who are both friends with Tim, while only Regina is friends with Travis...
+        Friendship.objects.create(sender=self.regina, receiver=self.tim, status='A')
+        Friendship.objects.create(sender=self.tim, receiver=self.brandon, status='A')
+        Friendship.objects.create(sender=self.regina, receiver=self.travis, status='A')
+
+    def test_suggestions_are_ranked_by_mutual_friends(self):
+        suggestions = suggest_friends(self.user)
+
+        self.assertListEqual([self.tim, self.travis], suggestions)
+        self.assertListEqual([2, 1], [s.mutual_friends for s in suggestions])
+
+    def test_suggestions_exclude_users_with_friendship(self):
+        Friendship.objects.create(sender=self.user, receiver=self.tim, status='R')
+
+        self.assertListEqual([self.travis], suggest_friends(self.user))
+
+    def test_suggestions_ignore_pending_friendships(self):
+        Friendship.objects.filter(sender=self.regina, receiver=self.travis).update(status='P')
+
+        self.assertListEqual([self.tim], suggest_friends(self.user))
+
+    def test_suggestions_are_limited(self):
+        self.assertListEqual([self.tim], suggest_friends(self.user, limit=1))
+
+    @patch('users.suggestions.SUGGESTION_FRIEND_LIMIT', 1)
+    def test_suggestions_count_limited_number_of_friends(self):
+        # Only the friends of Regina, who has the lowest id, are counted...
+        suggestions = suggest_friends(self.user)
+
+        self.assertListEqual([self.tim, self.travis], suggestions)
+        self.assertListEqual([1, 1], [s.mutual_friends for s in suggestions])
+
+    def test_friends_of_friends_are_read_from_graph(self):
+        suggest_friends(self.user)
+
+        # Only the suggested users are loaded...
+        with self.assertNumQueries(1):
+            suggest_friends(self.user)
@@ -6,9 +6,13 @@ from mock import patch
 
 # Django imports...
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.template.loader import render_to_string
 from django.test import Client, TestCase
 from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
 
 # Local imports...
 from ..models import Friendship
@@ -35,6 +39,8 @@ class HomeViewTest(TestCase):
 
 class FriendshipTest(TestCase):
     def setUp(self):
+        cache.clear()
+
         self.user = User.objects.create_user(
             first_name='John',
             last_name='Carney',
@@ -93,6 +99,44 @@ class ListViewTest(FriendshipTest):
         self.assertIn(regina, response.context['users'])
         self.assertIn(travis, response.context['users'])
 
+    @patch('users.views.USER_SEARCH_LIMIT', 1)
+    def test_list_view_limits_results(self):
+        for name in ('regina.mcdonalid93@example.com', 'travis.mills57@example.com'):
+            User.objects.create_user(username=name, email=name, password='password1')
+
+        response = self.client.get('/users/list/?search=example')
+
+        self.assertEqual(len(response.context['users']), 1)
+
+    def test_list_view_excludes_friends(self):
+        regina = User.objects.create_user(
+            username='regina.mcdonalid93@example.com',
+            email='regina.mcdonalid93@example.com',
+            password='password1'
+        )
+
+        Friendship.user_add_friend(regina, self.user)
+
+        response = self.client.get('/users/list/?search=regina')
+
+        self.assertListEqual(list(response.context['users']), [])
+
+
+class SuggestionsViewTest(FriendshipTest):
+    def test_suggestions_view_renders_list_template(self):
+        response = self.client.get('/users/suggestions/')
+
+        self.assertTemplateUsed(response, 'users/list.html')
+
+    @patch('users.views.suggest_friends')
+    def test_suggestions_view_returns_suggested_users(self, mock_suggest_friends):
+        mock_friend = Mock(pk=1, mutual_friends=2)
+        mock_suggest_friends.return_value = [mock_friend]
+
+        response = self.client.get('/users/suggestions/')
+
+        self.assertListEqual([mock_friend], response.context['users'])
+
 
 class RequestsViewTest(FriendshipTest):
     def test_requests_view_renders_requests_template(self):
@@ -125,6 +169,21 @@ class FriendsViewTest(FriendshipTest):
 
         self.assertListEqual([mock_friend], response.context['users'])
 
+    def test_avatar_is_reused_until_profile_changes(self):
+        regina = User.objects.create_user('regina', 'regina@example.com', 'password1')
+
+        self.assertIn('/media/photos/no-image.jpg', render_to_string('users/snippets/avatar.html', {'user': regina}))
+
+        # The rendered avatar is keyed on the profile version, which this leaves alone...
+        regina.photo = 'photos/regina.jpg'
+        regina.__dict__.pop('photo_url')
+
+        self.assertIn('/media/photos/no-image.jpg', render_to_string('users/snippets/avatar.html', {'user': regina}))
+
+        regina.save()
+
+        self.assertIn('/media/photos/regina.jpg', render_to_string('users/snippets/avatar.html', {'user': regina}))
+
 
 class AddViewTest(FriendshipTest):
     def test_add_view_redirects_home(self):
@@ -258,29 +317,114 @@ class FeedViewTest(FriendshipTest):
     def test_feed_view_returns_user_events(self):
         response = self.client.get('/users/feed/')
 
-        self.assertListEqual(response.context['events'], [{
-            'heading': '%s added %s as a friend' % (
-                self.friendship.sender.first_name,
-                self.friendship.receiver.first_name
-            ),
-            'date': self.friendship.created,
-            'first_subject': self.friendship.sender,
-            'indirect_object': self.friendship.receiver
-        }, {
-            'heading': '%s %s %s\'s friendship' % (
+        self.assertListEqual([(e.heading, e.date, e.first_subject, e.indirect_object) for e in response.context['events']], [(
+            '%s %s %s\'s friendship' % (
                 self.friendship.receiver.first_name,
                 self.friendship.get_status_display(),
                 self.friendship.sender.first_name
             ),
-            'date': self.friendship.updated,
-            'first_subject': self.friendship.receiver,
-            'indirect_object': self.friendship.sender
-        }])
+            self.friendship.updated,
+            self.friendship.receiver,
+            self.friendship.sender
+        ), (
+            '%s added %s as a friend' % (
+                self.friendship.sender.first_name,
+                self.friendship.receiver.first_name
+            ),
+            self.friendship.created,
+            self.friendship.sender,
+            self.friendship.receiver
+        )])
 
     def test_feed_view_returns_user_events_in_correct_order(self):
         response = self.client.get('/users/feed/')
 
         self.assertListEqual(
-            [e.get('date') for e in response.context['events']],
-            [self.friendship.created, self.friendship.updated]
-        )
\ No newline at end of file
+            [e.date for e in response.context['events']],
+            [self.friendship.updated, self.friendship.created]
+        )
+
+    def test_feed_view_only_returns_events_owned_by_user(self):
+        travis = User.objects.create_user(
+            first_name='Travis',
+            last_name='Mills',
+            username='travis.mills57@example.com',
+            email='travis.mills57@example.com',
+            password='password1'
+        )
+
+        Friendship.user_add_friend(self.regina, friend=travis)
+
+        response = self.client.get('/users/feed/')
+
+        self.assertEqual(len(response.context['events']), 2)
+
+    @patch('users.views.FEED_PAGE_SIZE', 1)
+    def test_feed_view_returns_next_cursor_for_partial_page(self):
+        response = self.client.get('/users/feed/')
+
+        self.assertEqual([e.date for e in response.context['events']], [self.friendship.updated])
+        self.assertIsNotNone(response.context['next_cursor'])
+
+        response = self.client.get('/users/feed/', {'cursor': response.context['next_cursor']})
+
+        self.assertEqual([e.date for e in response.context['events']], [self.friendship.created])
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_feed_view_raises_404_for_invalid_cursor(self):
+        response = self.client.get('/users/feed/', {'cursor': 'nonsense'})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_feed_view_raises_404_for_out_of_range_cursor(self):
+        response = self.client.get('/users/feed/', {'cursor': '99999999999999999999-1'})
+
+        self.assertEqual(response.status_code, 404)
+
+
+class QueryCountTest(FriendshipTest):
+    """Each view must issue the same number of queries no matter how many friends the user has."""
+
+    def add_friends(self, count, status):
+        for i in range(User.objects.count(), User.objects.count() + count):
+            friend = User.objects.create_user(
+                first_name='Friend',
+                last_name=str(i),
+                username='friend.%d.%s@example.com' % (i, status),
+                email='friend.%d.%s@example.com' % (i, status),
+                password='password1'
+            )
+
+            # Received friendships show up in both the requests and friends views...
+            friendship = Friendship.user_add_friend(friend, self.user)
+
+            if status == 'A':
+                friendship.accept()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+
+        return len(context)
+
+    def assertConstantQueries(self, url, status):
+        self.add_friends(1, status)
+        expected = self.count_queries(url)
+
+        self.add_friends(5, status)
+
+        self.assertEqual(self.count_queries(url), expected)
+
+    def test_list_view_query_count_is_constant(self):
+        self.assertConstantQueries('/users/list/', 'A')
+
+    def test_requests_view_query_count_is_constant(self):
+        self.assertConstantQueries('/users/requests/', 'P')
+
+    def test_friends_view_query_count_is_constant(self):
+        self.assertConstantQueries('/users/friends/', 'A')
+
+    def test_feed_view_query_count_is_constant(self):
+        self.assertConstantQueries('/users/feed/', 'A')
@@ -7,10 +7,20 @@ from django.conf.urls import url
 urlpatterns = patterns('users.views',
     url(r'^$', 'home_view', name='home'),
     url(r'^list/$', 'list_view', name='list'),
+    url(r'^suggestions/$', 'suggestions_view', name='suggestions'),
     url(r'^requests/$', 'requests_view', name='requests'),
     url(r'^friends/$', 'friends_view', name='friends'),
     url(r'^friends/(?P<user_id>\d+)/add/$', 'add_view', name='add'),
     url(r'^friends/(?P<user_id>\d+)/accept/$', 'accept_view', name='accept'),
     url(r'^friends/(?P<user_id>\d+)/reject/$', 'reject_view', name='reject'),
     url(r'^feed/$', 'feed_view', name='feed'),
-)
\ No newline at end of file
+)
+
+urlpatterns += patterns('users.api',
+    url(r'^api/list/$', 'list_view', name='api_list'),
+    url(r'^api/suggestions/$', 'suggestions_view', name='api_suggestions'),
+    url(r'^api/requests/$', 'requests_view', name='api_requests'),
+    url(r'^api/friends/$', 'friends_view', name='api_friends'),
+    url(r'^api/feed/$', 'feed_view', name='api_feed'),
+    url(r'^api/page_cache/$', 'page_cache_view', name='api_page_cache'),
+)
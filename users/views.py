@@ -1,22 +1,33 @@
 __author__ = 'jason.parent@carneylabs.com (Jason Parent)'
 
-# Standard library...
-import operator
-
 # Django imports...
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.core.urlresolvers import reverse
-from django.db.models import Q
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
 from django.shortcuts import render
 
 # Local imports...
+from accounts.search import search as search_users
+from .conditions import friendship_condition
+from .models import FRIEND_FIELDS
+from .models import FeedEvent
 from .models import Friendship
+from .page_cache import cache_per_user
+from .pagination import paginate
+from .suggestions import suggest_friends
 
 User = get_user_model()
 
+FEED_PAGE_SIZE = getattr(settings, 'FEED_PAGE_SIZE', 20)
+
+USER_SEARCH_LIMIT = getattr(settings, 'USER_SEARCH_LIMIT', 50)
+
+SUGGESTION_LIMIT = getattr(settings, 'SUGGESTION_LIMIT', 20)
+
 
 @login_required
 def home_view(request):
@@ -27,29 +38,27 @@ def home_view(request):
 def list_view(request):
     search = request.GET.get('search', '')
 
-    query = Q(
-        Q(username__icontains=search) |
-        Q(email__icontains=search) |
-        Q(first_name__icontains=search) |
-        Q(last_name__icontains=search)
-    )
-
     # Exclude users that share a friendship with the request user...
-    friendships = Friendship.objects.get_friendships(request.user)
-    friends = Friendship.user_list_friends(request.user, friendships)
+    users = Friendship.user_exclude_friends(request.user, User.objects.all())
+    users = search_users(users, search)[:USER_SEARCH_LIMIT]
 
-    query &= ~Q(username__in=[f.username for f in friends])
+    return render(request, 'users/list.html', {
+        'users': users
+    })
 
-    users = User.objects.exclude(username=request.user.username).filter(query)
 
+@login_required
+def suggestions_view(request):
     return render(request, 'users/list.html', {
-        'users': users
+        'users': suggest_friends(request.user, limit=SUGGESTION_LIMIT)
     })
 
 
 @login_required
+@friendship_condition
+@cache_per_user
 def requests_view(request):
-    friendships = Friendship.objects.pending_received(request.user)
+    friendships = Friendship.objects.pending_received(request.user, fields=FRIEND_FIELDS)
     users = Friendship.user_list_friends(request.user, friendships)
 
     return render(request, 'users/requests.html', {
@@ -58,8 +67,10 @@ def requests_view(request):
 
 
 @login_required
+@friendship_condition
+@cache_per_user
 def friends_view(request):
-    friendships = Friendship.objects.current(request.user)
+    friendships = Friendship.objects.current(request.user, fields=FRIEND_FIELDS)
     users = Friendship.user_list_friends(request.user, friendships)
 
     return render(request, 'users/friends.html', {
@@ -97,34 +108,17 @@ def reject_view(request, user_id):
 
 
 @login_required
+@friendship_condition
+@cache_per_user
 def feed_view(request):
-    events = []
-
-    friendships = Friendship.objects.get_friendships(user=request.user)
-
-    for friendship in friendships:
-        events.append({
-            'heading': '%s added %s as a friend' % (
-                friendship.sender.first_name,
-                friendship.receiver.first_name
-            ),
-            'date': friendship.created,
-            'first_subject': friendship.sender,
-            'indirect_object': friendship.receiver
-        })
-
-        if friendship.updated != friendship.created and friendship.status != 'P':
-            events.append({
-                'heading': '%s %s %s\'s friendship' % (
-                    friendship.receiver.first_name,
-                    friendship.get_status_display(),
-                    friendship.sender.first_name
-                ),
-                'date': friendship.updated,
-                'first_subject': friendship.receiver,
-                'indirect_object': friendship.sender
-            })
+    events = FeedEvent.objects.for_user(request.user).select_related('first_subject', 'indirect_object')
+
+    try:
+        events, next_cursor = paginate(events, request.GET.get('cursor'), limit=FEED_PAGE_SIZE, descending=True)
+    except ValueError:
+        raise Http404
 
     return render(request, 'users/feed.html', {
-        'events': sorted(events, key=operator.itemgetter('date'))
-    })
\ No newline at end of file
+        'events': events,
+        'next_cursor': next_cursor
+    })